@@ -1,3 +1,3 @@
-from . import users, pages, media, settings, audit_logs, auth
+from . import users, pages, media, settings, audit_logs, auth, content, diagnostics
 
-__all__ = ["users", "pages", "media", "settings", "audit_logs", "auth"]
+__all__ = ["users", "pages", "media", "settings", "audit_logs", "auth", "content", "diagnostics"]
@@ -5,6 +5,8 @@ from app.schemas import AuditLogRead
 from app.crud import crud_audit_log
 from app.db.session import get_db
 from app.core.permissions import require_permission
+from app.core.responses import json_response
+from app.core.streaming import streamable
 
 router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
 
@@ -17,10 +19,14 @@ router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
     response_model=list[AuditLogRead],
     dependencies=[Depends(require_permission(["analytics.view", "audit.view"]))],
 )
+@streamable(AuditLogRead, lambda: crud_audit_log.list_query())
 async def list_audit_logs(db: AsyncSession = Depends(get_db)):
-    """Return a list of all audit log entries."""
+    """
+    Return a list of all audit log entries.
+    Streamed with `Accept: application/x-ndjson` or `?stream=true`.
+    """
     logs = await crud_audit_log.get_all(db)
     if not logs:
         # Optional: You can return 204 if you prefer no-content for empty result
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No audit logs found")
-    return logs
+    return json_response(list[AuditLogRead], logs)
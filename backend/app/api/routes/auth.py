@@ -1,9 +1,9 @@
 from datetime import timedelta, datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Response, Cookie
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import BaseModel, EmailStr
 
 from app.db.session import get_db
@@ -11,14 +11,17 @@ from app.db.models.user import User
 from app.schemas.user import UserCreate, UserRead
 from app.core.config import settings
 from app.core.permissions import get_role_permissions_verbose
-from app.core.auth_deps import get_current_user, ALGORITHM
+from app.core.auth_deps import get_current_user
+from app.core.jwt_keys import get_keyset
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
 )
 from app.core.audit import record_audit_log
+from app.core.revocation import revocation_table
+from app.core.rate_limit import client_ip, get_login_throttle
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -56,7 +59,7 @@ async def register_user(user_in: UserCreate, db: AsyncSession = Depends(get_db))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_pw = get_password_hash(user_in.password)
+    hashed_pw = await get_password_hash_async(user_in.password)
     new_user = await User.create(
         db, email=user_in.email, hashed_password=hashed_pw, role=user_in.role
     )
@@ -65,6 +68,7 @@ async def register_user(user_in: UserCreate, db: AsyncSession = Depends(get_db))
         action="register",
         resource_type="user",
         resource_id=new_user.id,
+        user_id=new_user.id,
         db=db
     )
 
@@ -81,6 +85,7 @@ class Token(BaseModel):
 
 @router.post("/login", response_model=Token)
 async def login_user(
+    request: Request,
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db),
@@ -89,22 +94,28 @@ async def login_user(
     Authenticate user and return short-lived access token and long-lived refresh token.
     Stores refresh token in HttpOnly cookie.
     Records login audit log.
+    Throttled per IP and per account; locked-out attempts are rejected before hashing.
     """
+    throttle = get_login_throttle()
+    ip, account = client_ip(request), form_data.username
+    await throttle.check("login", ip=ip, account=account)
+
     user = await User.get_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
+        await throttle.failure("login", ip=ip, account=account)
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    await throttle.success("login", account=account)
 
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Inactive user")
 
     # Create tokens
+    claims = {"sub": user.email, "id": user.id, "role": user.role, "ep": user.token_epoch}
     access_token = create_access_token(
-        data={"sub": user.email, "id": user.id, "role": user.role},
+        data=claims,
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
-    refresh_token = create_refresh_token(
-        data={"sub": user.email, "id": user.id, "role": user.role}
-    )
+    refresh_token = create_refresh_token(data=claims)
 
     # Store refresh token in HttpOnly cookie
     response.set_cookie(
@@ -146,21 +157,24 @@ async def refresh_token(
         raise HTTPException(status_code=401, detail="Missing refresh token")
 
     try:
-        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        payload = get_keyset().decode(refresh_token)
         email = payload.get("sub")
-        token_iat = payload.get("iat")
+        token_epoch = payload.get("ep", 0)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
+    if payload.get("type") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid token type, refresh token required")
+
     user = await User.get_by_email(db, email=email)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="Invalid user")
 
-    if token_iat < user.last_token_issue.timestamp():
+    if token_epoch < user.token_epoch:
         raise HTTPException(status_code=401, detail="Refresh token revoked")
 
     new_access_token = create_access_token(
-        data={"sub": user.email, "id": user.id, "role": user.role},
+        data={"sub": user.email, "id": user.id, "role": user.role, "ep": user.token_epoch},
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
@@ -174,14 +188,16 @@ async def logout_user(
     current_user: User = Depends(get_current_user),
 ):
     """
-    Logout user by deleting the refresh token cookie and updating last_token_issue
-    for revocation purposes.
+    Logout user by deleting the refresh token cookie and bumping the user's
+    token epoch, which revokes all of their access and refresh tokens.
     """
     response = JSONResponse(content={"message": "Logout successful"})
     response.delete_cookie("refresh_token")
 
+    # Revoke every token issued so far (access and refresh)
     current_user.last_token_issue = datetime.utcnow()
     db.add(current_user)
+    await revocation_table.bump(db, current_user.id)
     await db.commit()
 
     return response
@@ -201,12 +217,18 @@ class PasswordResetConfirm(BaseModel):
 
 @router.post("/reset-password/request")
 async def request_password_reset(
-    data: PasswordResetRequest, db: AsyncSession = Depends(get_db)
+    data: PasswordResetRequest, request: Request, db: AsyncSession = Depends(get_db)
 ):
     """
     Request a password reset. Generates a temporary token for resetting.
     Records audit log.
+    Every request counts against the per-IP and per-account throttle.
     """
+    throttle = get_login_throttle()
+    ip, account = client_ip(request), data.email
+    await throttle.check("password_reset", ip=ip, account=account)
+    await throttle.failure("password_reset", ip=ip, account=account)
+
     user = await User.get_by_email(db, email=data.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -218,7 +240,8 @@ async def request_password_reset(
         action="password_reset_request",
         resource_type="user",
         resource_id=user.id,
-        db=db
+        db=db,
+        user_id=user.id,
     )
 
     return {"message": "Password reset token generated", "reset_token": token}
@@ -233,7 +256,7 @@ async def confirm_password_reset(
     Records audit log.
     """
     try:
-        payload = jwt.decode(data.token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        payload = get_keyset().decode(data.token)
         email = payload.get("sub")
     except JWTError:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
@@ -242,7 +265,7 @@ async def confirm_password_reset(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.hashed_password = get_password_hash(data.new_password)
+    user.hashed_password = await get_password_hash_async(data.new_password)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -251,12 +274,14 @@ async def confirm_password_reset(
         action="password_reset_confirm",
         resource_type="user",
         resource_id=user.id,
+        user_id=user.id,
         db=db
     )
 
-    # Revoke all refresh tokens
+    # Revoke all access and refresh tokens
     user.last_token_issue = datetime.utcnow()
     db.add(user)
+    await revocation_table.bump(db, user.id)
     await db.commit()
 
     return {"message": "Password reset successful"}
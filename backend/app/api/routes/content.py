@@ -0,0 +1,70 @@
+# app/api/routes/content.py
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.permissions import require_permission
+from app.core.auth_deps import Principal
+from app.core.content_transfer import (
+    ContentImportError,
+    ImportOptions,
+    import_archive,
+    iter_archive,
+    iter_content,
+)
+from app.core.streaming import NDJSON
+
+router = APIRouter(prefix="/content", tags=["Content Transfer"])
+
+
+# -------------------------
+# EXPORT
+# -------------------------
+@router.get(
+    "/export",
+    dependencies=[Depends(require_permission("site.export"))],
+)
+async def export_content(
+    format: str = Query("tar", pattern="^(tar|tar.gz|ndjson)$", description="tar, tar.gz or ndjson (no media files)"),
+    media: bool = Query(True, description="Include the media files in the tar"),
+):
+    """Stream all site content as a tar archive (content.ndjson + media files) or bare NDJSON."""
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_content(),
+            media_type=NDJSON,
+            headers={"Content-Disposition": 'attachment; filename="content.ndjson"'},
+        )
+    compress = format == "tar.gz"
+    return StreamingResponse(
+        iter_archive(include_media=media, compress=compress),
+        media_type="application/gzip" if compress else "application/x-tar",
+        headers={"Content-Disposition": f'attachment; filename="content.{format}"'},
+    )
+
+
+# -------------------------
+# IMPORT
+# -------------------------
+@router.post(
+    "/import",
+)
+async def import_content(
+    archive: UploadFile = File(..., description="Archive from the export endpoint or CLI"),
+    ids: str = Query("preserve", pattern="^(preserve|remap)$", description="Keep the exported ids or assign new ones"),
+    replace: bool = Query(False, description="Delete existing pages, blocks, media rows and settings first"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("site.import")),
+):
+    """Import an export archive in a single transaction."""
+    options = ImportOptions(ids=ids, replace=replace, user_id=current_user.id)
+    try:
+        report = await import_archive(db, archive.file, options)
+    except ContentImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        await archive.close()
+    return asdict(report)
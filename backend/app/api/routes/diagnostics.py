@@ -0,0 +1,123 @@
+# app/api/routes/diagnostics.py
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.permissions import require_permission
+from app.core.profiling import (
+    DiagnosticsError,
+    DiagnosticsNotFound,
+    list_memory_snapshots,
+    list_profiles,
+    load_profile,
+    memory_diff,
+    memory_top,
+    stop_memory_tracing,
+    take_memory_snapshot,
+)
+from app.core.slow_queries import slow_query_log
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["Diagnostics"],
+    dependencies=[Depends(require_permission("system.diagnostics"))],
+)
+
+GROUP_BY = "^(lineno|filename|traceback)$"
+
+
+async def _run(fn, *args, **kwargs):
+    """Diagnostics read files and walk heaps: keep that off the event loop."""
+    try:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    except DiagnosticsNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DiagnosticsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# -------------------------
+# REQUEST PROFILES
+# -------------------------
+@router.get("/profiles")
+async def get_profiles():
+    """
+    Profiles recorded by any worker, oldest first. Profile a request by sending
+    it with `X-Profile: 1` (or `?__profile=1`) and read its `X-Profile-Id` header.
+    """
+    return await _run(list_profiles)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$", description="json, or folded stacks for flame graphs"),
+):
+    profile = await _run(load_profile, profile_id)
+    if format == "folded":
+        return PlainTextResponse(profile["folded"])
+    return profile
+
+
+# -------------------------
+# MEMORY (tracemalloc)
+# -------------------------
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+async def create_memory_snapshot():
+    """
+    Snapshot this worker's allocations, starting `tracemalloc` on first use
+    (tracing slows allocations down; stop it when done).
+    """
+    return await _run(take_memory_snapshot)
+
+
+@router.get("/memory/snapshots")
+async def get_memory_snapshots():
+    """Snapshots of every worker; the id starts with the worker's pid."""
+    return await _run(list_memory_snapshots)
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(
+    snapshot_id: str,
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern=GROUP_BY),
+):
+    return await _run(memory_top, snapshot_id, limit, group_by)
+
+
+@router.get("/memory/snapshots/{snapshot_id}/diff")
+async def diff_memory_snapshots(
+    snapshot_id: str,
+    base: str = Query(..., description="Earlier snapshot of the same worker"),
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern=GROUP_BY),
+):
+    """Allocation growth from `base` to `snapshot_id`, biggest first."""
+    return await _run(memory_diff, base, snapshot_id, limit, group_by)
+
+
+@router.delete("/memory/tracing")
+async def stop_tracing():
+    """Stop `tracemalloc` in the worker serving this request."""
+    return {"was_tracing": stop_memory_tracing()}
+
+
+# -------------------------
+# SLOW QUERIES
+# -------------------------
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = Query(50, ge=1, le=500)):
+    """
+    Statements slower than `SLOW_QUERY_MS` seen by the worker serving this
+    request, grouped by fingerprint and sorted by total time.
+    """
+    return {"pid": os.getpid(), "threshold_ms": settings.SLOW_QUERY_MS, "queries": slow_query_log.top(limit)}
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries():
+    slow_query_log.reset()
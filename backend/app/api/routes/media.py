@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+import asyncio
+import json
+import mimetypes
+import zipfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.media import MediaCreate, MediaRead
 from app.crud import crud_media
+from app.crud.media import SORTABLE_FIELDS
 from app.db.session import get_db
 from app.core.permissions import require_permission
-from app.core.auth_deps import get_current_user
+from app.core.auth_deps import Principal
+from app.core.response_cache import cached_response
+from app.core.streaming import streamable
 from app.core.audit import record_audit_log
-import shutil
-from datetime import datetime
-import os
+from app.core.config import settings
+from app.core.media_metadata import metadata_worker
+from app.core.storage import DEFAULT_CHUNK_SIZE, get_storage, shard_key
 import uuid
 
 router = APIRouter(prefix="/media", tags=["Media"])
@@ -17,11 +28,6 @@ router = APIRouter(prefix="/media", tags=["Media"])
 # CONFIGURATION
 # ----------------------------------------------------------------------
 
-# Absolute path resolution (prevents working-directory bugs)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-MEDIA_DIR = os.path.join(BASE_DIR, "static", "uploads")
-os.makedirs(MEDIA_DIR, exist_ok=True)
-
 # Accepted MIME types for uploads
 ALLOWED_MIME_PREFIXES = (
     "image/",            # e.g. image/png, image/jpeg
@@ -39,6 +45,19 @@ ALLOWED_MIME_PREFIXES = (
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB
 
 
+async def _read_upload(file: UploadFile, max_size: int = MAX_FILE_SIZE):
+    """Yield the upload in chunks, aborting as soon as it exceeds `max_size`."""
+    total = 0
+    while chunk := await file.read(DEFAULT_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large (over {max_size / 1024 / 1024:.0f} MB). Max allowed is {max_size / 1024 / 1024:.0f} MB.",
+            )
+        yield chunk
+
+
 # ----------------------------------------------------------------------
 # UPLOAD MEDIA FILE
 # ----------------------------------------------------------------------
@@ -46,12 +65,11 @@ MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB
     "/",
     response_model=MediaRead,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("media.upload"))],
 )
 async def upload_file(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("media.upload")),
 ):
     """Upload a media file and save its metadata."""
 
@@ -64,30 +82,21 @@ async def upload_file(
 
     # --- Prepare unique filename to prevent collisions ---
     unique_name = f"{uuid.uuid4().hex[:12]}_{file.filename.lower()}"
-    file_path = os.path.join(MEDIA_DIR, unique_name)
+    storage_key = shard_key(unique_name)
 
-    # --- Save file to disk ---
+    # --- Stream file into the storage backend (size enforced while streaming) ---
+    storage = get_storage()
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        stored = await storage.put(storage_key, _read_upload(file), content_type=file.content_type)
     finally:
-        file.file.close()
-
-    # --- Check file size after save ---
-    file_size = os.path.getsize(file_path)
-    if file_size > MAX_FILE_SIZE:
-        os.remove(file_path)
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large ({file_size / 1024 / 1024:.2f} MB). Max allowed is {MAX_FILE_SIZE / 1024 / 1024:.0f} MB.",
-        )
+        await file.close()
 
     # --- Prepare DB record ---
     media_in = MediaCreate(
-        filename=unique_name,
-        url=f"/static/uploads/{unique_name}",
+        filename=storage_key,
+        url=storage.url(storage_key),
         mimetype=file.content_type,
-        filesize_bytes=file_size,
+        filesize_bytes=stored.size,
         uploaded_by_user_id=current_user.id,
     )
 
@@ -103,20 +112,228 @@ async def upload_file(
         resource_id=media_obj.id,
     )
 
+    # --- Extract dimensions / duration / page count in the background ---
+    metadata_worker.enqueue(media_obj.id)
+
     return media_obj
 
 
+# ----------------------------------------------------------------------
+# BULK UPLOAD
+# ----------------------------------------------------------------------
+@dataclass
+class _BulkItem:
+    index: int
+    filename: str
+    content_type: Optional[str]
+    chunks: Callable[[], AsyncIterator[bytes]]
+
+
+async def _read_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_size: int = MAX_FILE_SIZE):
+    """Yield a zip member in chunks; the size check also guards against zip bombs."""
+    if info.file_size > max_size:
+        raise HTTPException(status_code=400, detail="File too large")
+    member = await asyncio.to_thread(archive.open, info)
+    try:
+        total = 0
+        while chunk := await asyncio.to_thread(member.read, DEFAULT_CHUNK_SIZE):
+            total += len(chunk)
+            if total > max_size:
+                raise HTTPException(status_code=400, detail="File too large")
+            yield chunk
+    finally:
+        member.close()
+
+
+def _zip_items(archive: zipfile.ZipFile) -> list[_BulkItem]:
+    items = []
+    for info in archive.infolist():
+        name = info.filename.rsplit("/", 1)[-1]
+        if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        items.append(_BulkItem(
+            index=len(items),
+            filename=name,
+            content_type=mimetypes.guess_type(name)[0],
+            chunks=lambda info=info: _read_zip_member(archive, info),
+        ))
+    return items
+
+
+async def _bulk_upload_events(items: list[_BulkItem], db: AsyncSession, user_id: int):
+    """
+    Store files with bounded concurrency, yielding one event per file as it
+    finishes, then insert every Media row (plus one audit entry) in a single
+    transaction and yield the final summary.
+    """
+    storage = get_storage()
+    semaphore = asyncio.Semaphore(settings.MEDIA_BULK_CONCURRENCY)
+
+    async def _store(item: _BulkItem):
+        async with semaphore:
+            if not item.content_type or not item.content_type.startswith(ALLOWED_MIME_PREFIXES):
+                return item, None, f"Unsupported file type: {item.content_type}"
+            key = shard_key(f"{uuid.uuid4().hex[:12]}_{item.filename.lower()}")
+            try:
+                stored = await storage.put(key, item.chunks(), content_type=item.content_type)
+            except HTTPException as e:
+                return item, None, e.detail
+            except Exception as e:
+                return item, None, str(e)
+            return item, MediaCreate(
+                filename=key,
+                url=storage.url(key),
+                mimetype=item.content_type,
+                filesize_bytes=stored.size,
+                uploaded_by_user_id=user_id,
+            ), None
+
+    results: list[dict] = [{} for _ in items]
+    stored: list[tuple[int, MediaCreate]] = []
+    for completed, future in enumerate(asyncio.as_completed([_store(i) for i in items]), start=1):
+        item, media_in, error = await future
+        results[item.index] = {
+            "index": item.index,
+            "filename": item.filename,
+            "status": "error" if error else "stored",
+            "error": error,
+        }
+        if media_in:
+            stored.append((item.index, media_in))
+        yield {"event": "file", "completed": completed, "total": len(items), **results[item.index]}
+
+    stored.sort(key=lambda entry: entry[0])
+    try:
+        media_objs = await crud_media.create_many(db, [m for _, m in stored], performed_by=user_id)
+    except Exception as e:
+        await db.rollback()
+        for _, media_in in stored:
+            await storage.delete(media_in.filename)
+        for index, _ in stored:
+            results[index].update(status="error", error=f"Database error: {e}")
+        media_objs = []
+
+    for (index, _), media_obj in zip(stored, media_objs):
+        results[index].update(status="created", id=media_obj.id, url=media_obj.url)
+        metadata_worker.enqueue(media_obj.id)
+
+    yield {
+        "event": "done",
+        "created": len(media_objs),
+        "failed": len(items) - len(media_objs),
+        "results": results,
+    }
+
+
+@router.post(
+    "/bulk",
+)
+async def bulk_upload(
+    request: Request,
+    files: list[UploadFile] = File(default=[]),
+    archive: Optional[UploadFile] = File(None, description="A .zip archive of files to import"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("media.upload")),
+):
+    """
+    Upload many files at once, as multiple `files` parts and/or one zip `archive`.
+
+    Returns per-file results. With `Accept: application/x-ndjson` the progress is
+    streamed as one JSON event per line while the files are processed.
+    """
+    items = [
+        _BulkItem(
+            index=i,
+            filename=f.filename or f"file-{i}",
+            content_type=f.content_type,
+            chunks=lambda f=f: _read_upload(f),
+        )
+        for i, f in enumerate(files)
+    ]
+    if archive is not None:
+        try:
+            zf = zipfile.ZipFile(archive.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="archive is not a valid zip file")
+        for item in _zip_items(zf):
+            item.index = len(items)
+            items.append(item)
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No files provided")
+    if len(items) > settings.MEDIA_BULK_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files ({len(items)}). Max allowed is {settings.MEDIA_BULK_MAX_FILES}.",
+        )
+
+    events = _bulk_upload_events(items, db, current_user.id)
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        async def _ndjson():
+            async for event in events:
+                yield json.dumps(event) + "\n"
+
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+    async for event in events:
+        summary = event
+    summary.pop("event")
+    return summary
+
+
 # ----------------------------------------------------------------------
 # LIST MEDIA
 # ----------------------------------------------------------------------
+def _media_list_query(mimetype: Optional[str] = None, skip: int = 0, limit: int = 100, sort: str = "-uploaded_at", **filters):
+    """Statement for a streamed listing: every matching row from `skip` (`limit` is not applied)."""
+    if sort.lstrip("-") not in SORTABLE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'")
+    return crud_media.list_query(skip, None, mimetype_prefix=mimetype, sort=sort, **filters)
+
+
 @router.get(
     "/",
     response_model=list[MediaRead],
     dependencies=[Depends(require_permission("media.view"))],
 )
-async def list_media(db: AsyncSession = Depends(get_db)):
-    """List all uploaded media files."""
-    return await crud_media.get_multi(db)
+@streamable(MediaRead, _media_list_query)
+@cached_response(list[MediaRead], tags=["media:list"])
+async def list_media(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    mimetype: Optional[str] = Query(None, description="MIME type prefix, e.g. 'image/'"),
+    min_width: Optional[int] = Query(None, ge=0),
+    max_width: Optional[int] = Query(None, ge=0),
+    min_height: Optional[int] = Query(None, ge=0),
+    max_height: Optional[int] = Query(None, ge=0),
+    min_duration: Optional[float] = Query(None, ge=0),
+    max_duration: Optional[float] = Query(None, ge=0),
+    min_pages: Optional[int] = Query(None, ge=0),
+    max_pages: Optional[int] = Query(None, ge=0),
+    sort: str = Query("-uploaded_at", description=f"One of {', '.join(SORTABLE_FIELDS)}; prefix '-' for descending"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List uploaded media files, filtered and sorted on the extracted metadata.
+    With `Accept: application/x-ndjson` or `?stream=true` every match is streamed.
+    """
+    if sort.lstrip("-") not in SORTABLE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'")
+    return await crud_media.get_multi(
+        db,
+        skip=skip,
+        limit=limit,
+        mimetype_prefix=mimetype,
+        min_width=min_width,
+        max_width=max_width,
+        min_height=min_height,
+        max_height=max_height,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        min_pages=min_pages,
+        max_pages=max_pages,
+        sort=sort,
+    )
 
 
 # ----------------------------------------------------------------------
@@ -125,26 +342,24 @@ async def list_media(db: AsyncSession = Depends(get_db)):
 @router.delete(
     "/{media_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("media.delete"))],
 )
 async def delete_media(
     media_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("media.delete")),
 ):
-    """Delete a media file both from DB and disk."""
+    """Delete a media file both from DB and storage."""
     media = await crud_media.get(db, id=media_id)
     if not media:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found")
 
-    # Remove file from disk if it exists
-    file_path = os.path.join(MEDIA_DIR, media.filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
-
-    # Remove metadata from DB
+    # Remove metadata from DB first: if this fails the file is kept, and a file
+    # left behind by a failed storage delete is picked up by `gc-media`
     await crud_media.delete(db, id=media_id, performed_by=current_user.id)
 
+    # Remove file from storage if it exists
+    await get_storage().delete(media.filename)
+
     # Record audit log
     await record_audit_log(
         db=db,
@@ -5,7 +5,9 @@ from app.schemas import PageBlockCreate, PageBlockRead, PageBlockUpdate
 from app.crud import crud_page_block
 from app.db.session import get_db
 from app.core.permissions import require_permission
-from app.core.auth_deps import get_current_user
+from app.core.auth_deps import Principal
+from app.core.response_cache import cached_response
+from app.core.streaming import streamable
 
 router = APIRouter(prefix="/page-blocks", tags=["Page Blocks"])
 
@@ -17,12 +19,11 @@ router = APIRouter(prefix="/page-blocks", tags=["Page Blocks"])
     "/",
     response_model=PageBlockRead,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("content.create"))]
 )
 async def create_page_block(
     block_in: PageBlockCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("content.create")),
 ):
     return await crud_page_block.create(db, obj_in=block_in, performed_by=current_user.id)
 
@@ -35,10 +36,13 @@ async def create_page_block(
     response_model=list[PageBlockRead],
     dependencies=[Depends(require_permission("content.view"))]
 )
+@streamable(PageBlockRead, crud_page_block.list_query)
+@cached_response(list[PageBlockRead], tags=["page_blocks:list"])
 async def list_page_blocks(page_id: int | None = None, db: AsyncSession = Depends(get_db)):
+    """A page's blocks, or the latest 100; streamed (every block) with `Accept: application/x-ndjson` or `?stream=true`."""
     if page_id:
         return await crud_page_block.get_by_page(db, page_id=page_id)
-    return await crud_page_block.get_all(db)
+    return await crud_page_block.get_multi(db)
 
 
 # -------------------------
@@ -49,6 +53,7 @@ async def list_page_blocks(page_id: int | None = None, db: AsyncSession = Depend
     response_model=PageBlockRead,
     dependencies=[Depends(require_permission("content.view"))]
 )
+@cached_response(PageBlockRead, tags=["page_block:{block_id}"])
 async def get_page_block(block_id: int, db: AsyncSession = Depends(get_db)):
     block = await crud_page_block.get(db, id=block_id)
     if not block:
@@ -62,13 +67,12 @@ async def get_page_block(block_id: int, db: AsyncSession = Depends(get_db)):
 @router.put(
     "/{block_id}",
     response_model=PageBlockRead,
-    dependencies=[Depends(require_permission("content.edit"))]
 )
 async def update_page_block(
     block_id: int,
     block_in: PageBlockUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("content.edit")),
 ):
     block = await crud_page_block.get(db, id=block_id)
     if not block:
@@ -82,12 +86,11 @@ async def update_page_block(
 @router.delete(
     "/{block_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("content.delete"))]
 )
 async def delete_page_block(
     block_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("content.delete")),
 ):
     block = await crud_page_block.get(db, id=block_id)
     if not block:
@@ -5,7 +5,8 @@ from app.schemas import PageCreate, PageRead, PageUpdate
 from app.crud import crud_page
 from app.db.session import get_db
 from app.core.permissions import require_permission
-from app.core.auth_deps import get_current_user
+from app.core.auth_deps import Principal
+from app.core.response_cache import cached_response
 
 router = APIRouter(prefix="/pages", tags=["Pages"])
 
@@ -16,12 +17,11 @@ router = APIRouter(prefix="/pages", tags=["Pages"])
     "/",
     response_model=PageRead,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("content.create"))]
 )
 async def create_page(
     page_in: PageCreate,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("content.create")),
 ):
     return await crud_page.create(db, obj_in=page_in, performed_by=current_user.id)
 
@@ -34,6 +34,7 @@ async def create_page(
     response_model=list[PageRead],
     dependencies=[Depends(require_permission("content.view"))]
 )
+@cached_response(list[PageRead], tags=["pages:list"])
 async def list_pages(db: AsyncSession = Depends(get_db)):
     """List all pages in descending order of creation."""
     return await crud_page.get_multi(db)
@@ -47,6 +48,7 @@ async def list_pages(db: AsyncSession = Depends(get_db)):
     response_model=PageRead,
     dependencies=[Depends(require_permission("content.view"))]
 )
+@cached_response(PageRead, tags=["page:{page_id}"])
 async def get_page(page_id: int, db: AsyncSession = Depends(get_db)):
     page = await crud_page.get(db, id=page_id)
     if not page:
@@ -60,13 +62,12 @@ async def get_page(page_id: int, db: AsyncSession = Depends(get_db)):
 @router.put(
     "/{page_id}",
     response_model=PageRead,
-    dependencies=[Depends(require_permission("content.edit"))]
 )
 async def update_page(
     page_id: int,
     page_in: PageUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("content.edit")),
 ):
     page = await crud_page.get(db, id=page_id)
     if not page:
@@ -80,12 +81,11 @@ async def update_page(
 @router.delete(
     "/{page_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("content.delete"))]
 )
 async def delete_page(
     page_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("content.delete")),
 ):
     page = await crud_page.get(db, id=page_id)
     if not page:
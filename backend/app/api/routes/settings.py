@@ -1,16 +1,27 @@
 # app/api/routes/settings.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas import SiteSettingCreate, SiteSettingRead, SiteSettingUpdate
+from app.schemas import SiteSettingCreate, SiteSettingRead, SiteSettingUpdate, SiteSettingsPatch
+from app.schemas.site_setting import validate_setting_value
 from app.crud import crud_site_setting
 from app.db.session import get_db
 from app.core.permissions import require_permission
-from app.core.auth_deps import get_current_user
+from app.core.auth_deps import Principal
+from app.core.response_cache import cached_response
+from app.core.settings_snapshot import settings_snapshot
 
 router = APIRouter(prefix="/site-settings", tags=["Site Settings"])
 
 
+def _validated(key: str, value):
+    """Validate a value against its per-key schema, mapping failures to 422."""
+    try:
+        return validate_setting_value(key, value)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
 # -------------------------
 # LIST ALL SETTINGS (Admin)
 # -------------------------
@@ -19,11 +30,33 @@ router = APIRouter(prefix="/site-settings", tags=["Site Settings"])
     response_model=list[SiteSettingRead],
     dependencies=[Depends(require_permission("site.settings.view"))],
 )
+@cached_response(list[SiteSettingRead], tags=["settings:list"])
 async def list_settings(db: AsyncSession = Depends(get_db)):
     """Return all site configuration settings (admin only)."""
     return await crud_site_setting.get_all(db)
 
 
+# -------------------------
+# PUBLIC SETTINGS (No Auth)
+# -------------------------
+# Declared before "/{key}" so "public" is not captured as a setting key.
+@router.get(
+    "/public",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+)
+async def get_public_settings(if_none_match: str | None = Header(None)):
+    """
+    Publicly accessible endpoint for the frontend site.
+    Served from the in-memory snapshot (no DB query); the ETag is the settings version.
+    """
+    await settings_snapshot.ensure_loaded()
+    headers = {"ETag": settings_snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match == settings_snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=settings_snapshot.body, media_type="application/json", headers=headers)
+
+
 # -------------------------
 # GET ONE SETTING BY KEY (Admin)
 # -------------------------
@@ -32,6 +65,7 @@ async def list_settings(db: AsyncSession = Depends(get_db)):
     response_model=SiteSettingRead,
     dependencies=[Depends(require_permission("site.settings.view"))],
 )
+@cached_response(SiteSettingRead, tags=["setting:{key}"])
 async def get_setting(key: str, db: AsyncSession = Depends(get_db)):
     """Retrieve a specific setting by its unique key."""
     setting = await crud_site_setting.get(db, key=key)
@@ -47,12 +81,11 @@ async def get_setting(key: str, db: AsyncSession = Depends(get_db)):
     "/",
     response_model=SiteSettingRead,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("site.settings.edit"))],
 )
 async def create_setting(
     setting_in: SiteSettingCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("site.settings.edit")),
 ):
     """Create a new configuration setting."""
     existing = await crud_site_setting.get(db, key=setting_in.key)
@@ -61,6 +94,7 @@ async def create_setting(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Setting with key '{setting_in.key}' already exists",
         )
+    setting_in.value = _validated(setting_in.key, setting_in.value)
     return await crud_site_setting.create(db, obj_in=setting_in, performed_by=current_user.id)
 
 
@@ -70,18 +104,18 @@ async def create_setting(
 @router.put(
     "/{key}",
     response_model=SiteSettingRead,
-    dependencies=[Depends(require_permission("site.settings.edit"))],
 )
 async def update_setting(
     key: str,
     setting_in: SiteSettingUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("site.settings.edit")),
 ):
     """Update an existing setting by its key."""
     setting = await crud_site_setting.get(db, key=key)
     if not setting:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Setting not found")
+    setting_in.value = _validated(key, setting_in.value)
     return await crud_site_setting.update(
         db, db_obj=setting, obj_in=setting_in, performed_by=current_user.id
     )
@@ -93,12 +127,11 @@ async def update_setting(
 @router.delete(
     "/{key}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("site.settings.edit"))],
 )
 async def delete_setting(
     key: str,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("site.settings.edit")),
 ):
     """Delete a setting by its key."""
     setting = await crud_site_setting.get(db, key=key)
@@ -107,44 +140,48 @@ async def delete_setting(
     await crud_site_setting.remove(db, key=key, performed_by=current_user.id)
 
 
-# -------------------------
-# PUBLIC SETTINGS (No Auth)
-# -------------------------
-@router.get(
-    "/public",
-    response_model=dict,
-    status_code=status.HTTP_200_OK,
-)
-async def get_public_settings(db: AsyncSession = Depends(get_db)):
-    """Publicly accessible endpoint for the frontend site."""
-    settings = await crud_site_setting.get_all(db)
-    return {s.key: s.value for s in settings}
-
-
 # -------------------------
 # UPSERT SETTING BY KEY (Admin)
 # -------------------------
 @router.post(
     "/upsert/{key}",
     response_model=SiteSettingRead,
-    dependencies=[Depends(require_permission("site.settings.edit"))],
 )
 async def upsert_setting(
     key: str,
     setting_in: SiteSettingUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("site.settings.edit")),
 ):
     """
-    Create or update a setting by key.
-    If the key exists, update the value; otherwise, create a new setting.
+    Create or update a setting by key in a single INSERT ... ON CONFLICT statement.
     """
-    existing = await crud_site_setting.get(db, key=key)
-    if existing:
-        return await crud_site_setting.update(
-            db, db_obj=existing, obj_in=setting_in, performed_by=current_user.id
-        )
+    settings = await crud_site_setting.upsert_many(
+        db,
+        {key: _validated(key, setting_in.value)},
+        performed_by=current_user.id,
+        action="upsert",
+    )
+    return settings[0]
+
 
-    # Key does not exist, create new
-    new_setting = SiteSettingCreate(key=key, value=setting_in.value)
-    return await crud_site_setting.create(db, obj_in=new_setting, performed_by=current_user.id)
+# -------------------------
+# BULK UPSERT SETTINGS (Admin)
+# -------------------------
+@router.patch(
+    "/",
+    response_model=list[SiteSettingRead],
+)
+async def patch_settings(
+    patch_in: SiteSettingsPatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("site.settings.edit")),
+):
+    """
+    Create or update many settings at once. Every value is validated first;
+    the upsert and its single audit entry then run in one transaction.
+    """
+    values = {key: _validated(key, value) for key, value in patch_in.values.items()}
+    if not values:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No settings provided")
+    return await crud_site_setting.upsert_many(db, values, performed_by=current_user.id)
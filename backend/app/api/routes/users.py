@@ -5,7 +5,8 @@ from app.schemas import UserCreate, UserRead, UserUpdate
 from app.crud import crud_user
 from app.db.session import get_db
 from app.core.permissions import require_permission
-from app.core.auth_deps import get_current_user
+from app.core.auth_deps import Principal
+from app.core.responses import json_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -16,12 +17,11 @@ router = APIRouter(prefix="/users", tags=["Users"])
     "/", 
     response_model=UserRead,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("users.create"))]
 )
 async def create_user(
     user_in: UserCreate,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("users.create")),
 ):
     return await crud_user.create(db, obj_in=user_in, performed_by=current_user.id)
 
@@ -35,7 +35,7 @@ async def create_user(
     dependencies=[Depends(require_permission("users.view"))]
 )
 async def list_users(db: AsyncSession = Depends(get_db)):
-    return await crud_user.get_multi(db)
+    return json_response(list[UserRead], await crud_user.get_multi(db))
 
 
 # -------------------------
@@ -59,13 +59,12 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
 @router.put(
     "/{user_id}",
     response_model=UserRead,
-    dependencies=[Depends(require_permission("users.edit"))]
 )
 async def update_user(
     user_id: int,
     user_in: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("users.edit")),
 ):
     user = await crud_user.get(db, id=user_id)
     if not user:
@@ -80,12 +79,11 @@ async def update_user(
 @router.delete(
     "/{user_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("users.delete"))],
 )
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: Principal = Depends(require_permission("users.delete")),
 ):
     user = await crud_user.get(db, id=user_id)
     if not user:
@@ -0,0 +1,47 @@
+# app/cli/__init__.py
+"""
+Maintenance commands for the CMS backend.
+
+Run from the backend directory:
+
+    python -m app.cli <command> [options]
+"""
+import argparse
+import asyncio
+
+from app.cli import (
+    export_content,
+    extract_metadata,
+    gc_media,
+    import_content,
+    migrate_uploads,
+    rotate_jwt_key,
+    seed_bench,
+)
+from app.core.invalidation_bus import invalidation_bus
+from app.db.session import engine
+
+# Each command module exposes NAME, HELP, add_arguments(parser) and `async run(args)`
+COMMANDS = [migrate_uploads, gc_media, extract_metadata, rotate_jwt_key, export_content, import_content, seed_bench]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in COMMANDS:
+        sub = subparsers.add_parser(command.NAME, help=command.HELP, description=command.HELP)
+        command.add_arguments(sub)
+        sub.set_defaults(run=command.run)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args)) or 0
+
+
+async def _run(args) -> int:
+    try:
+        return await args.run(args)
+    finally:
+        # Let running workers drop caches for anything this command changed
+        await invalidation_bus.flush()
+        # Close pooled connections (aiosqlite's connection threads keep the process alive)
+        await engine.dispose()
@@ -0,0 +1,28 @@
+# app/cli/export_content.py
+"""Write every page, block, media row (plus files) and site setting to an archive."""
+from app.core.content_transfer import iter_archive, iter_content
+
+NAME = "export"
+HELP = "Export site content to a tar archive (.tar / .tar.gz) or a bare .ndjson file."
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("output", help="Archive path; .tar.gz / .tgz is compressed, .ndjson skips media files.")
+    parser.add_argument("--no-media", action="store_true", help="Leave the media files out of the tar.")
+
+
+async def run(args) -> int:
+    if args.output.endswith(".ndjson"):
+        chunks = iter_content()
+    else:
+        chunks = iter_archive(
+            include_media=not args.no_media,
+            compress=args.output.endswith((".gz", ".tgz")),
+        )
+    size = 0
+    with open(args.output, "wb") as fh:
+        async for chunk in chunks:
+            fh.write(chunk)
+            size += len(chunk)
+    print(f"✅ Exported site content to {args.output} ({size / 1024 / 1024:.1f} MB)")
+    return 0
@@ -0,0 +1,32 @@
+# app/cli/extract_metadata.py
+"""Backfill extracted metadata for media rows that have never been processed."""
+from sqlalchemy import select
+
+from app.core.media_metadata import MediaMetadataWorker
+from app.db.models.media import Media
+from app.db.session import AsyncSessionLocal
+
+NAME = "extract-metadata"
+HELP = "Extract width/height/duration/page count for media rows missing them."
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent extractions.")
+    parser.add_argument("--all", action="store_true", help="Re-process rows that already have metadata.")
+
+
+async def run(args) -> int:
+    worker = MediaMetadataWorker(concurrency=args.workers, backoff_seconds=0.5)
+    if args.all:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(select(Media.id).order_by(Media.id))).scalars().all()
+        for media_id in ids:
+            worker.enqueue(media_id)
+        count = len(ids)
+    else:
+        count = await worker.enqueue_unprocessed()
+    await worker.start()
+    await worker.drain()
+    await worker.stop()
+    print(f"✅ Processed {count} media rows.")
+    return 0
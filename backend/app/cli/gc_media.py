@@ -0,0 +1,33 @@
+# app/cli/gc_media.py
+"""Report (and optionally delete) orphan media files and dangling `Media` rows."""
+from datetime import timedelta
+
+from app.core.media_gc import reconcile_media
+
+NAME = "gc-media"
+HELP = "Reconcile stored media files with the media table (dry run by default)."
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--delete-files", action="store_true", help="Delete files that have no Media row.")
+    parser.add_argument("--delete-rows", action="store_true", help="Delete Media rows whose file is missing.")
+    parser.add_argument("--rate", type=float, default=50.0, help="Maximum deletes per second.")
+    parser.add_argument("--grace-minutes", type=int, default=60, help="Never delete files newer than this.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per query.")
+
+
+async def run(args) -> int:
+    report = await reconcile_media(
+        delete_files=args.delete_files,
+        delete_rows=args.delete_rows,
+        max_deletes_per_second=args.rate,
+        grace_period=timedelta(minutes=args.grace_minutes),
+        batch_size=args.batch_size,
+    )
+    mode = "delete" if args.delete_files or args.delete_rows else "dry run"
+    print(f"🧹 Media GC ({mode}): {report.summary()}")
+    for key in report.orphan_samples:
+        print(f"  orphan file: {key}")
+    for media_id in report.dangling_samples:
+        print(f"  dangling row: media {media_id}")
+    return 0
@@ -0,0 +1,50 @@
+# app/cli/import_content.py
+"""Load an archive written by `export` (or the export endpoint) into this database."""
+from app.core.content_transfer import ContentImportError, ImportOptions, import_archive
+from app.db.session import AsyncSessionLocal
+
+NAME = "import"
+HELP = "Import site content from an export archive (.tar / .tar.gz / .ndjson)."
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("archive", help="Archive written by the export command or endpoint.")
+    parser.add_argument(
+        "--ids", choices=("preserve", "remap"), default="preserve",
+        help="Keep the exported ids, or give every row a new id (blocks follow their pages).",
+    )
+    parser.add_argument(
+        "--replace", action="store_true",
+        help="Delete the existing pages (with blocks and revisions), media rows and settings first.",
+    )
+    parser.add_argument(
+        "--chunked", action="store_true",
+        help="Commit every batch instead of one transaction; re-running skips rows already imported.",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows inserted per statement.")
+    parser.add_argument("--user-id", type=int, help="Owner of rows whose user does not exist here (default: first admin).")
+
+
+async def run(args) -> int:
+    options = ImportOptions(
+        ids=args.ids,
+        replace=args.replace,
+        chunked=args.chunked,
+        batch_size=args.batch_size,
+        user_id=args.user_id,
+    )
+    try:
+        with open(args.archive, "rb") as fh:
+            async with AsyncSessionLocal() as db:
+                report = await import_archive(db, fh, options)
+    except ContentImportError as e:
+        print(f"❌ Import failed: {e}")
+        if args.chunked:
+            print("ℹ️ Batches committed so far are kept; re-run the same command to resume.")
+        return 1
+
+    counts = ", ".join(f"{count} {table}" for table, count in report.rows.items())
+    print(f"✅ Imported {counts} and {report.media_files} media files in {report.seconds:.1f}s")
+    for table, count in report.skipped.items():
+        print(f"ℹ️ Skipped {count} {table} rows that were already imported")
+    return 0
@@ -0,0 +1,102 @@
+# app/cli/migrate_uploads.py
+"""
+Move flat uploads (`uploads/<name>`) into the sharded layout (`uploads/ab/cd/<name>`).
+
+The migration is online-safe and resumable:
+
+1. each batch copies (hard-links locally) the files to their sharded key,
+2. rewrites `Media.filename` / `Media.url` for the batch and commits,
+3. with `--delete-old`, only then deletes the old flat files.
+
+The old files are kept by default: page content may embed the old
+`/uploads/<name>` URLs, which keep working. `gc-media` leaves a kept file alone
+while a row points at its sharded copy. A re-run simply picks up the rows
+whose `filename` is still flat.
+"""
+import time
+
+from sqlalchemy import func, select
+
+from app.core.response_cache import invalidate_tags
+from app.core.storage import StorageError, get_storage, shard_key
+from app.db.models.media import Media
+from app.db.session import AsyncSessionLocal
+
+NAME = "migrate-uploads"
+HELP = "Move existing media files into the hash-prefix sharded directory layout."
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows migrated per transaction.")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would move without changing anything.")
+    parser.add_argument(
+        "--delete-old",
+        action="store_true",
+        help="Delete the flat files once their row is migrated (breaks old URLs embedded in content).",
+    )
+
+
+def _flat_media():
+    # Sharded keys always contain a "/", flat ones never do
+    return Media.filename.not_like("%/%")
+
+
+async def run(args) -> int:
+    storage = get_storage()
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(select(func.count()).select_from(Media).where(_flat_media()))
+    if args.limit is not None:
+        total = min(total, args.limit)
+    print(f"ℹ️ {total} media rows use the flat layout.")
+
+    done = missing = 0
+    last_id = 0
+    started = time.monotonic()
+    while done + missing < total:
+        batch_size = min(args.batch_size, total - done - missing)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Media)
+                .where(_flat_media(), Media.id > last_id)
+                .order_by(Media.id)
+                .limit(batch_size)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            old_keys = []
+            for media in rows:
+                new_key = shard_key(media.filename)
+                if args.dry_run:
+                    continue
+                try:
+                    await storage.copy(media.filename, new_key)
+                except StorageError:
+                    # A previous run may have moved the file but not committed the row
+                    if await storage.stat(new_key) is None:
+                        print(f"⚠️ media {media.id}: file {media.filename!r} is missing, skipping")
+                        missing += 1
+                        continue
+                old_keys.append(media.filename)
+                media.filename = new_key
+                media.url = storage.url(new_key)
+
+            if not args.dry_run:
+                await db.commit()
+                # Cached listings still point at the old URLs
+                await invalidate_tags("media:list")
+                if args.delete_old:
+                    for key in old_keys:
+                        await storage.delete(key)
+            done += len(old_keys) if not args.dry_run else len(rows)
+
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0.0
+        print(f"… {done}/{total} migrated, {missing} missing ({rate:.0f} rows/s)")
+
+    verb = "would be migrated" if args.dry_run else "migrated"
+    print(f"✅ {done} media rows {verb}; {missing} skipped because their file is missing.")
+    return 0
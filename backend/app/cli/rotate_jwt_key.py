@@ -0,0 +1,80 @@
+# app/cli/rotate_jwt_key.py
+"""Generate a new JWT signing key and schedule it in the keyset file."""
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.core.config import settings
+from app.core.jwt_keys import KeySet
+
+NAME = "rotate-jwt-key"
+HELP = "Add a new signing key to JWT_KEYSET_FILE and retire the current ones after an overlap."
+
+GENERATORS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--keyset", default=settings.JWT_KEYSET_FILE, help="Keyset file (created if missing).")
+    parser.add_argument("--alg", choices=sorted(GENERATORS), default="EdDSA")
+    parser.add_argument("--kid", help="Key id (default: current UTC timestamp).")
+    parser.add_argument(
+        "--activate-in-hours", type=float, default=24,
+        help="Publish now, start signing after this delay (lets JWKS caches refresh). "
+             "Ignored while no key in the keyset can sign.",
+    )
+    parser.add_argument(
+        "--overlap-days", type=float, default=8,
+        help="Keep accepting older keys this long after activation (>= refresh token lifetime).",
+    )
+
+
+async def run(args) -> int:
+    if not args.keyset:
+        print("❌ No keyset file: pass --keyset or set JWT_KEYSET_FILE")
+        return 1
+
+    path = Path(args.keyset)
+    keyset = json.loads(path.read_text()) if path.exists() else {"keys": []}
+    now = datetime.now(timezone.utc)
+    kid = args.kid or now.strftime("%Y%m%d%H%M%S")
+    if any(entry["kid"] == kid for entry in keyset["keys"]):
+        print(f"❌ Key id {kid!r} already exists")
+        return 1
+
+    activate_at = now + timedelta(hours=args.activate_in_hours)
+    if not path.exists() or not any(key.can_sign(now) for key in KeySet.load_file(str(path))):
+        # With a keyset file the legacy HMAC key only verifies: a delayed first key
+        # would leave nothing to sign logins and refreshes with until it activates
+        activate_at = now
+        print("ℹ️ No key in the keyset can sign now: the new key signs immediately.")
+    retire_at = activate_at + timedelta(days=args.overlap_days)
+    for entry in keyset["keys"]:
+        entry.setdefault("not_after", retire_at.isoformat())
+
+    pem = GENERATORS[args.alg]().private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    key_file = path.parent / "keys" / f"{kid}.pem"
+    key_file.parent.mkdir(parents=True, exist_ok=True)
+    key_file.write_bytes(pem)
+    key_file.chmod(0o600)
+
+    keyset["keys"].append({
+        "kid": kid,
+        "alg": args.alg,
+        "private_key_file": str(key_file.relative_to(path.parent)),
+        "not_before": activate_at.isoformat(),
+    })
+    path.write_text(json.dumps(keyset, indent=2) + "\n")
+    print(f"✅ Added {args.alg} key {kid!r}: signs from {activate_at:%Y-%m-%d %H:%M} UTC, "
+          f"older keys retire at {retire_at:%Y-%m-%d %H:%M} UTC. Restart workers to load it.")
+    return 0
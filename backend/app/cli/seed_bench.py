@@ -0,0 +1,386 @@
+# app/cli/seed_bench.py
+"""
+Generate a synthetic, production-sized dataset for benchmarks and capacity planning.
+
+Everything is derived from `--seed` and the ids already in the database, so
+runs against identical databases produce identical rows. Ids are assigned
+here (continuing after the current maximum), which lets rows reference each
+other without round trips. Rows are written in batches: COPY on Postgres
+(asyncpg `copy_records_to_table`), multi-row INSERTs elsewhere.
+
+Every generated user's password is `bench-password`.
+"""
+import asyncio
+import itertools
+import json
+import random
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy import JSON, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.invalidation_bus import ALL_KEYS
+from app.core.response_cache import invalidate_tags
+from app.core.security import get_password_hash
+from app.core.storage import get_storage, shard_key
+from app.crud.settings import crud_site_setting
+from app.db.models import AuditLog, Media, Page, PageBlock, PageRevision, SiteSetting, User
+from app.db.sequences import sync_id_sequences
+from app.db.session import AsyncSessionLocal, engine
+
+NAME = "seed-bench"
+HELP = "Generate a deterministic synthetic dataset (users, pages, blocks, revisions, media, audit logs)."
+
+PASSWORD = "bench-password"
+
+# All generated timestamps fall in the year after this instant (keeps runs reproducible)
+EPOCH = datetime(2024, 1, 1)
+YEAR_SECONDS = 365 * 86400
+
+WORDS = (
+    "community water health school garden report volunteer project annual donate "
+    "education youth women support local program impact story event training clinic "
+    "partner village market climate energy family future rights learning access news"
+).split()
+
+IMAGE_SIZES = ((640, 480), (800, 600), (1024, 768), (1280, 720), (1920, 1080), (512, 512), (1080, 1350))
+COLORS = ("#2e7d32", "#1565c0", "#f9a825", "#c62828", "#6a1b9a", "#00838f", "#4e342e", "#eceff1")
+
+
+@dataclass
+class Volumes:
+    users: int = 200
+    pages: int = 2000
+    blocks_per_page: int = 8
+    revisions_per_page: int = 3
+    media: int = 5000
+    audit_logs: int = 1_000_000
+
+
+def add_arguments(parser) -> None:
+    defaults = Volumes()
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; same seed + same database = same data.")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--pages", type=int, default=defaults.pages)
+    parser.add_argument("--blocks-per-page", type=int, default=defaults.blocks_per_page, help="Average; varies per page.")
+    parser.add_argument("--revisions-per-page", type=int, default=defaults.revisions_per_page, help="Average; varies per page.")
+    parser.add_argument("--media", type=int, default=defaults.media)
+    parser.add_argument("--audit-logs", type=int, default=defaults.audit_logs)
+    parser.add_argument("--no-media-files", action="store_true", help="Only create the media rows, not the stored files.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per COPY / INSERT.")
+
+
+# ==========================
+# 🎲 ROW GENERATORS
+# ==========================
+def _timestamp(rng: random.Random) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(YEAR_SECONDS))
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return "\n\n".join(_words(rng, rng.randint(30, 120)).capitalize() + "." for _ in range(count))
+
+
+def _block_content(rng: random.Random, block_type: str, media_urls: List[str]) -> Dict[str, Any]:
+    image = lambda: rng.choice(media_urls) if media_urls else "/static/placeholder.png"  # noqa: E731
+    if block_type == "text":
+        return {"text": _paragraphs(rng, rng.randint(1, 4)), "align": rng.choice(["left", "center"])}
+    if block_type == "hero":
+        return {
+            "title": _words(rng, 4).title(),
+            "subtitle": _words(rng, 12),
+            "image": image(),
+            "cta": {"label": _words(rng, 2).title(), "href": f"/{rng.choice(WORDS)}"},
+        }
+    if block_type == "image":
+        return {"src": image(), "alt": _words(rng, 6), "caption": _words(rng, 10)}
+    if block_type == "gallery":
+        return {"images": [{"src": image(), "alt": _words(rng, 4)} for _ in range(rng.randint(3, 12))], "columns": rng.choice([2, 3, 4])}
+    if block_type == "video":
+        return {"provider": "youtube", "id": f"{rng.getrandbits(40):010x}", "autoplay": False}
+    # Custom blocks carry free-form nested data
+    return {
+        "component": rng.choice(["stats", "donate_form", "team", "faq"]),
+        "items": [{"label": _words(rng, 2).title(), "value": rng.randint(1, 100000), "tags": _words(rng, 3).split()}
+                  for _ in range(rng.randint(2, 8))],
+    }
+
+
+BLOCK_TYPES = ("text", "hero", "image", "gallery", "video", "custom")
+BLOCK_WEIGHTS = (45, 8, 20, 10, 5, 12)
+
+AUDIT_ACTIONS = (
+    ("login", "user", 35),
+    ("update", "page", 20),
+    ("create", "page", 5),
+    ("update", "page_block", 15),
+    ("create", "page_block", 8),
+    ("upload", "media", 8),
+    ("delete", "media", 2),
+    ("bulk_update", "site_setting", 2),
+    ("logout", "user", 5),
+)
+
+
+# ==========================
+# 🖼️ MEDIA FILES
+# ==========================
+@lru_cache(maxsize=None)
+def _png(width: int, height: int, color: str) -> bytes:
+    """Solid-colour PNG of the given size (cached: few distinct sizes and colours)."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    rgb = bytes.fromhex(color[1:])
+    raw = (b"\x00" + rgb * width) * height
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _pdf(pages: int) -> bytes:
+    """Minimal valid PDF with `pages` blank pages."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (3 + i) for i in range(pages)) + b"] /Count %d >>" % pages,
+        *(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>" for _ in range(pages)),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# ==========================
+# 💾 WRITING
+# ==========================
+async def _write(conn: AsyncConnection, model, rows: Iterable[Dict[str, Any]], batch_size: int) -> int:
+    """COPY (Postgres) or multi-row INSERT the rows in batches; returns the row count."""
+    table = model.__table__
+    json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+    copy = conn.dialect.name == "postgresql"
+    driver = (await conn.get_raw_connection()).driver_connection if copy else None
+    rows = iter(rows)
+    total = 0
+    while batch := list(itertools.islice(rows, batch_size)):
+        if copy:
+            columns = list(batch[0])
+            records = [
+                tuple(json.dumps(row[c]) if c in json_columns else row[c] for c in columns)
+                for row in batch
+            ]
+            await driver.copy_records_to_table(table.name, records=records, columns=columns)
+        else:
+            await conn.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+async def _next_id(conn: AsyncConnection, model) -> int:
+    return (await conn.scalar(select(func.max(model.id)))) or 0
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    volumes = Volumes(
+        users=args.users,
+        pages=args.pages,
+        blocks_per_page=args.blocks_per_page,
+        revisions_per_page=args.revisions_per_page,
+        media=args.media,
+        audit_logs=args.audit_logs,
+    )
+    print(f"ℹ️ Seeding {volumes} with seed {args.seed} ({engine.dialect.name})")
+    started = time.monotonic()
+    counts: Dict[str, int] = {}
+
+    async def timed(name: str, model, rows: Iterable[Dict[str, Any]]) -> None:
+        step = time.monotonic()
+        async with engine.begin() as conn:
+            counts[name] = await _write(conn, model, rows, args.batch_size)
+            await sync_id_sequences(conn, [model.__tablename__])
+        elapsed = time.monotonic() - step
+        print(f"… {counts[name]:>10,} {name:<14} {elapsed:6.1f}s ({counts[name] / elapsed if elapsed else 0:,.0f} rows/s)")
+
+    async with engine.connect() as conn:
+        start = {model: await _next_id(conn, model) for model in (User, Page, PageBlock, PageRevision, Media, AuditLog)}
+        existing_admins = list((await conn.execute(select(User.id).where(User.role == "admin"))).scalars())
+        existing_users = list((await conn.execute(select(User.id))).scalars())
+
+    # --- Users ---
+    hashed = get_password_hash(PASSWORD)
+    users = []
+    for i in range(volumes.users):
+        user_id = start[User] + 1 + i
+        created = _timestamp(rng)
+        users.append({
+            "id": user_id,
+            "email": f"bench{user_id}@example.com",
+            "hashed_password": hashed,
+            "role": rng.choices(("admin", "editor", "public"), weights=(2, 28, 70))[0],
+            "is_active": rng.random() < 0.95,
+            "created_at": created,
+            "updated_at": created,
+            "last_token_issue": None,
+            "token_epoch": 0,
+        })
+    await timed("users", User, users)
+    authors = [u["id"] for u in users if u["role"] in ("admin", "editor")] or existing_admins
+    if not authors:
+        print("❌ No admin or editor to author content: generate some users or run the app once first")
+        return 1
+    all_users = existing_users + [u["id"] for u in users]
+
+    # --- Media (before blocks, which reference media URLs) ---
+    storage = get_storage()
+    media_rows, files = [], []
+    for i in range(volumes.media):
+        media_id = start[Media] + 1 + i
+        kind = rng.choices(("image", "pdf", "text"), weights=(65, 20, 15))[0]
+        row = {
+            "id": media_id,
+            "uploaded_by_user_id": rng.choice(authors),
+            "uploaded_at": _timestamp(rng),
+            "width": None, "height": None, "duration_seconds": None, "page_count": None, "dominant_color": None,
+        }
+        if kind == "image":
+            (width, height), color = rng.choice(IMAGE_SIZES), rng.choice(COLORS)
+            data = _png(width, height, color)
+            row.update(mimetype="image/png", width=width, height=height, dominant_color=color)
+            name = f"{_words(rng, 2).replace(' ', '-')}.png"
+        elif kind == "pdf":
+            pages = rng.randint(1, 40)
+            data = _pdf(pages)
+            row.update(mimetype="application/pdf", page_count=pages)
+            name = f"{_words(rng, 2).replace(' ', '-')}.pdf"
+        else:
+            data = _paragraphs(rng, rng.randint(1, 6)).encode()
+            row.update(mimetype="text/plain")
+            name = f"{_words(rng, 2).replace(' ', '-')}.txt"
+        key = shard_key(f"bench{media_id}_{name}")
+        row.update(filename=key, url=storage.url(key), filesize_bytes=len(data), metadata_extracted_at=row["uploaded_at"])
+        media_rows.append(row)
+        files.append((key, data, row["mimetype"]))
+    await timed("media", Media, media_rows)
+    if not args.no_media_files:
+        step = time.monotonic()
+
+        async def _put(key: str, data: bytes, content_type: str) -> None:
+            async def _chunks():
+                yield data
+            await storage.put(key, _chunks(), content_type=content_type)
+
+        for i in range(0, len(files), 32):
+            await asyncio.gather(*(_put(*item) for item in files[i:i + 32]))
+        print(f"… {len(files):>10,} media files    {time.monotonic() - step:6.1f}s")
+    media_urls = [row["url"] for row in media_rows if row["mimetype"].startswith("image/")]
+
+    # --- Pages, revisions and blocks ---
+    pages, revisions, blocks = [], [], []
+    revision_id, block_id = start[PageRevision], start[PageBlock]
+    for i in range(volumes.pages):
+        page_id = start[Page] + 1 + i
+        created = _timestamp(rng)
+        updated = created + timedelta(seconds=rng.randrange(30 * 86400))
+        pages.append({
+            "id": page_id,
+            "slug": f"bench-{page_id}-{_words(rng, 2).replace(' ', '-')}",
+            "title": _words(rng, rng.randint(2, 7)).title(),
+            "is_published": rng.random() < 0.7,
+            "created_at": created,
+            "updated_at": updated,
+        })
+        for _ in range(rng.randint(0, 2 * volumes.revisions_per_page)):
+            revision_id += 1
+            revisions.append({
+                "id": revision_id,
+                "page_id": page_id,
+                "content": _paragraphs(rng, rng.randint(2, 8)),
+                "status": rng.choices(("draft", "published", "archived"), weights=(50, 35, 15))[0],
+                "created_by_user_id": rng.choice(authors),
+                "created_at": created + timedelta(seconds=rng.randrange(30 * 86400)),
+            })
+        for order in range(rng.randint(1, max(1, 2 * volumes.blocks_per_page - 1))):
+            block_id += 1
+            block_type = rng.choices(BLOCK_TYPES, weights=BLOCK_WEIGHTS)[0]
+            block_created = created.replace(tzinfo=timezone.utc)
+            blocks.append({
+                "id": block_id,
+                "page_id": page_id,
+                "type": block_type,
+                "content": _block_content(rng, block_type, media_urls),
+                "order": order,
+                "is_visible": rng.random() < 0.95,
+                "created_by_id": rng.choice(authors),
+                "created_at": block_created,
+                "updated_at": block_created,
+            })
+    await timed("pages", Page, pages)
+    await timed("page_revisions", PageRevision, revisions)
+    await timed("page_blocks", PageBlock, blocks)
+
+    # --- Audit logs (generated lazily: there can be millions) ---
+    resource_ranges = {
+        "user": (1, max(all_users, default=1)),
+        "page": (start[Page] + 1, start[Page] + max(1, volumes.pages)),
+        "page_block": (start[PageBlock] + 1, max(block_id, start[PageBlock] + 1)),
+        "media": (start[Media] + 1, start[Media] + max(1, volumes.media)),
+        "site_setting": (1, 10),
+    }
+    actions = [(action, resource) for action, resource, _ in AUDIT_ACTIONS]
+    weights = [weight for _, _, weight in AUDIT_ACTIONS]
+
+    def audit_rows() -> Iterator[Dict[str, Any]]:
+        for i in range(volumes.audit_logs):
+            action, resource = rng.choices(actions, weights=weights)[0]
+            yield {
+                "id": start[AuditLog] + 1 + i,
+                "user_id": rng.choice(all_users),
+                "action": action,
+                "resource_type": resource,
+                "resource_id": rng.randint(*resource_ranges[resource]),
+                "timestamp": _timestamp(rng),
+            }
+
+    await timed("audit_logs", AuditLog, audit_rows())
+
+    # --- Site settings (only keys that are not set yet) ---
+    async with AsyncSessionLocal() as db:
+        present = set((await db.execute(select(SiteSetting.key))).scalars())
+        values = {
+            "site_name": "Bench Foundation",
+            "tagline": _words(rng, 6).capitalize(),
+            "contact_email": "hello@example.com",
+            "contact_phone": "+1 555 0100",
+            "social_links": {"twitter": "https://twitter.com/example", "facebook": "https://facebook.com/example"},
+            "maintenance_mode": False,
+            "items_per_page": 20,
+        }
+        values = {key: value for key, value in values.items() if key not in present}
+        await crud_site_setting.upsert_many(db, values, action="seed")
+        counts["site_settings"] = len(values)
+
+    # Running workers must not keep serving cached listings from before the seed
+    await invalidate_tags(ALL_KEYS)
+    total = sum(counts.values())
+    print(f"✅ Seeded {total:,} rows in {time.monotonic() - started:.1f}s (password for every user: {PASSWORD!r})")
+    return 0
@@ -0,0 +1,151 @@
+# app/core/admission.py
+"""
+Admission control: shed load early instead of letting requests queue on the
+database pool until clients time out.
+
+Every request is put in a route class. Lower classes may only use part of the
+in-flight capacity and are shed first when the pool is under pressure:
+
+    class      share of ADMISSION_MAX_IN_FLIGHT   shed on pool pressure
+    critical   100%                               never (public reads, login/refresh)
+    read        90%                               only when severe
+    write       60%                               yes
+    bulk        25%                               yes (bulk uploads, exports)
+
+Pool pressure comes from `TimedQueuePool`: a moving average of checkout
+waits (decaying while nothing checks out, so shedding stops once the pool
+recovers) and the number of requests waiting right now. Each signal has its
+own threshold; reads get 4x the headroom. Shed requests get 503 with
+Retry-After before any route code runs.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+from app.db.session import TimedQueuePool, engine
+
+shed_requests = Counter(
+    "admission_shed_total",
+    "Requests rejected by admission control, by route class and reason.",
+    ["route_class", "reason"],
+)
+in_flight_requests = Gauge(
+    "admission_in_flight",
+    "Requests currently being handled, by route class.",
+    ["route_class"],
+)
+
+# Most important first
+ROUTE_CLASSES = ("critical", "read", "write", "bulk")
+
+CAPACITY_SHARE: Dict[str, float] = {"critical": 1.0, "read": 0.9, "write": 0.6, "bulk": 0.25}
+
+# (method or None for any, path prefix, class); first match wins
+ROUTE_RULES: Tuple[Tuple[Optional[str], str, str], ...] = (
+    (None, "/api/auth/login", "critical"),
+    (None, "/api/auth/refresh", "critical"),
+    ("GET", "/api/settings/site-settings/public", "critical"),
+    ("GET", "/static/", "critical"),
+    ("GET", "/.well-known/", "critical"),
+    ("GET", "/metrics", "critical"),
+    ("POST", "/api/media/media/bulk", "bulk"),
+    (None, "/api/content/content/", "bulk"),
+)
+
+
+def classify(method: str, path: str) -> str:
+    for rule_method, prefix, route_class in ROUTE_RULES:
+        if (rule_method is None or rule_method == method) and path.startswith(prefix):
+            return route_class
+    return "read" if method in ("GET", "HEAD", "OPTIONS") else "write"
+
+
+@dataclass
+class PoolPressure:
+    wait_seconds: float = 0.0
+    waiting: int = 0
+
+    @classmethod
+    def current(cls) -> "PoolPressure":
+        pool = engine.sync_engine.pool
+        if isinstance(pool, TimedQueuePool):
+            return cls(pool.wait_ewma, pool.waiting)
+        return cls()
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, pool_wait_threshold: float, pool_queue_threshold: int = 0):
+        self.max_in_flight = max_in_flight
+        self.pool_wait_threshold = pool_wait_threshold
+        self.pool_queue_threshold = pool_queue_threshold
+        self.in_flight: Dict[str, int] = {name: 0 for name in ROUTE_CLASSES}
+
+    @property
+    def total_in_flight(self) -> int:
+        return sum(self.in_flight.values())
+
+    def decide(self, route_class: str, pressure: PoolPressure) -> Optional[str]:
+        """Return the shed reason, or None to admit."""
+        if self.total_in_flight >= self.max_in_flight * CAPACITY_SHARE[route_class]:
+            return "in_flight"
+        if route_class == "critical":
+            return None
+        # Reads are only shed when the pool is well past the thresholds
+        factor = 4 if route_class == "read" else 1
+        if self.pool_wait_threshold > 0 and pressure.wait_seconds >= self.pool_wait_threshold * factor:
+            return "pool_wait"
+        if self.pool_queue_threshold > 0 and pressure.waiting >= self.pool_queue_threshold * factor:
+            return "pool_queue"
+        return None
+
+    def retry_after(self, pressure: PoolPressure) -> int:
+        return max(1, math.ceil(pressure.wait_seconds * 2))
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware (no per-request task/stream wrapping like BaseHTTPMiddleware)."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController(
+            settings.ADMISSION_MAX_IN_FLIGHT,
+            settings.ADMISSION_POOL_WAIT_SHED_MS / 1000,
+            settings.ADMISSION_POOL_QUEUE_SHED,
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.controller.max_in_flight <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        pressure = PoolPressure.current()
+        reason = self.controller.decide(route_class, pressure)
+        if reason is not None:
+            shed_requests.inc(route_class=route_class, reason=reason)
+            await self._reject(send, self.controller.retry_after(pressure))
+            return
+
+        self.controller.in_flight[route_class] += 1
+        in_flight_requests.inc(route_class=route_class)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.in_flight[route_class] -= 1
+            in_flight_requests.dec(route_class=route_class)
+
+    @staticmethod
+    async def _reject(send, retry_after: int) -> None:
+        body = b'{"detail":"Server is overloaded, please retry later."}'
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -8,8 +8,10 @@ from app.db.session import get_db
 from app.crud.audit_logs import crud_audit_log
 from app.schemas.audit_log import AuditLogCreate
 from app.core.auth_deps import get_current_user
+from app.core.tracing import traced
 
 
+@traced()
 async def record_audit_log(
     action: str,
     resource_type: str,
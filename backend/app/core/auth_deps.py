@@ -1,13 +1,16 @@
 # backend/app/core/auth_deps.py
 
-from datetime import datetime, timedelta
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt, ExpiredSignatureError
+from jose import JWTError, ExpiredSignatureError
 from app.db.session import get_db
 from app.db.models.user import User  # Assuming your custom method is here
-from app.core.config import settings 
+from app.core.config import settings
+from app.core.jwt_keys import get_keyset
+from app.core.revocation import revocation_table
+from app.core.tracing import traced
 
 # ==========================
 # 🔐 CONFIGURATION
@@ -20,15 +23,27 @@ ALGORITHM = settings.ALGORITHM
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login") # Adjusted tokenUrl for API prefix
 
 # ==========================
-# 🔧 DEPENDENCY (Enhanced)
+# 🪪 PRINCIPAL
 # ==========================
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Identity taken from the signed access-token claims (no DB row)."""
+    id: int
+    email: str
+    role: str
+
+
+# ==========================
+# 🔧 DEPENDENCIES (Enhanced)
+# ==========================
+@traced()
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
     """
-    Extract and verify JWT token. 
-    ENHANCEMENT: Checks token type and handles user retrieval safety.
+    Verify the access token and return its claims, without any DB query.
+
+    The signed `id` / `role` claims are trusted; revocation (logout, password
+    reset, deactivation, role change) is enforced through the in-memory epoch
+    table, so routes that only need the caller's id or role stay query-free.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,39 +52,54 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
-        # --- ENHANCEMENT 1: Token Type Verification ---
-        token_type: str = payload.get("type")
-        if token_type != "access":
-            # Raised if a refresh token or an invalid type is presented
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                detail="Invalid token type, access token required"
-            )
-
-        email: str | None = payload.get("sub")
-        
-        # --- ENHANCEMENT 2: Safe None/Empty Check for Email ---
-        if not email:
-            raise credentials_exception
-            
-        # Optional: capture id and role if present
-        user_id: int | None = payload.get("id")
-        role: str | None = payload.get("role")
-        
+        payload = get_keyset().decode(token)
     except ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except JWTError:
         raise credentials_exception
 
-    # --- ENHANCEMENT 3: Assumes User.get_by_email is async (await added) and safe ---
-    # User.get_by_email() is assumed to be an asynchronous class method 
-    # defined on the User model that returns User or None.
-    user = await User.get_by_email(db, email=email)
-    
-    # --- Safe handling of None from get_by_email() and is_active check ---
-    if not user or not user.is_active:
+    # --- Token Type Verification ---
+    if payload.get("type") != "access":
+        # Raised if a refresh token or an invalid type is presented
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type, access token required"
+        )
+
+    email = payload.get("sub")
+    user_id = payload.get("id")
+    role = payload.get("role")
+    if not email or not isinstance(user_id, int) or not role:
         raise credentials_exception
 
-    return user
\ No newline at end of file
+    # --- Revocation: token epoch must not be older than the user's current epoch ---
+    if revocation_table.is_revoked(user_id, payload.get("ep", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return Principal(id=user_id, email=email, role=role)
+
+
+@traced()
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Load the full `User` row for routes that need more than the token claims
+    (profile data, or mutating the user). Costs one primary-key lookup.
+    """
+    user = await db.get(User, principal.id)
+
+    # --- Safe handling of a missing row and is_active check ---
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 from pydantic import Field, model_validator, ValidationError
 
@@ -12,8 +13,104 @@ class Settings(BaseSettings):
     # Security / JWT settings
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     ALGORITHM: str = Field("HS256", env="ALGORITHM")
+    # Asymmetric keyset (RS256 / ES256 / EdDSA with kid); see app/core/jwt_keys.py
+    JWT_KEYSET_FILE: str | None = Field(None, env="JWT_KEYSET_FILE")
+    JWT_ACCEPT_LEGACY_TOKENS: bool = Field(True, env="JWT_ACCEPT_LEGACY_TOKENS")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(60, env="ACCESS_TOKEN_EXPIRE_MINUTES")
 
+    # Media storage ("local" filesystem or "s3" for any S3-compatible store)
+    STORAGE_BACKEND: str = Field("local", env="STORAGE_BACKEND")
+    MEDIA_ROOT: str = Field(
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "uploads"),
+        env="MEDIA_ROOT",
+    )
+    MEDIA_URL_PREFIX: str = Field("/static/uploads", env="MEDIA_URL_PREFIX")
+    S3_BUCKET: str | None = Field(None, env="S3_BUCKET")
+    S3_ENDPOINT_URL: str | None = Field(None, env="S3_ENDPOINT_URL")  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: str | None = Field(None, env="S3_REGION")
+    S3_ACCESS_KEY_ID: str | None = Field(None, env="S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY: str | None = Field(None, env="S3_SECRET_ACCESS_KEY")
+    S3_PUBLIC_BASE_URL: str | None = Field(None, env="S3_PUBLIC_BASE_URL")
+    S3_MULTIPART_PART_SIZE: int = Field(8 * 1024 * 1024, env="S3_MULTIPART_PART_SIZE")
+    S3_MULTIPART_CONCURRENCY: int = Field(4, env="S3_MULTIPART_CONCURRENCY")
+
+    # Orphan media reconciliation (0 disables the background job)
+    MEDIA_GC_INTERVAL_SECONDS: int = Field(0, env="MEDIA_GC_INTERVAL_SECONDS")
+    MEDIA_GC_DELETE: bool = Field(False, env="MEDIA_GC_DELETE")  # False = report only
+    MEDIA_GC_MAX_DELETES_PER_SECOND: float = Field(50.0, env="MEDIA_GC_MAX_DELETES_PER_SECOND")
+
+    # Background media metadata extraction
+    MEDIA_METADATA_WORKERS: int = Field(2, env="MEDIA_METADATA_WORKERS")
+    MEDIA_METADATA_MAX_RETRIES: int = Field(3, env="MEDIA_METADATA_MAX_RETRIES")
+
+    # Bulk media upload
+    MEDIA_BULK_CONCURRENCY: int = Field(8, env="MEDIA_BULK_CONCURRENCY")
+    MEDIA_BULK_MAX_FILES: int = Field(1000, env="MEDIA_BULK_MAX_FILES")
+
+    # How often each worker checks whether another worker changed the site settings
+    # (only without Postgres; otherwise the invalidation bus pushes changes)
+    SETTINGS_SNAPSHOT_POLL_SECONDS: float = Field(5.0, env="SETTINGS_SNAPSHOT_POLL_SECONDS")
+    # Same for token revocations (logout, deactivation, deletion made on another worker)
+    TOKEN_REVOCATION_POLL_SECONDS: float = Field(5.0, env="TOKEN_REVOCATION_POLL_SECONDS")
+
+    # Login / password-reset brute-force throttling
+    AUTH_THROTTLE_BACKEND: str = Field("memory", env="AUTH_THROTTLE_BACKEND")  # memory | postgres | redis
+    REDIS_URL: str = Field("redis://localhost:6379/0", env="REDIS_URL")
+    AUTH_THROTTLE_IP_LIMIT: int = Field(20, env="AUTH_THROTTLE_IP_LIMIT")
+    AUTH_THROTTLE_IP_WINDOW_SECONDS: float = Field(300, env="AUTH_THROTTLE_IP_WINDOW_SECONDS")
+    AUTH_THROTTLE_ACCOUNT_LIMIT: int = Field(5, env="AUTH_THROTTLE_ACCOUNT_LIMIT")
+    AUTH_THROTTLE_ACCOUNT_WINDOW_SECONDS: float = Field(900, env="AUTH_THROTTLE_ACCOUNT_WINDOW_SECONDS")
+    AUTH_THROTTLE_BASE_LOCKOUT_SECONDS: float = Field(30, env="AUTH_THROTTLE_BASE_LOCKOUT_SECONDS")
+    AUTH_THROTTLE_MAX_LOCKOUT_SECONDS: float = Field(3600, env="AUTH_THROTTLE_MAX_LOCKOUT_SECONDS")
+    AUTH_THROTTLE_STRIKE_MEMORY_SECONDS: float = Field(86400, env="AUTH_THROTTLE_STRIKE_MEMORY_SECONDS")
+    TRUST_FORWARDED_FOR: bool = Field(False, env="TRUST_FORWARDED_FOR")  # only behind a trusted proxy
+
+    # Route-level response cache
+    RESPONSE_CACHE_BACKEND: str = Field("memory", env="RESPONSE_CACHE_BACKEND")  # memory | redis | off
+    RESPONSE_CACHE_MAX_BYTES: int = Field(32 * 1024 * 1024, env="RESPONSE_CACHE_MAX_BYTES")
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(300, env="RESPONSE_CACHE_TTL_SECONDS")
+    RESPONSE_CACHE_STALE_SECONDS: float = Field(60, env="RESPONSE_CACHE_STALE_SECONDS")  # serve-stale window past the TTL
+    RESPONSE_CACHE_FLIGHT_TIMEOUT_SECONDS: float = Field(5, env="RESPONSE_CACHE_FLIGHT_TIMEOUT_SECONDS")
+
+    # Admission control / load shedding (0 disables)
+    ADMISSION_MAX_IN_FLIGHT: int = Field(256, env="ADMISSION_MAX_IN_FLIGHT")
+    ADMISSION_POOL_WAIT_SHED_MS: float = Field(250, env="ADMISSION_POOL_WAIT_SHED_MS")
+    ADMISSION_POOL_QUEUE_SHED: int = Field(32, env="ADMISSION_POOL_QUEUE_SHED")  # requests waiting on the pool
+
+    # Cross-worker cache invalidation (Postgres LISTEN/NOTIFY); bursts are merged over this window
+    INVALIDATION_BUS_BATCH_MS: float = Field(50, env="INVALIDATION_BUS_BATCH_MS")
+
+    # Streamed list responses: rows fetched per server-side cursor batch
+    STREAM_YIELD_PER: int = Field(1000, env="STREAM_YIELD_PER")
+
+    # Event-loop health: lag probe interval (0 disables) and the opt-in blocking-call watchdog
+    LOOP_LAG_INTERVAL_SECONDS: float = Field(0.5, env="LOOP_LAG_INTERVAL_SECONDS")
+    LOOP_BLOCKING_DEBUG: bool = Field(False, env="LOOP_BLOCKING_DEBUG")
+    LOOP_BLOCKING_THRESHOLD_MS: float = Field(100, env="LOOP_BLOCKING_THRESHOLD_MS")
+    LOOP_BLOCKING_SAMPLE_RATE: float = Field(1.0, env="LOOP_BLOCKING_SAMPLE_RATE")  # share of stalls with a stack
+
+    # Admin diagnostics: request profiles and tracemalloc snapshots, shared by the workers
+    DIAGNOSTICS_DIR: str = Field(
+        os.path.join(tempfile.gettempdir(), "cms-diagnostics"), env="DIAGNOSTICS_DIR"
+    )
+    DIAGNOSTICS_KEEP: int = Field(50, env="DIAGNOSTICS_KEEP")  # files kept per kind
+    PROFILE_SAMPLE_INTERVAL_MS: float = Field(1.0, env="PROFILE_SAMPLE_INTERVAL_MS")
+    TRACEMALLOC_FRAMES: int = Field(10, env="TRACEMALLOC_FRAMES")
+
+    # Slow-query log (0 disables) and sampled EXPLAIN capture of slow statements
+    SLOW_QUERY_MS: float = Field(200, env="SLOW_QUERY_MS")
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = Field(0.1, env="SLOW_QUERY_EXPLAIN_SAMPLE_RATE")
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = Field(300, env="SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS")  # per fingerprint
+    SLOW_QUERY_MAX_FINGERPRINTS: int = Field(500, env="SLOW_QUERY_MAX_FINGERPRINTS")
+
+    # In-process tracing, exported as OTLP/JSON to a collector or a local file
+    TRACING_ENABLED: bool = Field(False, env="TRACING_ENABLED")
+    TRACING_SAMPLE_RATE: float = Field(0.01, env="TRACING_SAMPLE_RATE")  # share of requests traced
+    TRACING_SERVICE_NAME: str = Field("fastapi-cms", env="TRACING_SERVICE_NAME")
+    TRACING_OTLP_ENDPOINT: str | None = Field(None, env="TRACING_OTLP_ENDPOINT")  # e.g. http://localhost:4318/v1/traces
+    TRACING_EXPORT_FILE: str | None = Field(None, env="TRACING_EXPORT_FILE")  # default: DIAGNOSTICS_DIR/traces.otlp.jsonl
+    TRACING_EXPORT_INTERVAL_SECONDS: float = Field(2.0, env="TRACING_EXPORT_INTERVAL_SECONDS")
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -0,0 +1,404 @@
+# app/core/content_transfer.py
+"""
+Bulk export / import of site content (site settings, pages, page blocks,
+page revisions and media), used by the `export` / `import` CLI commands and the admin endpoints.
+
+Archive layout (a tar, optionally gzipped):
+
+    content.ndjson      header line, then one {"table": ..., "row": {...}} per row
+    media/<key>         the stored file of every exported media row
+
+`content.ndjson` can also be used on its own (no media bytes). Rows are in
+foreign-key order (settings, pages, blocks, revisions, media) and are read with
+server-side cursors, so exports stream in constant memory.
+
+Imports insert in batches with executemany. Ids are either preserved
+(re-runs of a chunked import skip rows that already exist) or remapped to
+fresh ids, with blocks and revisions pointed at the new page ids. References to users that
+do not exist on the target are assigned to the importing user. By default the
+whole import is one transaction; `chunked` commits every batch instead so an
+interrupted import can be resumed. Media files are written while the archive
+is read, before the commit; if the import fails, the new files are deleted
+again (chunked imports keep them, their rows may already be committed).
+"""
+import asyncio
+import io
+import json
+import tarfile
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import DateTime, delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.invalidation_bus import ALL_KEYS
+from app.core.response_cache import invalidate_tags
+from app.core.responses import dumps
+from app.core.storage import DEFAULT_CHUNK_SIZE, StorageError, get_storage
+from app.core.settings_snapshot import settings_snapshot
+from app.crud.settings import crud_site_setting
+from app.db.models import Media, Page, PageBlock, PageRevision, SiteSetting, User
+from app.db.sequences import sync_id_sequences
+from app.db.session import AsyncSessionLocal
+from app.schemas.site_setting import validate_setting_value
+
+FORMAT = "cms-content"
+VERSION = 2  # 2: adds page_revisions
+CONTENT_MEMBER = "content.ndjson"
+MEDIA_PREFIX = "media/"
+
+# Export / import order (parents first)
+TABLES = {
+    "site_settings": SiteSetting,
+    "pages": Page,
+    "page_blocks": PageBlock,
+    "page_revisions": PageRevision,
+    "media": Media,
+}
+
+# Columns pointing at users, which are not part of the export
+USER_COLUMNS = {
+    "page_blocks": "created_by_id",
+    "page_revisions": "created_by_user_id",
+    "media": "uploaded_by_user_id",
+}
+
+# Rows pointing at a page, re-pointed at the new page ids when ids are remapped
+PAGE_CHILDREN = ("page_blocks", "page_revisions")
+
+# content.ndjson is spooled in memory up to this size before going to disk
+CONTENT_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+class ContentImportError(Exception):
+    """Raised when an archive cannot be imported; nothing is committed (unless chunked)."""
+
+
+# ==========================
+# 📤 EXPORT
+# ==========================
+async def iter_content(media_keys: Optional[List[str]] = None) -> AsyncIterator[bytes]:
+    """
+    Yield content.ndjson in chunks, one consistent snapshot of every table.
+    The storage keys of the exported media rows are appended to `media_keys`.
+    """
+    yield dumps({"format": FORMAT, "version": VERSION, "exported_at": datetime.utcnow(), "tables": list(TABLES)}) + b"\n"
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        for name, model in TABLES.items():
+            table = model.__table__
+            result = await db.stream(
+                select(table).order_by(table.c.id).execution_options(yield_per=settings.STREAM_YIELD_PER)
+            )
+            async for rows in result.mappings().partitions():
+                if media_keys is not None and name == "media":
+                    media_keys.extend(row["filename"] for row in rows)
+                yield b"".join(dumps({"table": name, "row": dict(row)}) + b"\n" for row in rows)
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object collecting what tarfile writes, drained after every member."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+async def iter_archive(include_media: bool = True, compress: bool = False) -> AsyncIterator[bytes]:
+    """Yield the export tar in chunks (content.ndjson first, then the media files)."""
+    sink = _Sink()
+    tar = tarfile.open(fileobj=sink, mode="w|gz" if compress else "w|")
+    media_keys: List[str] = []
+    # Tar headers carry the member size, so the NDJSON is spooled before it is added
+    with tempfile.SpooledTemporaryFile(max_size=CONTENT_SPOOL_BYTES) as spool:
+        async for chunk in iter_content(media_keys):
+            spool.write(chunk)
+        info = tarfile.TarInfo(CONTENT_MEMBER)
+        info.size, info.mtime = spool.tell(), int(time.time())
+        spool.seek(0)
+        await asyncio.to_thread(tar.addfile, info, spool)
+        yield sink.drain()
+
+    if include_media:
+        storage = get_storage()
+        for key in media_keys:
+            try:
+                data = await storage.get(key)
+            except StorageError as e:
+                print(f"⚠️ Export: skipping media file {key!r}: {e}")
+                continue
+            info = tarfile.TarInfo(MEDIA_PREFIX + key)
+            info.size, info.mtime = len(data), int(time.time())
+            # Copying (and gzipping) a large file must not block the event loop
+            await asyncio.to_thread(tar.addfile, info, io.BytesIO(data))
+            del data
+            yield sink.drain()
+
+    await asyncio.to_thread(tar.close)
+    yield sink.drain()
+
+
+# ==========================
+# 📥 IMPORT
+# ==========================
+@dataclass
+class ImportOptions:
+    ids: str = "preserve"  # preserve | remap
+    replace: bool = False  # delete existing content first
+    chunked: bool = False  # commit every batch (resumable with preserved ids)
+    batch_size: int = 1000
+    user_id: Optional[int] = None  # owner of rows whose user does not exist here; default: first admin
+
+
+@dataclass
+class ImportReport:
+    rows: Dict[str, int] = field(default_factory=dict)
+    skipped: Dict[str, int] = field(default_factory=dict)
+    media_files: int = 0
+    seconds: float = 0.0
+
+
+def _row_converter(model) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Keep the model's columns only and parse ISO datetimes back."""
+    columns = {column.name for column in model.__table__.columns}
+    datetimes = {column.name for column in model.__table__.columns if isinstance(column.type, DateTime)}
+
+    def convert(row: Dict[str, Any]) -> Dict[str, Any]:
+        out = {key: value for key, value in row.items() if key in columns}
+        for key in datetimes:
+            if isinstance(out.get(key), str):
+                out[key] = datetime.fromisoformat(out[key])
+        return out
+
+    return convert
+
+
+class ContentImporter:
+    def __init__(self, db: AsyncSession, options: ImportOptions):
+        if options.ids not in ("preserve", "remap"):
+            raise ContentImportError(f"Unknown id mode '{options.ids}' (use preserve or remap)")
+        if options.chunked and options.ids == "remap":
+            raise ContentImportError("Chunked imports need preserved ids to be resumable")
+        self.db = db
+        self.options = options
+        self.report = ImportReport()
+        self.converters = {name: _row_converter(model) for name, model in TABLES.items()}
+        self.page_ids: Dict[int, int] = {}
+        self.media_keys: Set[str] = set()
+        self.written_files: List[str] = []  # new files, deleted again if the import fails
+        self.user_ids: Set[int] = set()
+        self.fallback_user_id: Optional[int] = None
+        self.started = time.monotonic()
+
+    async def start(self) -> None:
+        if self.options.replace:
+            for model in (PageBlock, PageRevision, Page, Media, SiteSetting):
+                await self.db.execute(delete(model))
+        self.user_ids = set((await self.db.execute(select(User.id))).scalars())
+        self.fallback_user_id = self.options.user_id or await self.db.scalar(
+            select(User.id).where(User.role == "admin").order_by(User.id).limit(1)
+        )
+
+    async def add_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        if table not in TABLES:
+            raise ContentImportError(f"Unknown table '{table}'")
+        try:
+            await self._add_rows(table, rows)
+        except (KeyError, TypeError, ValueError) as e:
+            # Missing columns, wrongly typed values, unparseable datetimes...
+            raise ContentImportError(f"Invalid {table} row: {type(e).__name__}: {e}")
+
+    async def _add_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        rows = [self.converters[table](row) for row in rows]
+        model = TABLES[table]
+
+        if table == "site_settings":
+            try:
+                values = {row["key"]: validate_setting_value(row["key"], row["value"]) for row in rows}
+            except ValueError as e:
+                raise ContentImportError(str(e))
+            await crud_site_setting.upsert_many(self.db, values, action="import", commit=False)
+            await self._done_batch(table, len(rows))
+            return
+
+        user_column = USER_COLUMNS.get(table)
+        if user_column:
+            for row in rows:
+                if row.get(user_column) not in self.user_ids:
+                    if self.fallback_user_id is None:
+                        raise ContentImportError("No user to own the imported rows; create an admin first")
+                    row[user_column] = self.fallback_user_id
+        if table == "media":
+            storage = get_storage()
+            for row in rows:
+                row["url"] = storage.url(row["filename"])
+                self.media_keys.add(row["filename"])
+        if table in PAGE_CHILDREN and self.options.ids == "remap":
+            for row in rows:
+                try:
+                    row["page_id"] = self.page_ids[row["page_id"]]
+                except KeyError:
+                    raise ContentImportError(
+                        f"{table} row {row.get('id')} belongs to page {row['page_id']}, which is not in the archive"
+                    )
+
+        if self.options.ids == "preserve":
+            if self.options.chunked:
+                existing = set((await self.db.execute(
+                    select(model.id).where(model.id.in_([row["id"] for row in rows]))
+                )).scalars())
+                if existing:
+                    self.report.skipped[table] = self.report.skipped.get(table, 0) + len(existing)
+                    rows = [row for row in rows if row["id"] not in existing]
+            if rows:
+                await self.db.execute(insert(model), rows)
+        elif table == "pages":
+            # Blocks need the new page ids, in the order the rows were sent
+            old_ids = [row.pop("id") for row in rows]
+            result = await self.db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+            self.page_ids.update(zip(old_ids, result.scalars()))
+        else:
+            for row in rows:
+                row.pop("id")
+            await self.db.execute(insert(model), rows)
+        await self._done_batch(table, len(rows))
+
+    async def _done_batch(self, table: str, count: int) -> None:
+        self.report.rows[table] = self.report.rows.get(table, 0) + count
+        if self.options.chunked:
+            await self.db.commit()
+
+    async def add_media_file(self, key: str, chunks: AsyncIterator[bytes]) -> bool:
+        """Store a media file; only keys of imported media rows are accepted."""
+        if key not in self.media_keys:
+            return False
+        storage = get_storage()
+        is_new = await storage.stat(key) is None
+        await storage.put(key, chunks)
+        if is_new and not self.options.chunked:
+            self.written_files.append(key)
+        self.report.media_files += 1
+        return True
+
+    async def discard_files(self) -> None:
+        """Delete the files this import wrote (after a rollback, nothing points at them)."""
+        storage = get_storage()
+        for key in self.written_files:
+            try:
+                await storage.delete(key)
+            except StorageError as e:
+                print(f"⚠️ Import: could not remove {key!r} after the failed import: {e}")
+        self.written_files = []
+
+    async def finish(self) -> ImportReport:
+        if self.options.ids == "preserve":
+            await sync_id_sequences(self.db, (model.__tablename__ for model in TABLES.values()))
+        await self.db.commit()
+        self.written_files = []  # committed: the rows own them now
+        # Everything may have changed: drop every cached response and the settings snapshot
+        await invalidate_tags(ALL_KEYS)
+        await settings_snapshot.rebuild(self.db, publish=True)
+        self.report.seconds = time.monotonic() - self.started
+        return self.report
+
+
+def _read_lines(fh: BinaryIO, count: int) -> List[bytes]:
+    lines = []
+    for line in fh:
+        if line.strip():
+            lines.append(line)
+            if len(lines) >= count:
+                break
+    return lines
+
+
+async def _import_ndjson(importer: ContentImporter, fh: BinaryIO) -> None:
+    batch_size = importer.options.batch_size
+    header = True
+    while lines := await asyncio.to_thread(_read_lines, fh, batch_size):
+        try:
+            records = [json.loads(line) for line in lines]
+        except ValueError as e:
+            raise ContentImportError(f"Invalid NDJSON line: {e}")
+        if header:
+            meta = records.pop(0)
+            if not isinstance(meta, dict) or meta.get("format") != FORMAT or meta.get("version", 0) > VERSION:
+                raise ContentImportError(f"Not a {FORMAT} v{VERSION} export")
+            header = False
+
+        # One insert per run of consecutive rows from the same table
+        table, rows = None, []
+        for record in records:
+            if not (isinstance(record, dict) and isinstance(record.get("table"), str)
+                    and isinstance(record.get("row"), dict)):
+                raise ContentImportError(f'Invalid record (expected {{"table": ..., "row": {{...}}}}): {str(record)[:200]}')
+            if record["table"] != table and rows:
+                await importer.add_rows(table, rows)
+                rows = []
+            table = record["table"]
+            rows.append(record["row"])
+        if rows:
+            await importer.add_rows(table, rows)
+    if header:
+        raise ContentImportError("The archive's content is empty")
+
+
+async def _member_chunks(fh: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(fh.read, DEFAULT_CHUNK_SIZE):
+        yield chunk
+
+
+async def import_archive(db: AsyncSession, fh: BinaryIO, options: ImportOptions) -> ImportReport:
+    """Import a tar archive or a bare content.ndjson from the seekable file `fh`."""
+    importer = ContentImporter(db, options)
+    try:
+        await importer.start()
+        if fh.read(1) == b"{":
+            fh.seek(0)
+            await _import_ndjson(importer, fh)
+        else:
+            fh.seek(0)
+            try:
+                tar = tarfile.open(fileobj=fh, mode="r|*")
+            except tarfile.TarError as e:
+                raise ContentImportError(f"Not a tar archive or NDJSON file: {e}")
+            seen_content = False
+            while (member := await asyncio.to_thread(tar.next)) is not None:
+                if member.name == CONTENT_MEMBER:
+                    await _import_ndjson(importer, tar.extractfile(member))
+                    seen_content = True
+                elif member.isfile() and member.name.startswith(MEDIA_PREFIX):
+                    if not seen_content:
+                        raise ContentImportError(f"{CONTENT_MEMBER} must come before the media files")
+                    key = member.name[len(MEDIA_PREFIX):]
+                    if not await importer.add_media_file(key, _member_chunks(tar.extractfile(member))):
+                        print(f"⚠️ Import: ignoring {member.name!r} (no media row)")
+            if not seen_content:
+                raise ContentImportError(f"The archive has no {CONTENT_MEMBER}")
+        return await importer.finish()
+    except IntegrityError as e:
+        await db.rollback()
+        await importer.discard_files()
+        raise ContentImportError(
+            f"Rows conflict with existing content (replace it, or remap ids if only ids collide): {e.orig}"
+        )
+    except BaseException:
+        await db.rollback()
+        await importer.discard_files()
+        raise
@@ -0,0 +1,94 @@
+# app/core/dependency_graph.py
+"""
+Per-route dependency graph deduplication.
+
+FastAPI caches a dependency's value for the rest of the request, but it still
+walks the dependency's whole sub-graph every time the dependency is declared
+before looking at the cache. A route guarded by `require_permission(...)` that
+also takes `Depends(get_current_principal)` (directly, through
+`get_current_user`, or through the response cache wrapper) therefore re-runs
+the bearer-token extraction and the cache lookups for every declaration.
+
+`dedupe_dependencies(app)` prunes those repeats once, after the routers are
+included: every later declaration of a cached dependency becomes a leaf that
+is served straight from the request's dependency cache, so the current
+principal is resolved exactly once per route.
+"""
+import dataclasses
+from typing import Callable, Dict, Set, Tuple
+
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+
+
+def _reads_request_params(dependant: Dependant) -> bool:
+    """True if solving `dependant` can fail validation (it reads path/query/header/cookie/body)."""
+    if (
+        dependant.path_params or dependant.query_params or dependant.header_params
+        or dependant.cookie_params or dependant.body_params
+    ):
+        return True
+    return any(_reads_request_params(sub) for sub in dependant.dependencies)
+
+
+def _prune(dependant: Dependant, seen: Set[Tuple]) -> int:
+    pruned = 0
+    for index, sub in enumerate(dependant.dependencies):
+        if sub.use_cache and sub.cache_key in seen:
+            if sub.dependencies:
+                # The first declaration filled the cache; skip straight to it
+                dependant.dependencies[index] = dataclasses.replace(sub, dependencies=[])
+                pruned += 1
+            continue
+        pruned += _prune(sub, seen)
+        # Only sub-graphs that cannot fail validation are known to reach the cache
+        if sub.use_cache and not _reads_request_params(sub):
+            seen.add(sub.cache_key)
+    return pruned
+
+
+def dedupe_route_dependencies(route: APIRoute) -> int:
+    """Prune repeated cached sub-graphs of one route; returns the number of pruned nodes."""
+    return _prune(route.dependant, set())
+
+
+def dedupe_dependencies(app: FastAPI) -> int:
+    """Run `dedupe_route_dependencies` on every API route of `app`."""
+    return sum(
+        dedupe_route_dependencies(route) for route in app.routes if isinstance(route, APIRoute)
+    )
+
+
+def count_resolutions(dependant: Dependant, call: Callable) -> int:
+    """
+    How many times solving `dependant` works on `call`: runs it, or re-solves
+    its sub-dependencies before finding it in the cache.
+    """
+    seen: Set[Tuple] = set()
+
+    def walk(node: Dependant) -> int:
+        count = 0
+        for sub in node.dependencies:
+            if sub.use_cache and sub.cache_key in seen and not sub.dependencies:
+                continue  # a plain cache hit
+            if sub.call is call:
+                count += 1
+            count += walk(sub)
+            if sub.use_cache:
+                seen.add(sub.cache_key)
+        return count
+
+    return walk(dependant)
+
+
+def route_resolutions(app: FastAPI, call: Callable) -> Dict[str, int]:
+    """`count_resolutions` of `call` for every route that depends on it, e.g. `{"GET /api/pages/pages/": 1}`."""
+    counts = {}
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        count = count_resolutions(route.dependant, call)
+        if count:
+            counts[f"{','.join(sorted(route.methods))} {route.path}"] = count
+    return counts
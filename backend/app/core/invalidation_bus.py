@@ -0,0 +1,198 @@
+# app/core/invalidation_bus.py
+"""
+Cross-worker invalidation bus over Postgres LISTEN/NOTIFY.
+
+In-process caches subscribe to a topic and get the keys that changed:
+
+    invalidation_bus.subscribe("response_cache", on_tags, resync=clear_all)
+    await invalidation_bus.publish("response_cache", "page:42", "pages:list")
+
+`publish` runs the local subscribers immediately (read-your-writes in the
+worker that made the change) and queues the keys for the other workers.
+Bursts are merged over INVALIDATION_BUS_BATCH_MS and sent as one compact
+NOTIFY per batch. Call it *after* commit. `notify_in_transaction` instead
+sends the event as part of the caller's transaction (delivered only if it
+commits), for state where ordering matters, such as token revocation.
+
+Each worker keeps one dedicated asyncpg LISTEN connection (`run()`, started
+from the app lifespan). After every (re)connect each subscriber's `resync`
+callback runs, because events sent while disconnected are lost. On other
+databases the bus is local only.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cms_invalidation"
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+
+# Sent instead of the keys when a topic's batch does not fit in one payload
+ALL_KEYS = "*"
+
+Handler = Callable[[List[str]], Union[None, Awaitable[None]]]
+Resync = Callable[[], Awaitable[None]]
+
+bus_events = Counter(
+    "invalidation_bus_events_total",
+    "Invalidation keys by topic and direction (published, sent, received).",
+    ["topic", "direction"],
+)
+bus_connected = Gauge("invalidation_bus_connected", "1 while the LISTEN connection is up.")
+
+
+class InvalidationBus:
+    def __init__(self, batch_seconds: float = 0.05):
+        self.batch_seconds = batch_seconds
+        self.origin = uuid.uuid4().hex[:12]
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._resyncs: List[Resync] = []
+        self._pending: Dict[str, Set[str]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """Remote delivery needs Postgres; elsewhere events stay in this process."""
+        return engine.dialect.name == "postgresql"
+
+    # --- Subscribing ---
+    def subscribe(self, topic: str, handler: Handler, resync: Optional[Resync] = None) -> None:
+        """`handler(keys)` may be sync or async; `resync()` runs after every (re)connect."""
+        self._handlers.setdefault(topic, []).append(handler)
+        if resync is not None:
+            self._resyncs.append(resync)
+
+    async def _dispatch(self, topic: str, keys: List[str]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                result = handler(keys)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Invalidation handler for %r failed", topic)
+
+    # --- Publishing ---
+    async def publish(self, topic: str, *keys: str) -> None:
+        """Apply locally now; send to the other workers with the next batch."""
+        bus_events.inc(len(keys), topic=topic, direction="published")
+        await self._dispatch(topic, list(keys))
+        if not self.enabled:
+            return
+        self._pending.setdefault(topic, set()).update(keys)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def notify_in_transaction(self, db: AsyncSession, topic: str, *keys: str) -> None:
+        """Queue the event on the caller's transaction; other workers see it on commit."""
+        if db.bind.dialect.name != "postgresql":
+            return
+        for payload in self._payloads({topic: set(keys)}):
+            await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+        bus_events.inc(len(keys), topic=topic, direction="sent")
+
+    async def _flush_later(self) -> None:
+        # Loop so keys published while a flush is in progress are not left behind
+        while self._pending:
+            await asyncio.sleep(self.batch_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send everything pending now (also called on shutdown and by CLI commands)."""
+        pending, self._pending = self._pending, {}
+        if not pending or not self.enabled:
+            return
+        try:
+            async with engine.begin() as conn:
+                for payload in self._payloads(pending):
+                    await conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload}
+                    )
+            for topic, keys in pending.items():
+                bus_events.inc(len(keys), topic=topic, direction="sent")
+        except Exception:
+            logger.exception("Invalidation bus publish failed")
+
+    def _payloads(self, events: Dict[str, Set[str]]) -> Iterable[str]:
+        """Pack events into as few payloads as fit; oversized topics collapse to ALL_KEYS."""
+        batch: Dict[str, List[str]] = {}
+        for topic, keys in events.items():
+            keys = sorted(keys)
+            if len(self._encode({topic: keys})) > MAX_PAYLOAD_BYTES:
+                keys = [ALL_KEYS]
+            if batch and len(self._encode({**batch, topic: keys})) > MAX_PAYLOAD_BYTES:
+                yield self._encode(batch)
+                batch = {}
+            batch[topic] = keys
+        if batch:
+            yield self._encode(batch)
+
+    def _encode(self, events: Dict[str, List[str]]) -> str:
+        return json.dumps({"o": self.origin, "e": events}, separators=(",", ":"))
+
+    # --- Listening ---
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            events = message["e"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed invalidation payload: %r", payload[:200])
+            return
+        if message.get("o") == self.origin:
+            return  # already applied locally by publish()
+        for topic, keys in events.items():
+            bus_events.inc(len(keys), topic=topic, direction="received")
+            task = asyncio.get_running_loop().create_task(self._dispatch(topic, keys))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def resync(self) -> None:
+        for callback in self._resyncs:
+            try:
+                await callback()
+            except Exception:
+                logger.exception("Invalidation resync failed")
+
+    async def run(self, retry_seconds: float = 2.0) -> None:
+        """Keep a LISTEN connection open for the lifetime of the worker (Postgres only)."""
+        import asyncpg
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            conn: Optional["asyncpg.Connection"] = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                bus_connected.set(1)
+                # Events sent while we were disconnected are gone
+                await self.resync()
+                await lost.wait()
+                logger.warning("Invalidation bus connection lost; reconnecting.")
+            except asyncio.CancelledError:
+                bus_connected.set(0)
+                if conn is not None:
+                    await conn.close()
+                raise
+            except Exception:
+                logger.exception("Invalidation bus listener error")
+            bus_connected.set(0)
+            await asyncio.sleep(retry_seconds)
+
+
+# Process-wide bus, listener started in the app startup hook
+invalidation_bus = InvalidationBus(batch_seconds=settings.INVALIDATION_BUS_BATCH_MS / 1000)
@@ -0,0 +1,246 @@
+# app/core/jwt_keys.py
+"""
+JWT signing keyset with `kid` headers and overlapping rotation windows.
+
+Without `JWT_KEYSET_FILE` the keyset holds a single HMAC key built from
+`SECRET_KEY` / `ALGORITHM` (the historical behaviour). With a keyset file,
+tokens are signed with asymmetric keys (RS256, ES256 or EdDSA) and any
+service can verify them from the public `/.well-known/jwks.json`.
+
+Keyset file (JSON, paths relative to the file):
+
+    {"keys": [
+        {"kid": "2026-09", "alg": "RS256", "private_key_file": "keys/2026-09.pem",
+         "not_after": "2026-11-01T00:00:00Z"},
+        {"kid": "2026-10", "alg": "EdDSA", "private_key_file": "keys/2026-10.pem",
+         "not_before": "2026-10-01T00:00:00Z"}
+    ]}
+
+- `not_before`: the key is only used for *signing* from this time on (it is
+  published and accepted for verification immediately, so JWKS caches pick
+  it up before the first token signed with it appears).
+- `not_after`: the key is no longer accepted (set it to at least the refresh
+  token lifetime after the next key's `not_before`).
+- Keys with only `public_key_file` / `public_key` are verify-only.
+
+Keys are parsed once into `jose` key objects; per-request work is only the
+signature operation itself.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import settings
+
+# Header value used by tokens issued before key ids existed
+LEGACY_KID = "legacy"
+
+
+# ==========================
+# 🔑 EdDSA SUPPORT FOR python-jose
+# ==========================
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class Ed25519Key(Key):
+    """Ed25519 (JWS alg "EdDSA", RFC 8037); python-jose has no built-in support."""
+
+    def __init__(self, key, algorithm):
+        self._algorithm = algorithm
+        if isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            self._key = key
+        elif isinstance(key, dict):
+            if "d" in key:
+                self._key = Ed25519PrivateKey.from_private_bytes(_b64url_decode(key["d"]))
+            else:
+                self._key = Ed25519PublicKey.from_public_bytes(_b64url_decode(key["x"]))
+        else:
+            data = key.encode() if isinstance(key, str) else key
+            if b"PRIVATE" in data:
+                self._key = serialization.load_pem_private_key(data, password=None)
+            else:
+                self._key = serialization.load_pem_public_key(data)
+            if not isinstance(self._key, (Ed25519PrivateKey, Ed25519PublicKey)):
+                raise JWTError("EdDSA keys must be Ed25519")
+
+    def sign(self, msg):
+        return self._key.sign(msg)
+
+    def verify(self, msg, sig):
+        public = self._key.public_key() if isinstance(self._key, Ed25519PrivateKey) else self._key
+        try:
+            public.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_key(self):
+        if isinstance(self._key, Ed25519PublicKey):
+            return self
+        return Ed25519Key(self._key.public_key(), self._algorithm)
+
+    def to_dict(self):
+        public = self.public_key()._key.public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        return {"kty": "OKP", "crv": "Ed25519", "alg": self._algorithm, "x": _b64url(public)}
+
+
+jwk.register_key("EdDSA", Ed25519Key)
+
+
+# ==========================
+# 🗝️ KEYSET
+# ==========================
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    algorithm: str
+    verifier: Key
+    signer: Optional[Key] = None
+    not_before: Optional[datetime] = None
+    not_after: Optional[datetime] = None
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+    def can_verify(self, now: datetime) -> bool:
+        return self.not_after is None or now < self.not_after
+
+    def can_sign(self, now: datetime) -> bool:
+        return (
+            self.signer is not None
+            and self.can_verify(now)
+            and (self.not_before is None or now >= self.not_before)
+        )
+
+
+class KeySet:
+    def __init__(self, keys: List[SigningKey]):
+        if not keys:
+            raise ValueError("JWT keyset is empty")
+        self.keys: Dict[str, SigningKey] = {key.kid: key for key in keys}
+        self._jwks: Optional[bytes] = None
+        # The cached document is rebuilt once the next published key retires
+        self._jwks_expires: Optional[datetime] = None
+
+    # --- Loading ---
+    @classmethod
+    def from_settings(cls) -> "KeySet":
+        legacy = SigningKey(
+            kid=LEGACY_KID,
+            algorithm=settings.ALGORITHM,
+            verifier=jwk.construct(settings.SECRET_KEY, settings.ALGORITHM),
+            signer=jwk.construct(settings.SECRET_KEY, settings.ALGORITHM),
+        )
+        if not settings.JWT_KEYSET_FILE:
+            return cls([legacy])
+
+        keys = cls.load_file(settings.JWT_KEYSET_FILE)
+        if settings.JWT_ACCEPT_LEGACY_TOKENS:
+            # Verify-only, so HMAC tokens issued before the switch keep working until they expire
+            legacy.signer = None
+            keys.append(legacy)
+        return cls(keys)
+
+    @staticmethod
+    def load_file(path: str) -> List[SigningKey]:
+        base = Path(path).parent
+        entries = json.loads(Path(path).read_text())["keys"]
+        keys = []
+        for entry in entries:
+            alg = entry["alg"]
+            private = entry.get("private_key")
+            if entry.get("private_key_file"):
+                private = (base / entry["private_key_file"]).read_text()
+            public = entry.get("public_key")
+            if entry.get("public_key_file"):
+                public = (base / entry["public_key_file"]).read_text()
+
+            signer = jwk.construct(private, alg) if private else None
+            if signer is not None:
+                verifier = signer.public_key()
+            elif public:
+                verifier = jwk.construct(public, alg)
+            else:
+                raise ValueError(f"JWT key {entry['kid']!r} has no key material")
+            keys.append(SigningKey(
+                kid=entry["kid"],
+                algorithm=alg,
+                verifier=verifier,
+                signer=signer,
+                not_before=_parse_time(entry.get("not_before")),
+                not_after=_parse_time(entry.get("not_after")),
+            ))
+        return keys
+
+    # --- Signing / verification ---
+    def signing_key(self, now: Optional[datetime] = None) -> SigningKey:
+        """The most recently activated key that may sign right now."""
+        now = now or datetime.now(timezone.utc)
+        candidates = [key for key in self.keys.values() if key.can_sign(now)]
+        if not candidates:
+            raise JWTError("No active JWT signing key")
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        return max(candidates, key=lambda key: key.not_before or epoch)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        key = self.signing_key()
+        headers = None if key.kid == LEGACY_KID else {"kid": key.kid}
+        return jwt.encode(claims, key.signer, algorithm=key.algorithm, headers=headers)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verify `token` against the key named by its `kid`; raises `JWTError` like `jwt.decode`."""
+        kid = jwt.get_unverified_header(token).get("kid", LEGACY_KID)
+        if not isinstance(kid, str):
+            raise JWTError("Invalid kid header")
+        key = self.keys.get(kid)
+        if key is None or not key.can_verify(datetime.now(timezone.utc)):
+            raise JWTError("Unknown or retired signing key")
+        return jwt.decode(token, key.verifier, algorithms=[key.algorithm])
+
+    def jwks(self) -> bytes:
+        """Serialized JWKS document with every published public key (HMAC keys never leave)."""
+        now = datetime.now(timezone.utc)
+        if self._jwks is None or (self._jwks_expires is not None and now >= self._jwks_expires):
+            keys = []
+            published = []
+            for key in self.keys.values():
+                if key.is_symmetric or not key.can_verify(now):
+                    continue
+                entry = key.verifier.to_dict()
+                entry.update({"kid": key.kid, "use": "sig", "alg": key.algorithm})
+                keys.append(entry)
+                published.append(key)
+            self._jwks = json.dumps({"keys": keys}).encode()
+            self._jwks_expires = min((key.not_after for key in published if key.not_after), default=None)
+        return self._jwks
+
+
+@lru_cache(maxsize=1)
+def get_keyset() -> KeySet:
+    """Process-wide keyset, parsed once (restart workers to pick up a rotated file)."""
+    return KeySet.from_settings()
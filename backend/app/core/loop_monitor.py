@@ -0,0 +1,188 @@
+# app/core/loop_monitor.py
+"""
+Event-loop health: scheduling lag and blocking-call reports.
+
+`run_loop_lag_monitor` sleeps in a loop and records how late each wake-up is.
+That delay is time the loop spent running something that did not yield
+(bcrypt, file I/O, a large serialization...), and every request in flight
+waited for it. Exported as `event_loop_lag_seconds`.
+
+With `LOOP_BLOCKING_DEBUG` on, `blocking_detector` also runs a watchdog
+thread. The loop refreshes a heartbeat every few milliseconds; when the
+heartbeat gets older than `LOOP_BLOCKING_THRESHOLD_MS`, the loop is stuck in
+one callback right now, so the watchdog takes the loop thread's stack while it
+is still blocked, along with the route of the request whose task is running.
+Once the loop recovers, one structured report per stall is logged and kept in
+`blocking_detector.reports`. Unlike asyncio's debug-mode slow-callback
+warning, this names the blocking line instead of the handle, is sampled
+(`LOOP_BLOCKING_SAMPLE_RATE`), and costs nothing on the loop but the heartbeat.
+"""
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STACK_LIMIT = 40  # innermost frames kept per report
+
+loop_lag = Histogram(
+    "event_loop_lag_seconds", "Delay between when the loop should and did wake the lag probe",
+    buckets=LAG_BUCKETS,
+)
+loop_lag_last = Gauge("event_loop_lag_last_seconds", "Most recent event-loop lag sample")
+blocking_calls = Counter(
+    "event_loop_blocking_calls_total", "Callbacks that held the event loop past the threshold", ["route"]
+)
+
+# Task running each request -> its ASGI scope (filled by RouteContextMiddleware)
+_task_scopes: Dict[asyncio.Task, dict] = {}
+
+
+# ==========================
+# ⏱️ LAG MONITOR
+# ==========================
+async def run_loop_lag_monitor(interval: float) -> None:
+    """Sample the loop's scheduling delay every `interval` seconds until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        loop_lag.observe(lag)
+        loop_lag_last.set(lag)
+
+
+# ==========================
+# 🧭 ROUTE CONTEXT
+# ==========================
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}"
+
+
+def current_route() -> Optional[str]:
+    """Route of the request served by the running task, e.g. `GET /api/pages/pages/{page_id}`."""
+    try:
+        scope = _task_scopes.get(asyncio.current_task())
+    except RuntimeError:  # no running loop
+        return None
+    return _route_label(scope) if scope else None
+
+
+class RouteContextMiddleware:
+    """Pure ASGI middleware recording which request each task serves, for the watchdog thread."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        _task_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _task_scopes.pop(task, None)
+
+
+# ==========================
+# 🐢 BLOCKING-CALL DETECTOR
+# ==========================
+class BlockingCallDetector:
+    def __init__(self, threshold: float, sample_rate: float = 1.0, keep: int = 50):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._beat = 0.0
+        self._beat_handle: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the heartbeat on `loop` (call from the loop's thread) and the watchdog thread."""
+        if self.running:
+            return
+        self._loop, self._loop_thread = loop, threading.get_ident()
+        self._stop.clear()
+        self._heartbeat()
+        self._thread = threading.Thread(target=self._watch, name="loop-blocking-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        if self._beat_handle:
+            self._beat_handle.cancel()
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    def _heartbeat(self) -> None:
+        self._beat = time.monotonic()
+        self._beat_handle = self._loop.call_later(self.threshold / 4, self._heartbeat)
+
+    def _watch(self) -> None:
+        pending: Optional[Dict[str, Any]] = None
+        stalled_beat = None
+        while not self._stop.wait(self.threshold / 4):
+            beat = self._beat
+            if pending is not None and beat != stalled_beat:
+                # The loop is back: the stall lasted until this heartbeat
+                pending["blocked_ms"] = round((beat - stalled_beat) * 1000, 1)
+                self._report(pending)
+                pending = None
+            if pending is None and beat != stalled_beat and time.monotonic() - beat > self.threshold:
+                stalled_beat = beat
+                pending = self._capture()
+
+    def _capture(self) -> Dict[str, Any]:
+        """Snapshot what the loop thread is running right now (from the watchdog thread)."""
+        task = asyncio.current_task(self._loop)
+        scope = _task_scopes.get(task) if task else None
+        report: Dict[str, Any] = {
+            "route": _route_label(scope) if scope else None,
+            "task": task.get_name() if task else None,
+            "stack": None,
+        }
+        if random.random() < self.sample_rate:
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                report["stack"] = [
+                    f"{f.filename}:{f.lineno} in {f.name}"
+                    for f in traceback.extract_stack(frame, limit=STACK_LIMIT)
+                ]
+        return report
+
+    def _report(self, report: Dict[str, Any]) -> None:
+        blocking_calls.inc(route=report["route"] or "")
+        report["at"] = time.time()
+        self.reports.append(report)
+        where = report["stack"][-1] if report["stack"] else "stack not sampled"
+        logger.warning(
+            "Event loop blocked for %.0f ms (route=%s, task=%s) at %s",
+            report["blocked_ms"], report["route"], report["task"], where,
+            extra={"loop_block": report},
+        )
+
+
+blocking_detector = BlockingCallDetector(
+    settings.LOOP_BLOCKING_THRESHOLD_MS / 1000, settings.LOOP_BLOCKING_SAMPLE_RATE
+)
@@ -0,0 +1,230 @@
+# app/core/media_gc.py
+"""
+Reconcile stored media files with the `media` table.
+
+Both sides are streamed in ascending key order (storage listing vs. keyset
+pages of `Media.filename`) and merged, so memory stays bounded regardless of
+how many files or rows exist. The diff yields:
+
+- orphan files: stored objects with no `Media` row (failed uploads, user
+  deletions that cascaded rows but not files, ...)
+- dangling rows: `Media` rows whose file no longer exists
+
+Flat legacy files (`uploads/<name>`) that `migrate-uploads` kept next to their
+sharded copy are not orphans while a row still points at that copy: page
+content may embed their old URLs. They are counted as `legacy_kept` and only
+collected once their row is gone.
+
+The file listing is read lazily, so it can miss files written while it runs:
+rows get the same grace period as files, and a dangling row's file is
+re-checked before the row is deleted.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import and_, delete, or_, select
+
+from app.core.config import settings
+from app.core.response_cache import invalidate_tags
+from app.core.storage import StorageBackend, StoredObject, get_storage, shard_key
+from app.db.models.media import Media
+from app.db.session import AsyncSessionLocal
+
+# Number of example keys / ids kept in a report
+SAMPLE_SIZE = 20
+
+
+@dataclass
+class ReconcileReport:
+    files_scanned: int = 0
+    rows_scanned: int = 0
+    orphan_files: int = 0
+    orphan_bytes: int = 0
+    dangling_rows: int = 0
+    files_deleted: int = 0
+    rows_deleted: int = 0
+    skipped_recent: int = 0
+    legacy_kept: int = 0
+    orphan_samples: list[str] = field(default_factory=list)
+    dangling_samples: list[int] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"scanned {self.files_scanned} files / {self.rows_scanned} rows; "
+            f"{self.orphan_files} orphan files ({self.orphan_bytes} bytes), "
+            f"{self.dangling_rows} dangling rows, {self.skipped_recent} recent files / rows skipped, "
+            f"{self.legacy_kept} kept legacy files; "
+            f"deleted {self.files_deleted} files and {self.rows_deleted} rows"
+        )
+
+
+async def _iter_media_rows(batch_size: int) -> AsyncIterator[tuple[str, int, datetime]]:
+    """Yield (filename, id, uploaded_at) for every Media row in byte-wise filename order."""
+    last: Optional[tuple[str, int]] = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            column = Media.filename
+            if db.bind.dialect.name == "postgresql":
+                # Match the storage listing's byte order, not the locale collation
+                column = column.collate("C")
+            stmt = (
+                select(Media.filename, Media.id, Media.uploaded_at)
+                .order_by(column, Media.id)
+                .limit(batch_size)
+            )
+            if last is not None:
+                # Keyset on (filename, id): duplicate filenames may straddle a batch boundary
+                stmt = stmt.where(or_(column > last[0], and_(column == last[0], Media.id > last[1])))
+            rows = (await db.execute(stmt)).all()
+        if not rows:
+            return
+        for filename, media_id, uploaded_at in rows:
+            yield filename, media_id, uploaded_at
+        last = (rows[-1][0], rows[-1][1])
+
+
+async def _migrated_keys(keys: list[str]) -> set[str]:
+    """The sharded keys among `keys` that a Media row points at."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Media.filename).where(Media.filename.in_(keys)))
+        return set(result.scalars().all())
+
+
+async def _delete_rows(ids: list[int]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Media).where(Media.id.in_(ids)))
+        await db.commit()
+    await invalidate_tags("media:list")
+
+
+async def reconcile_media(
+    *,
+    storage: Optional[StorageBackend] = None,
+    delete_files: bool = False,
+    delete_rows: bool = False,
+    max_deletes_per_second: float = 50.0,
+    grace_period: timedelta = timedelta(hours=1),
+    batch_size: int = 1000,
+) -> ReconcileReport:
+    """
+    Diff storage against the `media` table and optionally clean up.
+
+    With both delete flags off this is a dry run that only fills the report.
+    Files and rows younger than `grace_period` are never deleted, so uploads
+    whose row is not committed yet (or whose file the listing missed) are left
+    alone. Deletes are rate-limited to
+    `max_deletes_per_second` to keep I/O pressure low on a live site.
+    """
+    storage = storage or get_storage()
+    report = ReconcileReport()
+    cutoff = datetime.now(timezone.utc) - grace_period
+    row_cutoff = cutoff.replace(tzinfo=None)  # uploaded_at is naive UTC
+    delay = 1.0 / max_deletes_per_second if max_deletes_per_second > 0 else 0.0
+    pending_rows: list[int] = []
+    pending_flat: list[StoredObject] = []
+
+    async def _orphan(obj: StoredObject) -> None:
+        if obj.modified_at and obj.modified_at > cutoff:
+            report.skipped_recent += 1
+            return
+        if "/" not in obj.key:
+            # Possibly a legacy file kept by migrate-uploads: checked in batches
+            pending_flat.append(obj)
+            if len(pending_flat) >= batch_size:
+                await _flush_flat()
+            return
+        await _collect(obj)
+
+    async def _flush_flat() -> None:
+        if not pending_flat:
+            return
+        batch = pending_flat[:]
+        pending_flat.clear()
+        migrated = await _migrated_keys([shard_key(obj.key) for obj in batch])
+        for obj in batch:
+            if shard_key(obj.key) in migrated:
+                report.legacy_kept += 1
+            else:
+                await _collect(obj)
+
+    async def _collect(obj: StoredObject) -> None:
+        report.orphan_files += 1
+        report.orphan_bytes += obj.size
+        if len(report.orphan_samples) < SAMPLE_SIZE:
+            report.orphan_samples.append(obj.key)
+        if delete_files:
+            if await storage.delete(obj.key):
+                report.files_deleted += 1
+            await asyncio.sleep(delay)
+
+    async def _dangling(filename: str, media_id: int, uploaded_at: Optional[datetime]) -> None:
+        if uploaded_at and uploaded_at > row_cutoff:
+            report.skipped_recent += 1
+            return
+        if delete_rows and await storage.stat(filename) is not None:
+            # Written after the listing passed this key
+            return
+        report.dangling_rows += 1
+        if len(report.dangling_samples) < SAMPLE_SIZE:
+            report.dangling_samples.append(media_id)
+        if delete_rows:
+            pending_rows.append(media_id)
+            if len(pending_rows) >= batch_size:
+                await _flush_rows()
+
+    async def _flush_rows() -> None:
+        if pending_rows:
+            await _delete_rows(pending_rows)
+            report.rows_deleted += len(pending_rows)
+            await asyncio.sleep(delay * len(pending_rows))
+            pending_rows.clear()
+
+    files = storage.iter_objects().__aiter__()
+    rows = _iter_media_rows(batch_size).__aiter__()
+
+    async def _next(iterator):
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    obj = await _next(files)
+    row = await _next(rows)
+    while obj is not None or row is not None:
+        if row is None or (obj is not None and obj.key < row[0]):
+            report.files_scanned += 1
+            await _orphan(obj)
+            obj = await _next(files)
+        elif obj is None or row[0] < obj.key:
+            report.rows_scanned += 1
+            await _dangling(*row)
+            row = await _next(rows)
+        else:
+            # Matched: consume every row pointing at this key (duplicates are not orphans)
+            report.files_scanned += 1
+            key = obj.key
+            while row is not None and row[0] == key:
+                report.rows_scanned += 1
+                row = await _next(rows)
+            obj = await _next(files)
+
+    await _flush_flat()
+    await _flush_rows()
+    return report
+
+
+async def run_periodic_media_gc(interval_seconds: int) -> None:
+    """Background loop started from the app lifespan when MEDIA_GC_INTERVAL_SECONDS > 0."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            report = await reconcile_media(
+                delete_files=settings.MEDIA_GC_DELETE,
+                delete_rows=settings.MEDIA_GC_DELETE,
+                max_deletes_per_second=settings.MEDIA_GC_MAX_DELETES_PER_SECOND,
+            )
+            print(f"🧹 Media GC: {report.summary()}")
+        except Exception as e:
+            print(f"❌ Media GC failed: {e}")
@@ -0,0 +1,279 @@
+# app/core/media_metadata.py
+"""
+Background extraction of media metadata (dimensions, duration, page count,
+dominant colour) into the queryable `Media` columns.
+
+The file is loaded whole (uploads are capped at 20 MB, see MAX_FILE_SIZE) and
+parsed in a worker thread, in pure Python, for the common formats (PNG,
+JPEG, GIF, WebP, PDF, WAV, MP4/MOV). The dominant colour additionally needs
+`Pillow` (in requirements.txt) and is skipped when it is not installed.
+"""
+import asyncio
+import io
+import logging
+import re
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.response_cache import invalidate_tags
+from app.core.storage import StorageBackend, get_storage
+from app.db.models.media import Media
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MediaMetadata:
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration_seconds: Optional[float] = None
+    page_count: Optional[int] = None
+    dominant_color: Optional[str] = None
+
+
+# ==========================
+# 🔍 FORMAT PARSERS
+# ==========================
+def _image_size(data: bytes) -> Optional[tuple[int, int]]:
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", data[6:10])
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            w, h = struct.unpack("<HH", data[26:30])
+            return w & 0x3FFF, h & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 1 if marker == 0xFF else 2
+                continue
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            # SOFn frames carry the dimensions (C4/C8/CC are DHT/JPG/DAC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                h, w = struct.unpack(">HH", data[i + 5:i + 9])
+                return w, h
+            i += 2 + length
+    return None
+
+
+def _pdf_page_count(data: bytes) -> Optional[int]:
+    pages = len(re.findall(rb"/Type\s*/Page(?![a-zA-Z])", data))
+    return pages or None
+
+
+def _wav_duration(data: bytes) -> Optional[float]:
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    i, byte_rate = 12, None
+    while i + 8 <= len(data):
+        chunk_id, size = data[i:i + 4], struct.unpack("<I", data[i + 4:i + 8])[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[i + 16:i + 20])[0]
+        elif chunk_id == b"data" and byte_rate:
+            return size / byte_rate
+        i += 8 + size + (size & 1)
+    return None
+
+
+def _iter_boxes(data: bytes, start: int, end: int):
+    i = start
+    while i + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[i:i + 8])
+        header = 8
+        if size == 1:
+            size, header = struct.unpack(">Q", data[i + 8:i + 16])[0], 16
+        elif size == 0:
+            size = end - i
+        if size < header:
+            return
+        yield kind, i + header, min(i + size, end)
+        i += size
+
+
+def _mp4_info(data: bytes) -> tuple[Optional[float], Optional[tuple[int, int]]]:
+    duration, dims = None, None
+    for kind, start, end in _iter_boxes(data, 0, len(data)):
+        if kind != b"moov":
+            continue
+        for sub, s_start, s_end in _iter_boxes(data, start, end):
+            if sub == b"mvhd":
+                version = data[s_start]
+                if version == 1:
+                    timescale, length = struct.unpack(">IQ", data[s_start + 20:s_start + 32])
+                else:
+                    timescale, length = struct.unpack(">II", data[s_start + 12:s_start + 20])
+                if timescale:
+                    duration = length / timescale
+            elif sub == b"trak" and dims is None:
+                for box, b_start, b_end in _iter_boxes(data, s_start, s_end):
+                    if box == b"tkhd":
+                        w, h = struct.unpack(">II", data[b_end - 8:b_end])
+                        if w and h:
+                            dims = (w >> 16, h >> 16)
+    return duration, dims
+
+
+def _dominant_color(data: bytes) -> Optional[str]:
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            r, g, b = img.convert("RGB").resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+    except Exception:
+        return None
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def extract_metadata(data: bytes, mimetype: str) -> MediaMetadata:
+    """Extract metadata from the raw file bytes. CPU-bound: run it in a thread."""
+    meta = MediaMetadata()
+    if mimetype.startswith("image/"):
+        size = _image_size(data)
+        if size:
+            meta.width, meta.height = size
+        meta.dominant_color = _dominant_color(data)
+    elif mimetype == "application/pdf":
+        meta.page_count = _pdf_page_count(data)
+    elif mimetype in ("audio/wav", "audio/x-wav", "audio/wave"):
+        meta.duration_seconds = _wav_duration(data)
+    elif mimetype.startswith(("video/", "audio/")):
+        meta.duration_seconds, size = _mp4_info(data)
+        if size:
+            meta.width, meta.height = size
+    return meta
+
+
+# ==========================
+# ⚙️ WORKER POOL
+# ==========================
+class MediaMetadataWorker:
+    """
+    Fixed-size pool of asyncio workers fed by an in-process queue.
+
+    Failed extractions are retried with exponential backoff; after
+    `max_retries` attempts the row is marked as processed with empty
+    metadata so it is not picked up again forever.
+
+    The queue lives in memory: ids queued when the process stopped are picked
+    up again by `start(resume=True)`, which queues every row not processed yet.
+    """
+
+    def __init__(self, concurrency: int = 2, max_retries: int = 3, backoff_seconds: float = 2.0):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.queue: asyncio.Queue[int] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    def enqueue(self, media_id: int) -> None:
+        self.queue.put_nowait(media_id)
+
+    async def enqueue_unprocessed(self, batch_size: int = 1000) -> int:
+        """Queue every media row without extracted metadata (keyset batches); returns how many."""
+        queued, last_id = 0, 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                ids = (await db.execute(
+                    select(Media.id)
+                    .where(Media.metadata_extracted_at.is_(None), Media.id > last_id)
+                    .order_by(Media.id)
+                    .limit(batch_size)
+                )).scalars().all()
+            if not ids:
+                return queued
+            for media_id in ids:
+                self.enqueue(media_id)
+            queued += len(ids)
+            last_id = ids[-1]
+
+    async def start(self, resume: bool = False) -> None:
+        """Start the workers; with `resume`, first queue the rows left unprocessed by a previous run."""
+        if resume:
+            queued = await self.enqueue_unprocessed()
+            if queued:
+                print(f"ℹ️ Queued {queued} media rows still waiting for metadata extraction.")
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def drain(self) -> None:
+        """Wait until every queued media row has been processed (including retries)."""
+        await self.queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            media_id = await self.queue.get()
+            try:
+                await self._process_with_retries(media_id)
+            except Exception:
+                # Keep the worker alive (e.g. the database is down while storing)
+                logger.exception("Metadata worker failed on media %s", media_id)
+            finally:
+                self.queue.task_done()
+
+    async def _process_with_retries(self, media_id: int) -> None:
+        for attempt in range(self.max_retries):
+            try:
+                await process_media(media_id)
+                return
+            except Exception as e:
+                error = e
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(self.backoff_seconds * 2 ** attempt)
+        print(f"❌ Metadata extraction failed for media {media_id}: {error}")
+        await _store(media_id, MediaMetadata())
+
+
+async def _store(media_id: int, meta: MediaMetadata) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Media)
+            .where(Media.id == media_id)
+            .values(**vars(meta), metadata_extracted_at=datetime.utcnow())
+        )
+        await db.commit()
+    await invalidate_tags("media:list")
+
+
+async def process_media(media_id: int, storage: Optional[StorageBackend] = None) -> Optional[MediaMetadata]:
+    """Extract and store metadata for one media row. Returns None if the row is gone."""
+    async with AsyncSessionLocal() as db:
+        media = await db.get(Media, media_id)
+        if media is None:
+            return None
+        key, mimetype = media.filename, media.mimetype
+    data = await (storage or get_storage()).get(key)
+    meta = await asyncio.to_thread(extract_metadata, data, mimetype)
+    await _store(media_id, meta)
+    return meta
+
+
+# Process-wide pool, started in the app startup hook
+metadata_worker = MediaMetadataWorker(
+    concurrency=settings.MEDIA_METADATA_WORKERS,
+    max_retries=settings.MEDIA_METADATA_MAX_RETRIES,
+)
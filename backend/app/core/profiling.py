@@ -0,0 +1,362 @@
+# app/core/profiling.py
+"""
+On-demand request profiling and memory snapshots (admin diagnostics).
+
+A request sent with `X-Profile: 1` or `?__profile=1` by a caller holding the
+`system.diagnostics` permission runs under a sampling profiler. A thread samples
+the request's task every `PROFILE_SAMPLE_INTERVAL_MS`. When the task runs, the
+loop thread's stack is sampled. When it waits, its coroutine chain is sampled,
+ending in the SQL statement it is waiting on if there is one. So the profile is
+wall-clock time with database time shown inline. Statements are also listed
+with their offsets and durations. The response carries `X-Profile-Id`; the
+profile is saved to `DIAGNOSTICS_DIR` so any worker can serve it, including in
+the folded-stack format that flamegraph.pl, speedscope and inferno read.
+
+Memory snapshots (`tracemalloc`) are saved to the same directory and tagged
+with the worker's pid, so growth is tracked per worker and compared between any
+two snapshots of the same worker.
+
+Requests without the switch pay one header / query-string check.
+"""
+import asyncio
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, status
+from sqlalchemy import event
+
+from app.core.auth_deps import get_current_principal
+from app.core.config import settings
+from app.core.permissions import require_permission
+from app.db.session import engine
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "__profile"
+SQL_LABEL_LENGTH = 120
+
+_active_profile: contextvars.ContextVar[Optional["RequestProfiler"]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+_authorize = require_permission("system.diagnostics")
+
+
+class DiagnosticsError(Exception):
+    """An invalid id, or snapshots that cannot be compared."""
+
+
+class DiagnosticsNotFound(DiagnosticsError):
+    """A profile or snapshot that does not exist (or was pruned)."""
+
+
+# ==========================
+# 🔥 SAMPLING PROFILER
+# ==========================
+def _frame_label(code, lineno: int) -> str:
+    # ";" separates frames in the folded format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{lineno})".replace(";", ",")
+
+
+def _sql_label(statement: str) -> str:
+    return "[sql] " + " ".join(statement.split())[:SQL_LABEL_LENGTH].replace(";", ",")
+
+
+def _await_chain(coro) -> List[str]:
+    """Frames of a suspended coroutine and everything it awaits (Task.get_stack stops at the first)."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame.f_code, frame.f_lineno))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+class RequestProfiler:
+    def __init__(self, task: asyncio.Task, interval: float):
+        self.task = task
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.sql: List[Dict[str, Any]] = []
+        self.in_sql: Optional[str] = None
+        self._loop = task.get_loop()
+        self._loop_thread = threading.get_ident()
+        self._root = task.get_coro().cr_code
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+        self.started = self.stopped = 0.0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                stack = self._sample()
+            except Exception:
+                continue  # the task moved on mid-walk; skip this sample
+            if stack:
+                self.stacks[";".join(stack)] += 1
+
+    def _sample(self) -> List[str]:
+        if asyncio.current_task(self._loop) is self.task:
+            frame = sys._current_frames().get(self._loop_thread)
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()
+            # Drop the event loop machinery above the task's own coroutine
+            for index, f in enumerate(frames):
+                if f.f_code is self._root:
+                    frames = frames[index:]
+                    break
+            return [_frame_label(f.f_code, f.f_lineno) for f in frames]
+        # Suspended: the coroutine chain, and what it waits on
+        stack = _await_chain(self.task.get_coro())
+        stack.append(_sql_label(self.in_sql) if self.in_sql else "[await]")
+        return stack
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def result(self, **info: Any) -> Dict[str, Any]:
+        return {
+            **info,
+            "pid": os.getpid(),
+            "wall_ms": round((self.stopped - self.started) * 1000, 2),
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.stacks.values()),
+            "sql_ms": round(sum(q["ms"] for q in self.sql), 2),
+            "sql": self.sql,
+            "folded": self.folded(),
+        }
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    profiler = _active_profile.get()
+    if profiler is not None:
+        profiler.in_sql = statement
+        conn.info["profile_sql_started"] = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    profiler = _active_profile.get()
+    if profiler is not None:
+        started = conn.info.pop("profile_sql_started", None)
+        profiler.in_sql = None
+        if started is not None:
+            profiler.sql.append({
+                "start_ms": round((started - profiler.started) * 1000, 2),
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                "statement": " ".join(statement.split()),
+            })
+
+
+# ==========================
+# 💾 STORAGE (shared by all workers)
+# ==========================
+def _path(name: str) -> str:
+    if not name.replace("-", "").isalnum():
+        raise DiagnosticsError(f"Invalid id '{name}'")
+    return os.path.join(settings.DIAGNOSTICS_DIR, name)
+
+
+def _prune(pattern: str) -> None:
+    files = sorted(glob.glob(os.path.join(settings.DIAGNOSTICS_DIR, pattern)), key=os.path.getmtime)
+    for old in files[:-settings.DIAGNOSTICS_KEEP]:
+        with contextlib.suppress(FileNotFoundError):  # another worker got there first
+            os.remove(old)
+
+
+def _save_profile(profile: Dict[str, Any]) -> None:
+    os.makedirs(settings.DIAGNOSTICS_DIR, exist_ok=True)
+    with open(_path(f"profile-{profile['id']}") + ".json", "w") as fh:
+        json.dump(profile, fh)
+    _prune("profile-*.json")
+
+
+def load_profile(profile_id: str) -> Dict[str, Any]:
+    try:
+        with open(_path(f"profile-{profile_id}") + ".json") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        raise DiagnosticsNotFound(f"Profile '{profile_id}' not found")
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    profiles = []
+    for path in sorted(glob.glob(os.path.join(settings.DIAGNOSTICS_DIR, "profile-*.json")), key=os.path.getmtime):
+        try:
+            with open(path) as fh:
+                profile = json.load(fh)
+        except FileNotFoundError:
+            continue
+        profiles.append({k: v for k, v in profile.items() if k not in ("folded", "sql")})
+    return profiles
+
+
+# ==========================
+# 🧩 MIDDLEWARE
+# ==========================
+def _wants_profile(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"", b"0", b"false")
+    query = scope.get("query_string", b"")
+    return PROFILE_QUERY.encode() in query and parse_qs(query.decode()).get(PROFILE_QUERY, ["0"])[0] not in ("", "0", "false")
+
+
+async def _authorize_scope(scope) -> None:
+    token = None
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                token = None
+            break
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    await _authorize(current_user=await get_current_principal(token))
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: profile the requests that ask for it, if the caller may."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await _authorize_scope(scope)
+        except HTTPException as e:
+            body = json.dumps({"detail": e.detail}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": e.status_code,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        profile_id = uuid.uuid4().hex[:16]
+        profiler = RequestProfiler(asyncio.current_task(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        response_status = None
+
+        async def send_with_id(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        token = _active_profile.set(profiler)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            _active_profile.reset(token)
+            route = scope.get("route")
+            profile = profiler.result(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=getattr(route, "path", None),
+                status=response_status,
+                at=time.time(),
+            )
+            await asyncio.to_thread(_save_profile, profile)
+
+
+# ==========================
+# 🧠 MEMORY SNAPSHOTS
+# ==========================
+def take_memory_snapshot() -> Dict[str, Any]:
+    """Start tracing if needed and save a snapshot of this worker's allocations."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    os.makedirs(settings.DIAGNOSTICS_DIR, exist_ok=True)
+    pid = os.getpid()
+    snapshot_id = f"{pid}-{int(time.time() * 1000)}"  # the worker's pid leads the id
+    snapshot.dump(_path(f"memory-{snapshot_id}") + ".snap")
+    _prune("memory-*.snap")
+    current, peak = tracemalloc.get_traced_memory()
+    return {"id": snapshot_id, "pid": pid, "traced_bytes": current, "peak_bytes": peak}
+
+
+def list_memory_snapshots() -> List[Dict[str, Any]]:
+    snapshots = []
+    for path in sorted(glob.glob(os.path.join(settings.DIAGNOSTICS_DIR, "memory-*.snap")), key=os.path.getmtime):
+        snapshot_id = os.path.basename(path)[len("memory-"):-len(".snap")]
+        snapshots.append({"id": snapshot_id, "pid": int(snapshot_id.split("-")[0]), "bytes": os.path.getsize(path)})
+    return snapshots
+
+
+def _load_snapshot(snapshot_id: str) -> tracemalloc.Snapshot:
+    try:
+        return tracemalloc.Snapshot.load(_path(f"memory-{snapshot_id}") + ".snap")
+    except FileNotFoundError:
+        raise DiagnosticsNotFound(f"Memory snapshot '{snapshot_id}' not found")
+
+
+def _stat(stat) -> Dict[str, Any]:
+    frame = stat.traceback[-1]  # most recent frame
+    return {
+        "where": f"{frame.filename}:{frame.lineno}",
+        **({"traceback": stat.traceback.format()} if len(stat.traceback) > 1 else {}),
+        "size_bytes": stat.size,
+        "count": stat.count,
+        **({"size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff} if hasattr(stat, "size_diff") else {}),
+    }
+
+
+def memory_top(snapshot_id: str, limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+    snapshot = _load_snapshot(snapshot_id)
+    stats = snapshot.statistics(group_by)
+    return {"id": snapshot_id, "total_bytes": sum(s.size for s in stats), "top": [_stat(s) for s in stats[:limit]]}
+
+
+def memory_diff(base_id: str, snapshot_id: str, limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+    """Allocation growth from `base_id` to `snapshot_id` (both from the same worker)."""
+    if base_id.split("-")[0] != snapshot_id.split("-")[0]:
+        raise DiagnosticsError("Snapshots come from different workers (pids); compare snapshots of one worker")
+    diff = _load_snapshot(snapshot_id).compare_to(_load_snapshot(base_id), group_by)
+    return {
+        "base": base_id,
+        "snapshot": snapshot_id,
+        "growth_bytes": sum(s.size_diff for s in diff),
+        "top": [_stat(s) for s in diff[:limit]],
+    }
+
+
+def stop_memory_tracing() -> bool:
+    tracing = tracemalloc.is_tracing()
+    tracemalloc.stop()
+    return tracing
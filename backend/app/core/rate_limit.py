@@ -0,0 +1,311 @@
+# app/core/rate_limit.py
+"""
+Brute-force throttling for the authentication endpoints.
+
+Failed attempts are counted in a sliding window per client IP and per account.
+Once a key goes over its limit it is locked out with exponential backoff, and
+locked-out requests are rejected *before* any bcrypt work, so a credential-
+stuffing burst cannot saturate the worker CPUs.
+
+The counters live in a pluggable `ThrottleStore`:
+
+- `MemoryThrottleStore`: single process / single node
+- `PostgresThrottleStore`: shared through the application database
+- `RedisThrottleStore`: any Redis-compatible server (needs the optional
+  `redis` package; tests can pass a `fakeredis.aioredis.FakeRedis` client)
+"""
+import hashlib
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.db.models.auth_throttle import AuthThrottleBlock, AuthThrottleEvent
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import upsert_insert
+
+# Identities longer than this (usernames are not length-checked) are hashed,
+# so every key fits the String(300) key columns
+MAX_IDENTITY_LENGTH = 128
+
+throttle_decisions = Counter(
+    "auth_throttle_decisions_total",
+    "Authentication throttle decisions by endpoint, scope and outcome.",
+    ["endpoint", "scope", "decision"],
+)
+
+
+# ==========================
+# 🗄️ STORES
+# ==========================
+class ThrottleStore(ABC):
+    @abstractmethod
+    async def hit(self, key: str, now: float, window: float) -> int:
+        """Record one attempt and return the attempts inside the window (including it)."""
+
+    @abstractmethod
+    async def get_block(self, key: str) -> Tuple[float, int]:
+        """Return (blocked_until, strikes); (0.0, 0) when never blocked."""
+
+    @abstractmethod
+    async def set_block(self, key: str, blocked_until: float, strikes: int) -> None:
+        """Lock `key` out until `blocked_until`."""
+
+    @abstractmethod
+    async def clear(self, key: str) -> None:
+        """Forget every attempt and lockout for `key` (e.g. after a successful login)."""
+
+
+class MemoryThrottleStore(ThrottleStore):
+    """
+    Keys that stop being hit are swept every `sweep_interval` seconds, so a
+    spray over many IPs / accounts does not grow memory without bound.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._hits: Dict[str, Deque[float]] = {}
+        self._blocks: Dict[str, Tuple[float, int]] = {}
+        self._max_window = 0.0
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+    async def hit(self, key, now, window):
+        self._max_window = max(self._max_window, window)
+        if now >= self._next_sweep:
+            self._sweep(now)
+        hits = self._hits.setdefault(key, deque())
+        hits.append(now)
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        return len(hits)
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self._sweep_interval
+        # No hit inside any window: the key's count would be 0 anyway
+        self._hits = {k: v for k, v in self._hits.items() if v and v[-1] > now - self._max_window}
+        # Strikes are forgotten this long after the lockout ends (see LoginThrottle.failure)
+        forget = now - settings.AUTH_THROTTLE_STRIKE_MEMORY_SECONDS
+        self._blocks = {k: v for k, v in self._blocks.items() if v[0] > forget}
+
+    async def get_block(self, key):
+        return self._blocks.get(key, (0.0, 0))
+
+    async def set_block(self, key, blocked_until, strikes):
+        self._blocks[key] = (blocked_until, strikes)
+
+    async def clear(self, key):
+        self._hits.pop(key, None)
+        self._blocks.pop(key, None)
+
+
+class PostgresThrottleStore(ThrottleStore):
+    """
+    Uses the auth_throttle_* tables, so every worker and node shares the counters.
+    Like the memory store, rows of keys that stop being hit are swept every
+    `sweep_interval` seconds (by whichever worker gets there first).
+    """
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._max_window = 0.0
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+    async def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self._sweep_interval
+        forget = now - settings.AUTH_THROTTLE_STRIKE_MEMORY_SECONDS
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(AuthThrottleEvent).where(AuthThrottleEvent.ts <= now - self._max_window))
+            await db.execute(delete(AuthThrottleBlock).where(AuthThrottleBlock.blocked_until <= forget))
+            await db.commit()
+
+    async def hit(self, key, now, window):
+        self._max_window = max(self._max_window, window)
+        if now >= self._next_sweep:
+            await self._sweep(now)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(AuthThrottleEvent).where(
+                    AuthThrottleEvent.key == key, AuthThrottleEvent.ts <= now - window
+                )
+            )
+            db.add(AuthThrottleEvent(key=key, ts=now))
+            await db.flush()
+            count = await db.scalar(
+                select(func.count()).select_from(AuthThrottleEvent).where(AuthThrottleEvent.key == key)
+            )
+            await db.commit()
+        return count
+
+    async def get_block(self, key):
+        async with AsyncSessionLocal() as db:
+            block = await db.get(AuthThrottleBlock, key)
+        return (block.blocked_until, block.strikes) if block else (0.0, 0)
+
+    async def set_block(self, key, blocked_until, strikes):
+        async with AsyncSessionLocal() as db:
+            insert = upsert_insert(db)
+            if insert is None:
+                await db.merge(AuthThrottleBlock(key=key, blocked_until=blocked_until, strikes=strikes))
+            else:
+                # Atomic: concurrent failures crossing the limit on one key must not race on the insert
+                stmt = insert(AuthThrottleBlock).values(key=key, blocked_until=blocked_until, strikes=strikes)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[AuthThrottleBlock.key],
+                    set_={"blocked_until": stmt.excluded.blocked_until, "strikes": stmt.excluded.strikes},
+                ))
+            await db.commit()
+
+    async def clear(self, key):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(AuthThrottleEvent).where(AuthThrottleEvent.key == key))
+            await db.execute(delete(AuthThrottleBlock).where(AuthThrottleBlock.key == key))
+            await db.commit()
+
+
+class RedisThrottleStore(ThrottleStore):
+    """Sliding window as a sorted set per key; lockouts as a small hash with a TTL."""
+
+    def __init__(self, client=None, url: Optional[str] = None, prefix: str = "throttle:"):
+        if client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError("Redis throttling requires the 'redis' package") from exc
+            client = redis_asyncio.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+
+    async def hit(self, key, now, window):
+        zkey = f"{self.prefix}hits:{key}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(zkey, 0, now - window)
+            # Unique member: concurrent hits in the same microsecond must both count
+            pipe.zadd(zkey, {f"{now:.6f}:{uuid.uuid4().hex[:8]}": now})
+            pipe.zcard(zkey)
+            pipe.expire(zkey, int(window) + 1)
+            _, _, count, _ = await pipe.execute()
+        return int(count)
+
+    async def get_block(self, key):
+        data = await self.redis.hgetall(f"{self.prefix}block:{key}")
+        if not data:
+            return 0.0, 0
+        data = {k.decode() if isinstance(k, bytes) else k: v for k, v in data.items()}
+        return float(data["until"]), int(data["strikes"])
+
+    async def set_block(self, key, blocked_until, strikes):
+        bkey = f"{self.prefix}block:{key}"
+        # Keep the strike count around for a while after the lockout ends
+        ttl = int(max(blocked_until - time.time(), 0) + settings.AUTH_THROTTLE_STRIKE_MEMORY_SECONDS)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(bkey, mapping={"until": blocked_until, "strikes": strikes})
+            pipe.expire(bkey, max(ttl, 1))
+            await pipe.execute()
+
+    async def clear(self, key):
+        await self.redis.delete(f"{self.prefix}hits:{key}", f"{self.prefix}block:{key}")
+
+
+# ==========================
+# 🚦 POLICY
+# ==========================
+@dataclass(frozen=True)
+class ThrottleRule:
+    scope: str          # "ip" or "account"
+    limit: int          # attempts allowed inside the window
+    window: float       # seconds
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        store: ThrottleStore,
+        rules: Tuple[ThrottleRule, ...],
+        base_lockout: float,
+        max_lockout: float,
+    ):
+        self.store = store
+        self.rules = {rule.scope: rule for rule in rules}
+        self.base_lockout = base_lockout
+        self.max_lockout = max_lockout
+
+    @staticmethod
+    def _key(endpoint: str, scope: str, value: str) -> str:
+        value = value.lower()
+        if len(value) > MAX_IDENTITY_LENGTH:
+            value = "sha256:" + hashlib.sha256(value.encode()).hexdigest()
+        return f"{endpoint}:{scope}:{value}"
+
+    async def check(self, endpoint: str, **identities: str) -> None:
+        """Reject with 429 if any identity (ip=..., account=...) is locked out. No hashing happens first."""
+        now = time.time()
+        for scope, value in identities.items():
+            blocked_until, _ = await self.store.get_block(self._key(endpoint, scope, value))
+            if blocked_until > now:
+                throttle_decisions.inc(endpoint=endpoint, scope=scope, decision="rejected")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many attempts. Try again later.",
+                    headers={"Retry-After": str(int(blocked_until - now) + 1)},
+                )
+        throttle_decisions.inc(endpoint=endpoint, scope="all", decision="allowed")
+
+    async def failure(self, endpoint: str, **identities: str) -> None:
+        """Count a failed attempt; lock out keys that went over their limit."""
+        now = time.time()
+        for scope, value in identities.items():
+            rule = self.rules[scope]
+            key = self._key(endpoint, scope, value)
+            if await self.store.hit(key, now, rule.window) > rule.limit:
+                blocked_until, strikes = await self.store.get_block(key)
+                # Strikes are forgiven once a key has behaved for a while
+                if blocked_until and now - blocked_until > settings.AUTH_THROTTLE_STRIKE_MEMORY_SECONDS:
+                    strikes = 0
+                lockout = min(self.base_lockout * 2 ** strikes, self.max_lockout)
+                await self.store.set_block(key, now + lockout, strikes + 1)
+                throttle_decisions.inc(endpoint=endpoint, scope=scope, decision="locked")
+
+    async def success(self, endpoint: str, **identities: str) -> None:
+        """Reset counters after a successful attempt (only pass the account, not a shared IP)."""
+        for scope, value in identities.items():
+            await self.store.clear(self._key(endpoint, scope, value))
+
+
+def client_ip(request: Request) -> str:
+    """Client address, honouring X-Forwarded-For only when the proxy is trusted."""
+    if settings.TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+@lru_cache(maxsize=1)
+def get_login_throttle() -> LoginThrottle:
+    """Process-wide throttle built from settings (AUTH_THROTTLE_BACKEND selects the store)."""
+    backend = settings.AUTH_THROTTLE_BACKEND
+    if backend == "memory":
+        store: ThrottleStore = MemoryThrottleStore()
+    elif backend == "postgres":
+        store = PostgresThrottleStore()
+    elif backend == "redis":
+        store = RedisThrottleStore(url=settings.REDIS_URL)
+    else:
+        raise ValueError(f"Unknown AUTH_THROTTLE_BACKEND: {backend!r}")
+    return LoginThrottle(
+        store,
+        rules=(
+            ThrottleRule("ip", settings.AUTH_THROTTLE_IP_LIMIT, settings.AUTH_THROTTLE_IP_WINDOW_SECONDS),
+            ThrottleRule("account", settings.AUTH_THROTTLE_ACCOUNT_LIMIT, settings.AUTH_THROTTLE_ACCOUNT_WINDOW_SECONDS),
+        ),
+        base_lockout=settings.AUTH_THROTTLE_BASE_LOCKOUT_SECONDS,
+        max_lockout=settings.AUTH_THROTTLE_MAX_LOCKOUT_SECONDS,
+    )
@@ -0,0 +1,355 @@
+# app/core/response_cache.py
+"""
+Route-level cache of encoded JSON responses with tag-based invalidation.
+
+    @router.get("/{page_id}", response_model=PageRead, dependencies=[...])
+    @cached_response(PageRead, tags=["page:{page_id}"])
+    async def get_page(page_id: int, db: AsyncSession = Depends(get_db)): ...
+
+Entries are keyed by route, the endpoint's path/query parameters and the
+caller's role (the permission scope), and store the already-serialized body,
+so a hit skips both the queries and Pydantic serialization. CRUD mutations
+call `invalidate_tags("page:42", "pages:list")` after committing; the tags
+travel over the invalidation bus, so every worker's memory cache drops them.
+
+Misses go through a single-flight group, so concurrent requests for the same
+key after an invalidation run the endpoint once. Entries past their TTL are
+served stale for RESPONSE_CACHE_STALE_SECONDS while one background refresh
+reloads them (stale-while-revalidate); invalidated entries are never served.
+
+Backends (RESPONSE_CACHE_BACKEND):
+
+- `memory`: per-worker LRU bounded by RESPONSE_CACHE_MAX_BYTES
+- `redis`: shared by every worker (needs the optional `redis` package);
+  bound memory with the server's `maxmemory` + `allkeys-lru` policy
+- `off`: disabled
+"""
+import asyncio
+import functools
+import inspect
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Depends, Response
+from fastapi.params import Depends as DependsParam
+
+from app.core.auth_deps import Principal, get_current_principal
+from app.core.config import settings
+from app.core.invalidation_bus import ALL_KEYS, invalidation_bus
+from app.core.metrics import Counter
+from app.core.responses import encode_json
+from app.core.single_flight import SingleFlight
+from app.db.session import AsyncSessionLocal, get_db
+
+cache_requests = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups by route and result.",
+    ["route", "result"],
+)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    tags: Tuple[str, ...]
+    fresh_until: float
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+
+# ==========================
+# 🗄️ BACKENDS
+# ==========================
+class ResponseCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[bytes, bool]]:
+        """(body, is_fresh) for `key`, or None. Stale bodies are past `ttl` but inside `stale_ttl`."""
+
+    @abstractmethod
+    async def set(
+        self, key: str, body: bytes, tags: Iterable[str], ttl: float, stale_ttl: float, since: float
+    ) -> None:
+        """
+        Store `body`, unless one of `tags` was invalidated after `since` (the
+        time the response started to be computed), so a slow read racing a
+        write never re-caches stale data.
+        """
+
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying one of `tags`; return how many were dropped (if known)."""
+
+    async def clear(self) -> None:
+        """Drop everything."""
+
+
+class MemoryResponseCache(ResponseCacheBackend):
+    """LRU over an OrderedDict, bounded by the total size of the cached bodies."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._invalidated_at: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry.expires_at < now:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.body, now < entry.fresh_until
+
+    async def set(self, key, body, tags, ttl, stale_ttl, since):
+        tags = tuple(tags)
+        if len(body) > self.max_bytes or any(self._invalidated_at.get(t, 0.0) >= since for t in tags):
+            return
+        if key in self._entries:
+            self._remove(key)
+        now = time.monotonic()
+        self._entries[key] = CachedResponse(body, tags, now + ttl, now + ttl + stale_ttl)
+        self.size += len(body)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, tags):
+        now = time.monotonic()
+        dropped = 0
+        for tag in tags:
+            self._invalidated_at[tag] = now
+            for key in self._by_tag.pop(tag, ()):
+                if key in self._entries:
+                    self._remove(key)
+                    dropped += 1
+        self._prune_invalidations(now)
+        return dropped
+
+    async def clear(self):
+        self._entries.clear()
+        self._by_tag.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def _prune_invalidations(self, now: float) -> None:
+        # Only reads still in flight care about old invalidations
+        if len(self._invalidated_at) > 10_000:
+            horizon = now - 60.0
+            self._invalidated_at = {t: at for t, at in self._invalidated_at.items() if at >= horizon}
+
+
+class RedisResponseCache(ResponseCacheBackend):
+    """Bodies as small hashes (body + fresh-until) with a TTL; each tag is a set of the keys carrying it."""
+
+    def __init__(self, client=None, url: Optional[str] = None, prefix: str = "respcache:"):
+        if client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError("The redis response cache requires the 'redis' package") from exc
+            client = redis_asyncio.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+
+    async def get(self, key):
+        body, fresh_until = await self.redis.hmget(f"{self.prefix}e:{key}", "b", "f")
+        if body is None:
+            return None
+        return body, time.time() < float(fresh_until)
+
+    async def set(self, key, body, tags, ttl, stale_ttl, since):
+        # `since` is a per-process monotonic time, so the race guard is local only;
+        # the TTL bounds any entry that slips through.
+        expire = max(int(ttl + stale_ttl), 1)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"{self.prefix}e:{key}", mapping={"b": body, "f": time.time() + ttl})
+            pipe.expire(f"{self.prefix}e:{key}", expire)
+            for tag in tags:
+                pipe.sadd(f"{self.prefix}t:{tag}", key)
+                pipe.expire(f"{self.prefix}t:{tag}", expire)
+            await pipe.execute()
+
+    async def invalidate(self, tags):
+        dropped = 0
+        for tag in tags:
+            tag_key = f"{self.prefix}t:{tag}"
+            keys = await self.redis.smembers(tag_key)
+            names = [f"{self.prefix}e:{k.decode() if isinstance(k, bytes) else k}" for k in keys]
+            if names:
+                dropped += await self.redis.delete(*names)
+            await self.redis.delete(tag_key)
+        return dropped
+
+    async def clear(self):
+        async for name in self.redis.scan_iter(f"{self.prefix}*"):
+            await self.redis.delete(name)
+
+
+class NullResponseCache(ResponseCacheBackend):
+    async def get(self, key):
+        return None
+
+    async def set(self, key, body, tags, ttl, stale_ttl, since):
+        return None
+
+    async def invalidate(self, tags):
+        return 0
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCacheBackend:
+    """Process-wide backend selected by RESPONSE_CACHE_BACKEND."""
+    backend = settings.RESPONSE_CACHE_BACKEND
+    if backend == "memory":
+        return MemoryResponseCache(settings.RESPONSE_CACHE_MAX_BYTES)
+    if backend == "redis":
+        return RedisResponseCache(url=settings.REDIS_URL)
+    if backend == "off":
+        return NullResponseCache()
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend!r}")
+
+
+BUS_TOPIC = "response_cache"
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Called by CRUD mutations after commit, in this worker and (via the bus) all others."""
+    await invalidation_bus.publish(BUS_TOPIC, *tags)
+
+
+async def _on_bus_event(tags: List[str]) -> None:
+    backend = get_response_cache()
+    if ALL_KEYS in tags:
+        await backend.clear()
+    else:
+        await backend.invalidate(tags)
+
+
+async def _resync() -> None:
+    # Invalidations may have been missed while disconnected; a shared backend was not affected
+    backend = get_response_cache()
+    if isinstance(backend, MemoryResponseCache):
+        await backend.clear()
+
+
+invalidation_bus.subscribe(BUS_TOPIC, _on_bus_event, resync=_resync)
+
+
+# ==========================
+# 🎀 DECORATOR
+# ==========================
+# Collapses concurrent misses for the same cache key (see app.core.single_flight)
+response_flight = SingleFlight("response_cache")
+
+# Background stale-while-revalidate refreshes (strong refs so they are not GC'd)
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+def cached_response(response_model: Any, tags: List[str], ttl: Optional[float] = None):
+    """
+    Cache the endpoint's encoded response.
+
+    `response_model` is what the route declares (used to encode the result);
+    `tags` are format strings over the endpoint's parameters, e.g.
+    "page:{page_id}". Exceptions (404, 403, ...) are never cached. Place it
+    *under* the `@router.get(...)` decorator.
+
+    Stale-while-revalidate needs a fresh DB session for the background
+    reload, so it is only enabled when the endpoint's only dependency is
+    `get_db`; other endpoints treat a stale entry as a miss.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        deps = {
+            name: param.default.dependency
+            for name, param in signature.parameters.items()
+            if isinstance(param.default, DependsParam)
+        }
+        key_params = [name for name in signature.parameters if name not in deps]
+        db_params = [name for name, dependency in deps.items() if dependency is get_db]
+        can_revalidate = len(db_params) == len(deps)
+        route = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        async def load(key: str, kwargs: Dict[str, Any]) -> bytes:
+            since = time.monotonic()
+            result = await func(**kwargs)
+            body = encode_json(response_model, result)
+            await get_response_cache().set(
+                key,
+                body,
+                [tag.format(**kwargs) for tag in tags],
+                ttl or settings.RESPONSE_CACHE_TTL_SECONDS,
+                settings.RESPONSE_CACHE_STALE_SECONDS,
+                since,
+            )
+            return body
+
+        async def revalidate(key: str, kwargs: Dict[str, Any]) -> None:
+            try:
+                async with AsyncSessionLocal() as db:
+                    fresh_kwargs = {**kwargs, **{name: db for name in db_params}}
+                    await response_flight.do(key, lambda: load(key, fresh_kwargs))
+            except Exception as e:
+                print(f"❌ Background refresh of {route} failed: {e}")
+
+        @functools.wraps(func)
+        async def wrapper(*, _cache_principal: Principal = Depends(get_current_principal), **kwargs):
+            params = "&".join(f"{name}={kwargs.get(name)!r}" for name in key_params)
+            key = f"{route}|{_cache_principal.role}|{params}"
+
+            cached = await get_response_cache().get(key)
+            if cached is not None:
+                body, fresh = cached
+                if fresh or can_revalidate:
+                    if not fresh and not response_flight.in_flight(key):
+                        task = asyncio.create_task(revalidate(key, kwargs))
+                        _refresh_tasks.add(task)
+                        task.add_done_callback(_refresh_tasks.discard)
+                    result = "hit" if fresh else "stale"
+                    cache_requests.inc(route=route, result=result)
+                    return Response(body, media_type="application/json", headers={"X-Cache": result.upper()})
+
+            cache_requests.inc(route=route, result="miss")
+            body = await response_flight.do(
+                key, lambda: load(key, kwargs), timeout=settings.RESPONSE_CACHE_FLIGHT_TIMEOUT_SECONDS
+            )
+            return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+        # Expose the principal to FastAPI; it is the same (deduplicated) dependency
+        # the permission check already resolves, so it adds no work.
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(
+                "_cache_principal",
+                inspect.Parameter.KEYWORD_ONLY,
+                default=Depends(get_current_principal),
+                annotation=Principal,
+            ),
+        ])
+        return wrapper
+
+    return decorator
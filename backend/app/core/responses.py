@@ -0,0 +1,66 @@
+# app/core/responses.py
+"""
+Fast JSON responses.
+
+- `FastJSONResponse` is the app's default response class: it encodes with
+  `orjson` when installed (falls back to the stdlib encoder otherwise).
+- `encode_json(model, obj)` / `json_response(model, obj)` turn ORM objects
+  straight into JSON bytes: one `from_attributes` validation, then
+  pydantic-core's Rust encoder. FastAPI's `response_model` path instead
+  validates, dumps to Python dicts and then encodes those again. Use them
+  for the large list endpoints.
+
+TypeAdapters are built once per model and reused.
+"""
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON-encode plain Python data (datetimes as ISO 8601), with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def adapter_for(model: Any) -> TypeAdapter:
+    """Cached TypeAdapter for a response model, e.g. `PageRead` or `list[PageRead]`."""
+    return TypeAdapter(model)
+
+
+def encode_json(model: Any, obj: Any) -> bytes:
+    """Serialize ORM object(s) as `model` directly to JSON bytes."""
+    adapter = adapter_for(model)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+def json_response(
+    model: Any, obj: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """Drop-in return value for routes declared with `response_model=model`."""
+    return Response(encode_json(model, obj), status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,148 @@
+# app/core/revocation.py
+"""
+Token revocation epochs.
+
+Every user has a `token_epoch` counter that is embedded in their tokens as the
+`ep` claim. Bumping the counter (logout, password reset, deactivation, role
+change) revokes every token issued before. Each worker keeps a compact
+in-memory table of `{user_id: epoch}` for users whose epoch is above zero, so
+access tokens are verified without touching the database.
+
+On Postgres the bump is sent on the invalidation bus inside the same
+transaction, so other workers only see it once it commits; the bus reloads
+the whole table after every (re)connect so nothing is missed while its
+connection was down. Without Postgres there is no bus: each worker reloads
+the table every `TOKEN_REVOCATION_POLL_SECONDS` (`poll_revocation_table`), so a
+revocation made on another worker applies within that delay. The local table
+is updated once the transaction commits too, so a rollback does not leave
+valid tokens rejected.
+
+Deleting a user leaves a `UserTombstone` with their last epoch, so their
+unexpired access tokens stay revoked after a reload.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.invalidation_bus import ALL_KEYS, invalidation_bus
+from app.db.models.user import User
+from app.db.models.user_tombstone import UserTombstone
+from app.db.session import AsyncSessionLocal
+
+TOPIC = "token_revocation"
+
+# session.info key for epochs to apply once the transaction commits
+_PENDING = "revocation_epochs"
+
+
+def _tombstone_cutoff() -> datetime:
+    # Access tokens of a deleted user are all expired after this
+    return datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+class RevocationTable:
+    def __init__(self):
+        self._epochs: Dict[int, int] = {}
+        # Epochs set while a reload is reading the database (re-applied after it)
+        self._set_during_reload: Optional[Dict[int, int]] = None
+
+    def is_revoked(self, user_id: int, token_epoch: int) -> bool:
+        return token_epoch < self._epochs.get(user_id, 0)
+
+    def set(self, user_id: int, epoch: int) -> None:
+        # Notifications may arrive out of order; epochs only move forward
+        if epoch > self._epochs.get(user_id, 0):
+            self._epochs[user_id] = epoch
+        if self._set_during_reload is not None:
+            self._set_during_reload[user_id] = max(epoch, self._set_during_reload.get(user_id, 0))
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+    async def reload(self) -> None:
+        """Load every non-zero epoch (and recent tombstones) from the database."""
+        self._set_during_reload = {}
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(User.id, User.token_epoch).where(User.token_epoch > 0))
+                epochs = {user_id: epoch for user_id, epoch in result.all()}
+                result = await db.execute(
+                    select(UserTombstone.user_id, UserTombstone.token_epoch)
+                    .where(UserTombstone.deleted_at > _tombstone_cutoff())
+                )
+                epochs.update(result.all())
+            # A commit landing while we read must not be undone by older rows
+            for user_id, epoch in self._set_during_reload.items():
+                epochs[user_id] = max(epoch, epochs.get(user_id, 0))
+            self._epochs = epochs
+        finally:
+            self._set_during_reload = None
+
+    async def bump(self, db: AsyncSession, user_id: int) -> int:
+        """
+        Increment the user's epoch inside the caller's transaction (caller commits).
+        This worker and the others apply it when the transaction commits.
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_epoch=User.token_epoch + 1)
+            .returning(User.token_epoch)
+        )
+        epoch = result.scalar_one()
+        await invalidation_bus.notify_in_transaction(db, TOPIC, f"{user_id}:{epoch}")
+        db.info.setdefault(_PENDING, {})[user_id] = epoch
+        return epoch
+
+    async def tombstone(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Revoke the user's tokens before the user row is deleted, in the caller's
+        transaction (caller deletes and commits). Expired tombstones are pruned.
+        """
+        epoch = await self.bump(db, user_id)
+        await db.execute(delete(UserTombstone).where(UserTombstone.deleted_at <= _tombstone_cutoff()))
+        await db.merge(UserTombstone(user_id=user_id, token_epoch=epoch, deleted_at=datetime.utcnow()))
+
+    async def on_event(self, keys: List[str]) -> None:
+        """Bus handler; keys are "user_id:epoch"."""
+        if ALL_KEYS in keys:
+            await self.reload()
+            return
+        for key in keys:
+            try:
+                user_id, epoch = key.split(":")
+                self.set(int(user_id), int(epoch))
+            except ValueError:
+                print(f"⚠️ Ignoring malformed revocation event: {key!r}")
+
+
+async def poll_revocation_table(interval_seconds: float) -> None:
+    """Background loop that picks up revocations made by other workers (no bus)."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await revocation_table.reload()
+        except Exception as e:
+            print(f"❌ Token revocation table reload failed: {e}")
+
+
+# Process-wide table
+revocation_table = RevocationTable()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_epochs(session: Session) -> None:
+    for user_id, epoch in session.info.pop(_PENDING, {}).items():
+        revocation_table.set(user_id, epoch)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_epochs(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+invalidation_bus.subscribe(TOPIC, revocation_table.on_event, resync=revocation_table.reload)
@@ -1,7 +1,8 @@
+import asyncio
 from datetime import datetime, timedelta
-from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.jwt_keys import get_keyset
 
 # ==========================
 # 🔐 PASSWORD CONTEXT
@@ -21,6 +22,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify plain password against hashed one."""
     return pwd_context.verify(plain_password, hashed_password)
 
+# bcrypt burns ~250 ms of CPU per call (and releases the GIL): request
+# handlers use these so the event loop keeps serving meanwhile
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.to_thread(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+
 # ==========================
 # 🎟️ TOKEN HELPERS
 # ==========================
@@ -35,7 +44,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         "exp": expire,
         "type": "access"
     })
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    return get_keyset().encode(to_encode)
 
 
 def create_refresh_token(data: dict) -> str:
@@ -44,4 +53,4 @@ def create_refresh_token(data: dict) -> str:
     expire = iat + timedelta(days=7)
     to_encode = data.copy()
     to_encode.update({"exp": expire, "iat": iat, "type": "refresh"})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    return get_keyset().encode(to_encode)
@@ -0,0 +1,93 @@
+# app/core/settings_snapshot.py
+"""
+In-memory snapshot of the public site settings.
+
+`/settings/public` is hit on every anonymous page view, so the `{key: value}`
+body is kept pre-encoded as JSON bytes together with the global version from
+`cache_versions`. Serving it costs no DB query; the snapshot is rebuilt right
+after `crud_site_setting` mutations in this worker, which then announces the
+new version on the invalidation bus so other workers rebuild too. Without
+Postgres (no bus) a background poll picks up other workers' mutations.
+"""
+import asyncio
+import json
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.invalidation_bus import ALL_KEYS, invalidation_bus
+from app.core.single_flight import SingleFlight
+from app.db.session import AsyncSessionLocal
+
+VERSION_NAME = "site_settings"
+
+
+class SettingsSnapshot:
+    def __init__(self):
+        self.version: int = -1
+        self.body: bytes = b"{}"
+        self._lock = asyncio.Lock()
+        self._flight = SingleFlight("settings_snapshot")
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    @property
+    def loaded(self) -> bool:
+        return self.version >= 0
+
+    async def rebuild(self, db: AsyncSession, publish: bool = False) -> None:
+        """Reload every setting and re-encode the body; `publish` tells the other workers."""
+        # Imported lazily: app.crud.settings imports this module
+        from app.crud.cache_versions import crud_cache_version
+        from app.crud.settings import crud_site_setting
+
+        async with self._lock:
+            version = await crud_cache_version.get(db, VERSION_NAME)
+            settings = await crud_site_setting.get_all(db)
+            body = json.dumps({s.key: s.value for s in settings}, separators=(",", ":")).encode()
+            # Never go backwards if a concurrent rebuild already saw a newer version
+            if version >= self.version:
+                self.version, self.body = version, body
+        if publish:
+            await invalidation_bus.publish(VERSION_NAME, str(version))
+
+    async def ensure_loaded(self) -> None:
+        """Load once; concurrent first requests share a single load."""
+        if not self.loaded:
+            await self._flight.do("load", self._load)
+
+    async def _load(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await self.rebuild(db)
+
+    async def refresh_if_stale(self) -> bool:
+        """Rebuild when the stored version moved on. Returns True if rebuilt."""
+        from app.crud.cache_versions import crud_cache_version
+
+        async with AsyncSessionLocal() as db:
+            if await crud_cache_version.get(db, VERSION_NAME) == self.version:
+                return False
+            await self.rebuild(db)
+        return True
+
+    async def on_event(self, keys: List[str]) -> None:
+        """Bus handler; keys are settings versions. Our own publishes are already applied."""
+        if ALL_KEYS in keys or any(int(key) > self.version for key in keys):
+            await self.refresh_if_stale()
+
+
+async def poll_settings_snapshot(interval_seconds: float) -> None:
+    """Background loop that keeps this worker's snapshot in sync with the others."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await settings_snapshot.refresh_if_stale()
+        except Exception as e:
+            print(f"❌ Settings snapshot refresh failed: {e}")
+
+
+# Process-wide snapshot
+settings_snapshot = SettingsSnapshot()
+invalidation_bus.subscribe(VERSION_NAME, settings_snapshot.on_event, resync=settings_snapshot.refresh_if_stale)
@@ -0,0 +1,82 @@
+# app/core/single_flight.py
+"""
+Single-flight: collapse concurrent identical loads into one.
+
+The first caller for a key (the leader) runs the loader; callers arriving
+while it runs await the leader's result instead of issuing the same queries.
+Results are not kept once the load finishes - caching is the caller's job.
+
+    flight = SingleFlight("pages")
+    body = await flight.do(("page", 42), lambda: load_page(42), timeout=2.0)
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core.metrics import Counter
+
+flight_calls = Counter(
+    "single_flight_calls_total",
+    "Single-flight calls by group and role (leader, follower, timeout).",
+    ["group", "role"],
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Return `await loader()`, sharing one execution among concurrent callers.
+
+        Followers wait at most `timeout` seconds for the leader; after that they
+        give up on it and run their own load, so one stuck query cannot hold
+        every request for that key. Errors raised by the leader are re-raised
+        in every follower. If the leader is cancelled (e.g. client disconnect),
+        waiting followers retry and one of them takes over.
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                return await self._lead(key, loader)
+
+            flight_calls.inc(group=self.name, role="follower")
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                flight_calls.inc(group=self.name, role="timeout")
+                return await loader()
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this caller was cancelled, not the leader
+                # leader went away: loop and let someone lead again
+
+    async def _lead(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        flight_calls.inc(group=self.name, role="leader")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Followers retrieve it; mark it retrieved so an unawaited future does not warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,273 @@
+# app/core/slow_queries.py
+"""
+Slow-query log.
+
+Engine event hooks time every statement. One slower than `SLOW_QUERY_MS` is
+logged with its parameter shapes (types, never values), the CRUD method that
+issued it and the route being served. It is then aggregated under a fingerprint
+of its normalized text (literals, placeholders and IN-lists collapsed), so
+`WHERE id = 3` and `WHERE id = 4` count as one query.
+
+A sample of slow statements (`SLOW_QUERY_EXPLAIN_SAMPLE_RATE`, at most one per
+fingerprint every `SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS`) is re-run as
+`EXPLAIN (ANALYZE, BUFFERS)` on a side connection, inside a transaction that is
+rolled back, so writes leave nothing behind. SQLite only gets
+`EXPLAIN QUERY PLAN`. The latest plan is kept with the fingerprint.
+
+Aggregates are per worker and served by `GET /api/diagnostics/.../slow-queries`,
+sorted by total time.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import greenlet
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.loop_monitor import current_route
+from app.core.metrics import Counter
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+SKIP_OPTION = "slow_query_log_skip"
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CRUD_DIR = os.path.join(APP_DIR, "crud") + os.sep
+IGNORED_FILES = (os.path.abspath(__file__), os.path.join(APP_DIR, "db", "session.py"))
+
+slow_queries_total = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS")
+
+_explain_tasks: set = set()
+
+# DDL, PRAGMA, SAVEPOINT... have no plan worth capturing
+EXPLAINABLE = re.compile(r"^\s*(?:SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+# ==========================
+# 🧮 FINGERPRINTS
+# ==========================
+_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                       # string literals
+    (re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?"), "?"),  # placeholders of every paramstyle
+    (re.compile(r"\(__\[POSTCOMPILE_\w+\]\)"), "(?)"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),                    # numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?)"),         # IN-lists / VALUES rows of any length
+    (re.compile(r"(?:\(\?\)\s*,\s*)+\(\?\)"), "(?)"),           # multi-row VALUES
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize(statement: str) -> str:
+    for pattern, replacement in _NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Parameter types without values, e.g. `(int, str)` or `500 x {id: int}`."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return f"{len(parameters)} x {parameter_shape(parameters[0]) if parameters else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+# ==========================
+# 🔎 CALL SITE
+# ==========================
+def _frames():
+    # Statements run in a SQLAlchemy greenlet whose stack stops at the driver
+    # call; the awaiting coroutines (CRUD, route) are in the parent greenlet.
+    frame = sys._getframe(2)
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+    parent = greenlet.getcurrent().parent
+    frame = parent.gr_frame if parent is not None else None
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+
+def _label(frame) -> str:
+    owner = frame.f_locals.get("self")
+    if owner is not None:
+        return f"{type(owner).__name__}.{frame.f_code.co_name}"
+    module = os.path.relpath(frame.f_code.co_filename, APP_DIR)[:-3].replace(os.sep, ".")
+    return f"{module}.{frame.f_code.co_name}"
+
+
+def caller() -> Optional[str]:
+    """The CRUD method that issued the statement, else the innermost app frame."""
+    fallback = None
+    for frame in _frames():
+        filename = frame.f_code.co_filename
+        if filename.startswith(CRUD_DIR):
+            return _label(frame)
+        if fallback is None and filename.startswith(APP_DIR) and filename not in IGNORED_FILES:
+            fallback = frame
+    return _label(fallback) if fallback is not None else None
+
+
+# ==========================
+# 📊 AGGREGATES
+# ==========================
+@dataclass
+class SlowQuery:
+    fingerprint: str
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    parameters: str = ""
+    callers: Dict[str, int] = field(default_factory=dict)
+    routes: Dict[str, int] = field(default_factory=dict)
+    last_seen: float = 0.0
+    explain: Optional[Any] = None
+    explained_at: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "parameters": self.parameters,
+            "callers": self.callers,
+            "routes": self.routes,
+            "last_seen": self.last_seen,
+            "explain": self.explain,
+            "explained_at": self.explained_at or None,
+        }
+
+
+class SlowQueryLog:
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max_fingerprints
+        self.entries: Dict[str, SlowQuery] = {}
+
+    def record(self, statement: str, elapsed_ms: float, parameters: str,
+               caller_label: Optional[str], route: Optional[str]) -> SlowQuery:
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_fingerprints:
+                # Keep the heavy hitters: drop the cheapest fingerprint
+                del self.entries[min(self.entries.values(), key=lambda e: e.total_ms).fingerprint]
+            entry = self.entries[key] = SlowQuery(key, normalized)
+        entry.count += 1
+        entry.total_ms += elapsed_ms
+        entry.max_ms = max(entry.max_ms, elapsed_ms)
+        entry.parameters = parameters
+        entry.last_seen = time.time()
+        if caller_label:
+            entry.callers[caller_label] = entry.callers.get(caller_label, 0) + 1
+        if route:
+            entry.routes[route] = entry.routes.get(route, 0) + 1
+        return entry
+
+    def top(self, limit: int = 50) -> List[Dict[str, Any]]:
+        ranked = sorted(self.entries.values(), key=lambda e: e.total_ms, reverse=True)
+        return [entry.as_dict() for entry in ranked[:limit]]
+
+    def reset(self) -> None:
+        self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_MAX_FINGERPRINTS)
+
+
+# ==========================
+# 🧾 EXPLAIN (side connection)
+# ==========================
+async def _explain(entry: SlowQuery, statement: str, parameters: Any) -> None:
+    try:
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                sql, plan_of = f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", lambda rows: rows[0][0]
+            elif conn.dialect.name == "sqlite":
+                sql, plan_of = f"EXPLAIN QUERY PLAN {statement}", lambda rows: [row[-1] for row in rows]
+            else:
+                return
+            # ANALYZE really runs the statement: never let a write through
+            trans = await conn.begin()
+            try:
+                result = await conn.exec_driver_sql(
+                    sql, parameters, execution_options={SKIP_OPTION: True}
+                )
+                entry.explain = plan_of(result.fetchall())
+                entry.explained_at = time.time()
+            finally:
+                await trans.rollback()
+    except Exception:
+        logger.exception("EXPLAIN of slow query %s failed", entry.fingerprint)
+
+
+def _maybe_explain(entry: SlowQuery, statement: str, parameters: Any, executemany: bool) -> None:
+    if executemany or not EXPLAINABLE.match(statement):
+        return
+    if random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+        return
+    if time.time() - entry.explained_at < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:  # sync engine use outside the app (CLI scripts)
+        return
+    entry.explained_at = time.time()  # claim the slot so concurrent hits don't pile up
+    task = loop.create_task(_explain(entry, statement, parameters))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+# ==========================
+# 🪝 ENGINE HOOKS
+# ==========================
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _failed(context):
+    # after_cursor_execute never comes for a failed statement
+    if context.connection is not None and context.connection.info.get("slow_query_started"):
+        context.connection.info["slow_query_started"].pop()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["slow_query_started"].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    threshold = settings.SLOW_QUERY_MS
+    if threshold <= 0 or elapsed_ms < threshold:
+        return
+    if context is not None and context.execution_options.get(SKIP_OPTION):
+        return
+
+    shape = parameter_shape(parameters, executemany)
+    caller_label, route = caller(), current_route()
+    entry = slow_query_log.record(statement, elapsed_ms, shape, caller_label, route)
+    slow_queries_total.inc()
+    logger.warning(
+        "Slow query %.1f ms [%s] %s params=%s caller=%s route=%s",
+        elapsed_ms, entry.fingerprint, entry.statement[:300], shape, caller_label, route,
+    )
+    _maybe_explain(entry, statement, parameters, executemany)
@@ -0,0 +1,425 @@
+# app/core/storage.py
+"""
+Pluggable async storage backends for uploaded media.
+
+Routes and CRUD code talk to a `StorageBackend` instead of calling `open` /
+`os.remove` directly, so the media files can live on the local disk (single
+node) or in an S3-compatible object store (MinIO, AWS S3, ...) shared by every
+worker.
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.tracing import traced_class
+
+# Default chunk size used when streaming uploads into a backend
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def shard_key(name: str) -> str:
+    """
+    Return the sharded storage key for `name` (e.g. `ab/cd/<name>`).
+
+    The two directory levels come from a hash of the name, which spreads
+    uploads evenly over 65 536 directories so no single one grows huge.
+    """
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{name}"
+
+
+class StorageError(Exception):
+    """Raised when a storage backend cannot complete an operation."""
+
+
+@dataclass
+class StoredObject:
+    """Metadata returned by `put` / `stat`."""
+
+    key: str
+    size: int
+    content_type: Optional[str] = None
+    modified_at: Optional[datetime] = None
+    etag: Optional[str] = None
+
+
+# ==========================
+# 🧩 ABSTRACT BACKEND
+# ==========================
+class StorageBackend(ABC):
+    """Async interface every media storage backend implements."""
+
+    @abstractmethod
+    async def put(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None
+    ) -> StoredObject:
+        """Store the streamed `chunks` under `key`. Partial writes are cleaned up on error."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Return the full content stored under `key`."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete `key`. Returns False if it did not exist."""
+
+    @abstractmethod
+    async def copy(self, src_key: str, dst_key: str) -> None:
+        """Copy `src_key` to `dst_key` without streaming the bytes through the app."""
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        """Return metadata for `key`, or None if it does not exist."""
+
+    @abstractmethod
+    def iter_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        """Yield every stored object in ascending (byte-wise) key order, lazily."""
+
+    @abstractmethod
+    async def presign(self, key: str, expires_in: int = 3600) -> str:
+        """Return a (possibly time-limited) URL clients can download `key` from."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Return the public URL stored in `Media.url` for `key`."""
+
+
+# ==========================
+# 💾 LOCAL FILESYSTEM
+# ==========================
+@traced_class
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores files under `root` and serves them through the `/static` mount.
+    Blocking file calls run in a worker thread so they never stall the event loop.
+    """
+
+    def __init__(self, root: str, base_url: str = "/static/uploads"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Resolve `key` to an absolute path, refusing keys that escape `root`."""
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise StorageError(f"Invalid storage key: {key!r}")
+        return path
+
+    async def put(self, key, chunks, content_type=None):
+        path = self.path(key)
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        fh = await asyncio.to_thread(open, path, "wb")
+        size = 0
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(fh.write, chunk)
+                size += len(chunk)
+        except BaseException:
+            await asyncio.to_thread(fh.close)
+            await asyncio.to_thread(_remove_quietly, path)
+            raise
+        await asyncio.to_thread(fh.close)
+        return StoredObject(
+            key=key, size=size, content_type=content_type,
+            modified_at=datetime.now(timezone.utc),
+        )
+
+    async def get(self, key):
+        def _read() -> bytes:
+            with open(self.path(key), "rb") as fh:
+                return fh.read()
+
+        try:
+            return await asyncio.to_thread(_read)
+        except FileNotFoundError:
+            raise StorageError(f"Object not found: {key}")
+
+    async def delete(self, key):
+        return await asyncio.to_thread(_remove_quietly, self.path(key))
+
+    async def copy(self, src_key, dst_key):
+        src, dst = self.path(src_key), self.path(dst_key)
+
+        def _copy() -> None:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            try:
+                # Hard link when possible: instant and no extra disk space
+                os.link(src, dst)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copy2(src, dst)
+
+        try:
+            await asyncio.to_thread(_copy)
+        except FileNotFoundError:
+            raise StorageError(f"Object not found: {src_key}")
+
+    async def stat(self, key):
+        try:
+            st = await asyncio.to_thread(os.stat, self.path(key))
+        except FileNotFoundError:
+            return None
+        return StoredObject(
+            key=key, size=st.st_size,
+            modified_at=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+    async def iter_objects(self, prefix=""):
+        # Entries are sorted per directory with a trailing "/" on sub-directories,
+        # which makes the depth-first walk produce globally sorted keys.
+        def _scan(directory: str) -> list[tuple[str, bool, os.stat_result | None]]:
+            try:
+                with os.scandir(directory) as it:
+                    entries = [
+                        (e.name, e.is_dir(), None if e.is_dir() else e.stat())
+                        for e in it
+                    ]
+            except FileNotFoundError:
+                return []
+            return sorted(entries, key=lambda e: e[0] + "/" if e[1] else e[0])
+
+        async def _walk(rel: str):
+            for name, is_dir, st in await asyncio.to_thread(_scan, os.path.join(self.root, rel)):
+                key = f"{rel}/{name}" if rel else name
+                if is_dir:
+                    async for obj in _walk(key):
+                        yield obj
+                elif key.startswith(prefix):
+                    yield StoredObject(
+                        key=key, size=st.st_size,
+                        modified_at=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+                    )
+
+        async for obj in _walk(""):
+            yield obj
+
+    async def presign(self, key, expires_in=3600):
+        # Local files are served publicly by the static mount; nothing to sign.
+        return self.url(key)
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# ==========================
+# ☁️ S3-COMPATIBLE
+# ==========================
+@traced_class
+class S3StorageBackend(StorageBackend):
+    """
+    Stores files in an S3-compatible bucket (AWS S3, MinIO, moto server, ...).
+
+    Uploads always use the multipart API: parts are read sequentially from the
+    incoming stream and sent concurrently, at most `max_concurrency` at a time.
+    Requires the optional `boto3` package; the client is thread-safe, so its
+    blocking calls are pushed to worker threads.
+    """
+
+    # S3 rejects non-final parts smaller than 5 MB
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(
+        self,
+        bucket: str,
+        *,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_base_url: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        client=None,
+    ):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise StorageError("S3 storage requires the 'boto3' package") from exc
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+            )
+        self.client = client
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+        self.endpoint_url = endpoint_url
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def put(self, key, chunks, content_type=None):
+        extra = {"ContentType": content_type} if content_type else {}
+        upload = await asyncio.to_thread(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, **extra
+        )
+        upload_id = upload["UploadId"]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: list[asyncio.Task] = []
+
+        async def _send(part_number: int, body: bytes) -> dict:
+            try:
+                response = await asyncio.to_thread(
+                    self.client.upload_part,
+                    Bucket=self.bucket, Key=key, UploadId=upload_id,
+                    PartNumber=part_number, Body=body,
+                )
+            finally:
+                semaphore.release()
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+        size = 0
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                buffer.extend(chunk)
+                while len(buffer) >= self.part_size:
+                    body = bytes(buffer[: self.part_size])
+                    del buffer[: self.part_size]
+                    # Bounds both in-flight requests and buffered part memory
+                    await semaphore.acquire()
+                    tasks.append(asyncio.create_task(_send(len(tasks) + 1, body)))
+            if buffer or not tasks:
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(_send(len(tasks) + 1, bytes(buffer))))
+            parts = await asyncio.gather(*tasks)
+            result = await asyncio.to_thread(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(
+                self.client.abort_multipart_upload,
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+            )
+            raise
+
+        return StoredObject(
+            key=key, size=size, content_type=content_type,
+            modified_at=datetime.now(timezone.utc), etag=result.get("ETag"),
+        )
+
+    async def get(self, key):
+        try:
+            response = await asyncio.to_thread(
+                self.client.get_object, Bucket=self.bucket, Key=key
+            )
+        except self.client.exceptions.NoSuchKey:
+            raise StorageError(f"Object not found: {key}")
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def delete(self, key):
+        if await self.stat(key) is None:
+            return False
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+        return True
+
+    async def copy(self, src_key, dst_key):
+        await asyncio.to_thread(
+            self.client.copy_object,
+            Bucket=self.bucket, Key=dst_key,
+            CopySource={"Bucket": self.bucket, "Key": src_key},
+        )
+
+    async def stat(self, key):
+        try:
+            head = await asyncio.to_thread(
+                self.client.head_object, Bucket=self.bucket, Key=key
+            )
+        except Exception as exc:
+            if _is_not_found(exc):
+                return None
+            raise
+        return StoredObject(
+            key=key,
+            size=head["ContentLength"],
+            content_type=head.get("ContentType"),
+            modified_at=head.get("LastModified"),
+            etag=head.get("ETag"),
+        )
+
+    async def iter_objects(self, prefix=""):
+        # ListObjectsV2 already returns keys in UTF-8 binary order
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = await asyncio.to_thread(self.client.list_objects_v2, **kwargs)
+            for item in page.get("Contents", []):
+                yield StoredObject(
+                    key=item["Key"], size=item["Size"],
+                    modified_at=item.get("LastModified"), etag=item.get("ETag"),
+                )
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
+
+    async def presign(self, key, expires_in=3600):
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url,
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def url(self, key):
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+
+def _is_not_found(exc: Exception) -> bool:
+    """True for botocore 404 / NoSuchKey client errors."""
+    error = getattr(exc, "response", {}).get("Error", {})
+    return str(error.get("Code")) in {"404", "NoSuchKey", "NotFound"}
+
+
+# ==========================
+# 🔧 FACTORY
+# ==========================
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend selected by `STORAGE_BACKEND`."""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.MEDIA_ROOT, base_url=settings.MEDIA_URL_PREFIX)
+    if settings.STORAGE_BACKEND == "s3":
+        if not settings.S3_BUCKET:
+            raise StorageError("S3_BUCKET must be set when STORAGE_BACKEND is 's3'")
+        return S3StorageBackend(
+            settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_base_url=settings.S3_PUBLIC_BASE_URL,
+            part_size=settings.S3_MULTIPART_PART_SIZE,
+            max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+        )
+    raise StorageError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND!r}")
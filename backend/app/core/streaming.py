@@ -0,0 +1,125 @@
+# app/core/streaming.py
+"""
+Streamed list responses for large collections.
+
+    @router.get("/", response_model=list[AuditLogRead], dependencies=[...])
+    @streamable(AuditLogRead, lambda **params: crud_audit_log.list_query())
+    async def list_audit_logs(db: AsyncSession = Depends(get_db)): ...
+
+Clients opt in per request:
+
+- `Accept: application/x-ndjson`: one JSON object per line
+- `?stream=true`: a regular JSON array, sent in chunks
+
+Otherwise the endpoint runs as usual (including `@cached_response`, which
+goes *under* this decorator). A streamed response runs the statement built
+from the endpoint's parameters through a server-side cursor
+(`AsyncSession.stream` + `yield_per`) on its own session, and encodes and
+sends one batch at a time, so memory stays flat whatever the row count.
+
+The status line is sent before the first row is read: a failure midway
+ends the body early (an NDJSON stream simply stops, a JSON array is left
+unterminated) and is logged.
+"""
+import functools
+import inspect
+from typing import Any, AsyncIterator, Callable, Optional
+
+from fastapi import Query, Request
+from fastapi.params import Depends as DependsParam
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.core.responses import adapter_for
+from app.db.session import AsyncSessionLocal
+
+NDJSON = "application/x-ndjson"
+
+streamed_rows = Counter(
+    "streamed_rows_total",
+    "Rows sent in streamed list responses, by route and format.",
+    ["route", "format"],
+)
+
+
+def stream_format(request: Request, stream: bool = False) -> Optional[str]:
+    """"ndjson", "json" (chunked array) or None for a buffered response."""
+    if NDJSON in request.headers.get("accept", ""):
+        return "ndjson"
+    return "json" if stream else None
+
+
+async def stream_rows(
+    statement: Select,
+    model: Any,
+    fmt: str = "ndjson",
+    yield_per: Optional[int] = None,
+    route: str = "",
+) -> AsyncIterator[bytes]:
+    """Yield `statement`'s ORM rows encoded as `model`, one chunk per batch."""
+    adapter = adapter_for(model)
+    yield_per = yield_per or settings.STREAM_YIELD_PER
+    first = True
+    if fmt == "json":
+        yield b"["
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(statement.execution_options(yield_per=yield_per))
+            async for rows in result.scalars().partitions():
+                encoded = [adapter.dump_json(adapter.validate_python(row, from_attributes=True)) for row in rows]
+                if fmt == "ndjson":
+                    yield b"\n".join(encoded) + b"\n"
+                else:
+                    yield (b"" if first else b",") + b",".join(encoded)
+                first = False
+                streamed_rows.inc(len(encoded), route=route, format=fmt)
+    except Exception as e:
+        print(f"❌ Streaming {route or 'response'} failed midway: {e}")
+        raise
+    if fmt == "json":
+        yield b"]"
+
+
+def streamable(model: Any, query: Callable[..., Select]):
+    """
+    Let the endpoint stream its rows instead of building the whole list.
+
+    `model` is the schema of one row; `query(**params)` gets the endpoint's
+    non-dependency parameters and returns the statement to stream (it may
+    raise HTTPException to reject bad parameters). Place it *under*
+    `@router.get(...)` and above `@cached_response(...)`.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        params = [
+            name for name, param in signature.parameters.items()
+            if not isinstance(param.default, DependsParam)
+        ]
+        route = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*, _stream_request: Request, _stream: bool = False, **kwargs):
+            fmt = stream_format(_stream_request, _stream)
+            if fmt is None:
+                return await func(**kwargs)
+            statement = query(**{name: kwargs[name] for name in params if name in kwargs})
+            return StreamingResponse(
+                stream_rows(statement, model, fmt, route=route),
+                media_type=NDJSON if fmt == "ndjson" else "application/json",
+            )
+
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("_stream_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            inspect.Parameter(
+                "_stream",
+                inspect.Parameter.KEYWORD_ONLY,
+                default=Query(False, alias="stream", description="Send the list as a chunked JSON array"),
+                annotation=bool,
+            ),
+        ])
+        return wrapper
+
+    return decorator
@@ -0,0 +1,350 @@
+# app/core/tracing.py
+"""
+Lightweight in-process tracing.
+
+Spans are opened with `span(...)` (a context manager) or `@traced` (async
+functions, `traced_class` for every public coroutine method of a class). The
+current span lives in a contextvar, so children find their parent across
+awaits and in tasks created from a traced request. Coverage:
+
+- `TracingMiddleware`: one server span per HTTP request (`HTTP PUT /api/pages/pages/{page_id}`)
+- auth dependencies, `app.crud` classes, `record_audit_log`, storage backends
+- one client span per DB statement (engine hooks)
+
+Sampling is decided once per request (`TRACING_SAMPLE_RATE`, or the sampled
+flag of an incoming W3C `traceparent`). For an unsampled request there is no
+current span, and every instrumentation point costs one contextvar lookup.
+
+Finished spans are batched and exported as OTLP/JSON
+(`ExportTraceServiceRequest`). They go to `TRACING_OTLP_ENDPOINT`
+(an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces) when set, and
+otherwise as one JSON line per batch to `TRACING_EXPORT_FILE` (default:
+`DIAGNOSTICS_DIR/traces.otlp.jsonl`).
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+STATEMENT_LENGTH = 500
+MAX_PENDING_SPANS = 10_000
+
+# W3C trace context: version-traceid-parentid-flags, lowercase hex
+TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(?:-.*)?$")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return random.getrandbits(nbytes * 8).to_bytes(nbytes, "big").hex()
+
+
+# ==========================
+# 🧵 SPANS
+# ==========================
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns",
+                 "attributes", "status", "status_message", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int = KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.status = 0
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def fail(self, exc: BaseException) -> None:
+        self.status, self.status_message = STATUS_ERROR, f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        exporter.add(self)
+
+    # --- context manager: make this span current while the block runs ---
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.fail(exc)
+        self.end()
+
+
+class _NoSpan:
+    """Stand-in outside a sampled trace: every call is a no-op."""
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def fail(self, exc):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any):
+    """`with span("name"):` — a child of the current span, or a no-op outside a sampled trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return NO_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, kind: int = KIND_SERVER,
+                sample_rate: Optional[float] = None) -> Span:
+    """
+    Root span of a new trace, or NO_SPAN if it is not sampled. A valid incoming W3C
+    `traceparent` (`00-<trace id>-<parent id>-<flags>`) decides instead of the
+    sample rate; a malformed one is ignored.
+    """
+    match = TRACEPARENT.match(traceparent.strip()) if traceparent else None
+    if match:
+        version, trace_id, parent_id, flags = match.groups()
+        # Version ff and all-zero ids are invalid; other versions may append fields
+        if version != "ff" and trace_id != "0" * 32 and parent_id != "0" * 16 \
+                and (version != "00" or len(traceparent.strip()) == 55):
+            if not int(flags, 16) & 1:
+                return NO_SPAN
+            return Span(name, trace_id, parent_id, kind)
+    rate = settings.TRACING_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate:
+        return NO_SPAN
+    return Span(name, _new_id(16), None, kind)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: run an async function in a span (only inside a sampled trace)."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return await func(*args, **kwargs)
+            with Span(span_name, parent.trace_id, parent.span_id):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_class(cls: type) -> type:
+    """Class decorator: trace every public coroutine method defined on `cls`."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+# ==========================
+# 🧩 HTTP MIDDLEWARE
+# ==========================
+class TracingMiddleware:
+    """Pure ASGI middleware opening the server span of each sampled request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        root = start_trace(f"HTTP {scope['method']}", traceparent)
+        if root is NO_SPAN:
+            await self.app(scope, receive, send)
+            return
+
+        root.set("http.request.method", scope["method"])
+        root.set("url.path", scope["path"])
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                root.set("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = STATUS_ERROR
+            await send(message)
+
+        with root:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"HTTP {scope['method']} {route}"
+                    root.set("http.route", route)
+
+
+# ==========================
+# 🗄️ DB STATEMENTS
+# ==========================
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is None:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    child = Span(f"db {operation}", parent.trace_id, parent.span_id, KIND_CLIENT, {
+        "db.system": conn.dialect.name,
+        "db.statement": " ".join(statement.split())[:STATEMENT_LENGTH],
+    })
+    if executemany:
+        child.set("db.executemany", len(parameters))
+    conn.info.setdefault("trace_spans", []).append(child)
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _statement_failed(context):
+    spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+    if spans:
+        failed = spans.pop()
+        failed.fail(context.original_exception)
+        failed.end()
+
+
+# ==========================
+# 📤 OTLP/JSON EXPORT
+# ==========================
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def span_to_otlp(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_attribute(k, v) for k, v in span.attributes.items()],
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    if span.status:
+        data["status"] = {"code": span.status, **({"message": span.status_message} if span.status_message else {})}
+    return data
+
+
+def otlp_request(spans: List[Span]) -> Dict[str, Any]:
+    """An OTLP `ExportTraceServiceRequest` in its JSON encoding."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            _attribute("service.name", settings.TRACING_SERVICE_NAME),
+            _attribute("process.pid", os.getpid()),
+        ]},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": [span_to_otlp(s) for s in spans]}],
+    }]}
+
+
+class SpanExporter:
+    def __init__(self, max_pending: int = MAX_PENDING_SPANS):
+        self.max_pending = max_pending
+        self.pending: List[Span] = []
+        self.dropped = 0
+
+    def add(self, finished: Span) -> None:
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self.pending.append(finished)
+
+    def _write(self, body: bytes) -> None:
+        if settings.TRACING_OTLP_ENDPOINT:
+            request = urllib.request.Request(
+                settings.TRACING_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"}
+            )
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+            return
+        path = settings.TRACING_EXPORT_FILE or os.path.join(settings.DIAGNOSTICS_DIR, "traces.otlp.jsonl")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "ab") as fh:
+            fh.write(body + b"\n")
+
+    async def flush(self) -> int:
+        batch, self.pending = self.pending, []
+        if not batch:
+            return 0
+        body = json.dumps(otlp_request(batch), separators=(",", ":")).encode()
+        try:
+            await asyncio.to_thread(self._write, body)
+        except Exception:
+            logger.exception("Exporting %d spans failed", len(batch))
+            return 0
+        return len(batch)
+
+    async def run(self, interval: float) -> None:
+        """Flush every `interval` seconds until cancelled (then flush what is left)."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+
+exporter = SpanExporter()
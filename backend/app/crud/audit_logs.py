@@ -1,12 +1,15 @@
 #app/crud/audit_logs
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 from typing import List, Optional
 
 from app.db.models.audit_log import AuditLog
 from app.schemas import AuditLogCreate, AuditLogRead
+from app.core.tracing import traced_class
 
 
+@traced_class
 class CRUDAuditLog:
     async def create(self, db: AsyncSession, obj_in: AuditLogCreate) -> AuditLog:
         """Create a new audit log entry."""
@@ -16,9 +19,19 @@ class CRUDAuditLog:
         await db.refresh(audit_log)
         return audit_log
 
+    def add(self, db: AsyncSession, obj_in: AuditLogCreate) -> AuditLog:
+        """Stage an audit log entry in the caller's transaction (no commit)."""
+        audit_log = AuditLog(**obj_in.model_dump())
+        db.add(audit_log)
+        return audit_log
+
+    def list_query(self) -> Select:
+        """Statement for all audit logs, newest first (also used for streaming)."""
+        return select(AuditLog).order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+
     async def get_all(self, db: AsyncSession) -> List[AuditLog]:
         """Retrieve all audit logs."""
-        result = await db.execute(select(AuditLog).order_by(AuditLog.timestamp.desc()))
+        result = await db.execute(self.list_query())
         return result.scalars().all()
 
     async def get_by_user(self, db: AsyncSession, user_id: int) -> List[AuditLog]:
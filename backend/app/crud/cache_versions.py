@@ -0,0 +1,44 @@
+# app/crud/cache_versions.py
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models.cache_version import CacheVersion
+from app.db.upsert import upsert_insert
+from app.core.tracing import traced_class
+
+
+@traced_class
+class CRUDCacheVersion:
+    # -------------------------
+    # GET CURRENT VERSION
+    # -------------------------
+    async def get(self, db: AsyncSession, name: str) -> int:
+        result = await db.execute(select(CacheVersion.version).where(CacheVersion.name == name))
+        return result.scalar_one_or_none() or 0
+
+    # -------------------------
+    # BUMP (caller commits)
+    # -------------------------
+    async def bump(self, db: AsyncSession, name: str) -> None:
+        """Increment the counter inside the caller's transaction."""
+        insert = upsert_insert(db)
+        if insert is not None:
+            # Atomic, so two concurrent first bumps cannot both insert the row
+            stmt = insert(CacheVersion).values(name=name, version=1)
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[CacheVersion.name],
+                set_={"version": CacheVersion.version + 1},
+            ))
+            return
+        result = await db.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            db.add(CacheVersion(name=name, version=1))
+
+
+# Singleton instance
+crud_cache_version = CRUDCacheVersion()
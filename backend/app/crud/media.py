@@ -2,12 +2,22 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 
 from app.db.models.media import Media
+from app.crud.audit_logs import crud_audit_log
+from app.schemas.audit_log import AuditLogCreate
 from app.schemas.media import MediaCreate
 from app.core.audit import record_audit_log
+from app.core.response_cache import invalidate_tags
+from app.core.tracing import traced_class
 
 
+# Columns the list endpoint may sort on
+SORTABLE_FIELDS = ("uploaded_at", "filesize_bytes", "width", "height", "duration_seconds", "page_count")
+
+
+@traced_class
 class CRUDMedia:
     # -------------------------
     # GET BY ID
@@ -16,13 +26,54 @@ class CRUDMedia:
         result = await db.execute(select(Media).where(Media.id == id))
         return result.scalars().first()
 
+    # -------------------------
+    # LIST STATEMENT
+    # -------------------------
+    def list_query(
+        self,
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        *,
+        mimetype_prefix: Optional[str] = None,
+        min_width: Optional[int] = None,
+        max_width: Optional[int] = None,
+        min_height: Optional[int] = None,
+        max_height: Optional[int] = None,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+        min_pages: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        sort: str = "-uploaded_at",
+    ) -> Select:
+        """
+        Statement listing media, optionally filtered on the extracted metadata columns.
+        `sort` is one of SORTABLE_FIELDS, prefixed with "-" for descending order;
+        `limit=None` returns every matching row (streamed responses).
+        """
+        stmt = select(Media)
+        if mimetype_prefix:
+            stmt = stmt.where(Media.mimetype.startswith(mimetype_prefix))
+        for column, low, high in (
+            (Media.width, min_width, max_width),
+            (Media.height, min_height, max_height),
+            (Media.duration_seconds, min_duration, max_duration),
+            (Media.page_count, min_pages, max_pages),
+        ):
+            if low is not None:
+                stmt = stmt.where(column >= low)
+            if high is not None:
+                stmt = stmt.where(column <= high)
+
+        column = getattr(Media, sort.lstrip("-"))
+        order = column.desc() if sort.startswith("-") else column.asc()
+        return stmt.order_by(order, Media.id.desc()).offset(skip).limit(limit)
+
     # -------------------------
     # GET MULTIPLE
     # -------------------------
-    async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Media]:
-        result = await db.execute(
-            select(Media).order_by(Media.uploaded_at.desc()).offset(skip).limit(limit)
-        )
+    async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100, **filters) -> List[Media]:
+        """List media; see `list_query` for the filters and `sort`."""
+        result = await db.execute(self.list_query(skip, limit, **filters))
         return result.scalars().all()
 
     # -------------------------
@@ -35,6 +86,7 @@ class CRUDMedia:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await invalidate_tags("media:list")
 
         if performed_by:
             await record_audit_log(
@@ -47,6 +99,34 @@ class CRUDMedia:
 
         return db_obj
 
+    # -------------------------
+    # CREATE MANY (single transaction)
+    # -------------------------
+    async def create_many(
+        self, db: AsyncSession, objs_in: List[MediaCreate], performed_by: int | None = None
+    ) -> List[Media]:
+        """
+        Insert all rows plus one summarising audit entry in a single transaction.
+        The audit entry points at the first created media row.
+        """
+        db_objs = [Media(**obj_in.model_dump()) for obj_in in objs_in]
+        if not db_objs:
+            return []
+        db.add_all(db_objs)
+        await db.flush()
+
+        if performed_by:
+            crud_audit_log.add(db, AuditLogCreate(
+                user_id=performed_by,
+                action="bulk_upload",
+                resource_type="media",
+                resource_id=db_objs[0].id,
+            ))
+
+        await db.commit()
+        await invalidate_tags("media:list")
+        return db_objs
+
     # -------------------------
     # DELETE
     # -------------------------
@@ -59,6 +139,7 @@ class CRUDMedia:
 
         await db.delete(obj)
         await db.commit()
+        await invalidate_tags("media:list")
 
         if performed_by:
             await record_audit_log(
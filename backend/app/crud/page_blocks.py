@@ -2,12 +2,16 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 
 from app.db.models.page_block import PageBlock
 from app.schemas.page_block import PageBlockCreate, PageBlockUpdate
 from app.core.audit import record_audit_log
+from app.core.response_cache import invalidate_tags
+from app.core.tracing import traced_class
 
 
+@traced_class
 class CRUDPageBlock:
     # -------------------------
     # GET BY ID
@@ -16,24 +20,27 @@ class CRUDPageBlock:
         result = await db.execute(select(PageBlock).where(PageBlock.id == id))
         return result.scalars().first()
 
+    # -------------------------
+    # LIST STATEMENT
+    # -------------------------
+    def list_query(self, page_id: Optional[int] = None) -> Select:
+        """A page's blocks in display order, or every block newest first."""
+        if page_id:
+            return select(PageBlock).where(PageBlock.page_id == page_id).order_by(PageBlock.order.asc())
+        return select(PageBlock).order_by(PageBlock.created_at.desc(), PageBlock.id.desc())
+
     # -------------------------
     # GET BY PAGE ID
     # -------------------------
     async def get_by_page(self, db: AsyncSession, page_id: int) -> List[PageBlock]:
-        result = await db.execute(
-            select(PageBlock)
-            .where(PageBlock.page_id == page_id)
-            .order_by(PageBlock.order.asc())
-        )
+        result = await db.execute(self.list_query(page_id))
         return result.scalars().all()
 
     # -------------------------
     # GET MULTIPLE
     # -------------------------
     async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[PageBlock]:
-        result = await db.execute(
-            select(PageBlock).order_by(PageBlock.created_at.desc()).offset(skip).limit(limit)
-        )
+        result = await db.execute(self.list_query().offset(skip).limit(limit))
         return result.scalars().all()
 
     # -------------------------
@@ -44,6 +51,7 @@ class CRUDPageBlock:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await invalidate_tags(f"page_block:{db_obj.id}", "page_blocks:list")
 
         if performed_by:
             await record_audit_log(
@@ -67,6 +75,7 @@ class CRUDPageBlock:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await invalidate_tags(f"page_block:{db_obj.id}", "page_blocks:list")
 
         if performed_by:
             await record_audit_log(
@@ -89,6 +98,7 @@ class CRUDPageBlock:
 
         await db.delete(obj)
         await db.commit()
+        await invalidate_tags(f"page_block:{id}", "page_blocks:list")
 
         if performed_by:
             await record_audit_log(
@@ -4,10 +4,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.db.models.page import Page
+from app.db.models.page_block import PageBlock
 from app.schemas.page import PageCreate, PageUpdate
 from app.core.audit import record_audit_log
+from app.core.response_cache import invalidate_tags
+from app.core.tracing import traced_class
 
 
+@traced_class
 class CRUDPage:
     # -------------------------
     # GET BY ID
@@ -40,6 +44,7 @@ class CRUDPage:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await invalidate_tags(f"page:{db_obj.id}", "pages:list")
 
         if performed_by:
             await record_audit_log(
@@ -63,6 +68,7 @@ class CRUDPage:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await invalidate_tags(f"page:{db_obj.id}", "pages:list")
 
         if performed_by:
             await record_audit_log(
@@ -83,8 +89,12 @@ class CRUDPage:
         if not obj:
             return None
 
+        # The page's blocks are cascade-deleted with it
+        result = await db.execute(select(PageBlock.id).where(PageBlock.page_id == id))
+        block_tags = [f"page_block:{block_id}" for block_id in result.scalars()]
         await db.delete(obj)
         await db.commit()
+        await invalidate_tags(f"page:{id}", "pages:list", *block_tags, "page_blocks:list")
 
         if performed_by:
             await record_audit_log(
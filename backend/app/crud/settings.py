@@ -1,13 +1,22 @@
 # app/crud/settings.py
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.db.models.site_setting import SiteSetting
+from app.schemas.audit_log import AuditLogCreate
 from app.schemas.site_setting import SiteSettingCreate, SiteSettingUpdate
 from app.core.audit import record_audit_log
+from app.core.response_cache import invalidate_tags
+from app.crud.audit_logs import crud_audit_log
+from app.core.settings_snapshot import VERSION_NAME, settings_snapshot
+from app.crud.cache_versions import crud_cache_version
+from app.db.upsert import upsert_insert
+from app.core.tracing import traced_class
 
 
+@traced_class
 class CRUDSiteSetting:
     # -------------------------
     # GET BY KEY
@@ -31,8 +40,11 @@ class CRUDSiteSetting:
     ) -> SiteSetting:
         db_obj = SiteSetting(**obj_in.model_dump())
         db.add(db_obj)
+        await crud_cache_version.bump(db, VERSION_NAME)
         await db.commit()
         await db.refresh(db_obj)
+        await settings_snapshot.rebuild(db, publish=True)
+        await invalidate_tags(f"setting:{db_obj.key}", "settings:list")
 
         # Audit log
         if performed_by:
@@ -57,8 +69,11 @@ class CRUDSiteSetting:
             setattr(db_obj, field, value)
 
         db.add(db_obj)
+        await crud_cache_version.bump(db, VERSION_NAME)
         await db.commit()
         await db.refresh(db_obj)
+        await settings_snapshot.rebuild(db, publish=True)
+        await invalidate_tags(f"setting:{db_obj.key}", "settings:list")
 
         # Audit log
         if performed_by:
@@ -72,6 +87,75 @@ class CRUDSiteSetting:
 
         return db_obj
 
+    # -------------------------
+    # BULK UPSERT (single statement + transaction)
+    # -------------------------
+    async def upsert_many(
+        self,
+        db: AsyncSession,
+        values: Dict[str, Any],
+        performed_by: int | None = None,
+        action: str = "bulk_update",
+        commit: bool = True,
+    ) -> List[SiteSetting]:
+        """
+        Create or update every key in `values` with one
+        INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING (select-then-insert/update
+        on dialects without it), then write a single audit entry and commit, all in
+        one transaction. Values must already be validated.
+        With `commit=False` the caller commits, then rebuilds the settings snapshot.
+        """
+        if not values:
+            return []
+        now = datetime.utcnow()
+        insert = upsert_insert(db)
+        if insert is not None:
+            stmt = insert(SiteSetting).values(
+                [{"key": key, "value": value, "updated_at": now} for key, value in values.items()]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SiteSetting.key],
+                set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+            ).returning(SiteSetting)
+            result = await db.execute(stmt, execution_options={"populate_existing": True})
+            db_objs = result.scalars().all()
+        else:
+            db_objs = await self._select_then_upsert(db, values, now)
+
+        if performed_by:
+            crud_audit_log.add(db, AuditLogCreate(
+                user_id=performed_by,
+                action=action,
+                resource_type="site_setting",
+                resource_id=db_objs[0].id,
+            ))
+
+        await crud_cache_version.bump(db, VERSION_NAME)
+        if not commit:
+            # Part of a larger transaction; the caller commits and refreshes the caches
+            return db_objs
+        await db.commit()
+        await settings_snapshot.rebuild(db, publish=True)
+        await invalidate_tags(*(f"setting:{key}" for key in values), "settings:list")
+        return db_objs
+
+    async def _select_then_upsert(
+        self, db: AsyncSession, values: Dict[str, Any], now: datetime
+    ) -> List[SiteSetting]:
+        result = await db.execute(select(SiteSetting).where(SiteSetting.key.in_(values)))
+        existing = {obj.key: obj for obj in result.scalars()}
+        db_objs = []
+        for key, value in values.items():
+            obj = existing.get(key)
+            if obj is None:
+                obj = SiteSetting(key=key, value=value, updated_at=now)
+                db.add(obj)
+            else:
+                obj.value, obj.updated_at = value, now
+            db_objs.append(obj)
+        await db.flush()
+        return db_objs
+
     # -------------------------
     # DELETE SETTING
     # -------------------------
@@ -83,7 +167,10 @@ class CRUDSiteSetting:
             return None
 
         await db.delete(obj)
+        await crud_cache_version.bump(db, VERSION_NAME)
         await db.commit()
+        await settings_snapshot.rebuild(db, publish=True)
+        await invalidate_tags(f"setting:{key}", "settings:list")
 
         # Audit log
         if performed_by:
@@ -6,8 +6,13 @@ from sqlalchemy.future import select
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.audit import record_audit_log
+from app.core.security import get_password_hash_async
+from app.core.response_cache import invalidate_tags
+from app.core.revocation import revocation_table
+from app.core.tracing import traced_class
 
 
+@traced_class
 class CRUDUser:
     # -------------------------
     # GET BY ID
@@ -34,7 +39,9 @@ class CRUDUser:
     # CREATE USER
     # -------------------------
     async def create(self, db: AsyncSession, obj_in: UserCreate, performed_by: int | None = None) -> User:
-        db_obj = User(**obj_in.model_dump())
+        data = obj_in.model_dump()
+        data["hashed_password"] = await get_password_hash_async(data.pop("password"))
+        db_obj = User(**data)
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
@@ -58,9 +65,19 @@ class CRUDUser:
         self, db: AsyncSession, db_obj: User, obj_in: UserUpdate, performed_by: int | None = None
     ) -> User:
         update_data = obj_in.model_dump(exclude_unset=True)
+        # Outstanding tokens carry the old role / active state: revoke them
+        revoke = any(
+            field in update_data and update_data[field] != getattr(db_obj, field)
+            for field in ("role", "is_active", "email")
+        ) or "password" in update_data
+        if "password" in update_data:
+            update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
         for field, value in update_data.items():
             setattr(db_obj, field, value)
         db.add(db_obj)
+        if revoke:
+            await db.flush()
+            await revocation_table.bump(db, db_obj.id)
         await db.commit()
         await db.refresh(db_obj)
 
@@ -83,8 +100,11 @@ class CRUDUser:
         obj = await self.get(db, id)
         if not obj:
             return None
+        await revocation_table.tombstone(db, id)
         await db.delete(obj)
         await db.commit()
+        # The user's uploads are cascade-deleted with it
+        await invalidate_tags("media:list")
 
         # Record audit log
         if performed_by:
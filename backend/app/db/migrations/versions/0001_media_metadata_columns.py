@@ -0,0 +1,56 @@
+"""Add extracted metadata columns to media
+
+Revision ID: 0001_media_metadata
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_media_metadata"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    sa.Column("width", sa.Integer(), nullable=True),
+    sa.Column("height", sa.Integer(), nullable=True),
+    sa.Column("duration_seconds", sa.Float(), nullable=True),
+    sa.Column("page_count", sa.Integer(), nullable=True),
+    sa.Column("dominant_color", sa.String(length=7), nullable=True),
+    sa.Column("metadata_extracted_at", sa.DateTime(), nullable=True),
+]
+INDEXES = {
+    "ix_media_dimensions": ["width", "height"],
+    "ix_media_duration_seconds": ["duration_seconds"],
+    "ix_media_page_count": ["page_count"],
+    "ix_media_metadata_extracted_at": ["metadata_extracted_at"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("media")}
+    with op.batch_alter_table("media") as batch:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch.add_column(column.copy())
+    indexes = {index["name"] for index in inspector.get_indexes("media")}
+    for name, columns in INDEXES.items():
+        if name not in indexes:
+            op.create_index(name, "media", columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in INDEXES:
+        op.drop_index(name, table_name="media")
+    with op.batch_alter_table("media") as batch:
+        for column in COLUMNS:
+            batch.drop_column(column.name)
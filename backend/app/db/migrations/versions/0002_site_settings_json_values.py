@@ -0,0 +1,53 @@
+"""Store site setting values as JSON
+
+Revision ID: 0002_settings_json
+Revises: 0001_media_metadata
+Create Date: 2026-10-19 00:00:00
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_settings_json"
+down_revision: Union[str, Sequence[str], None] = "0001_media_metadata"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except ValueError:
+        return False
+    return True
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    column = next(c for c in sa.inspect(bind).get_columns("site_settings") if c["name"] == "value")
+    if isinstance(column["type"], sa.JSON):
+        return
+    # Plain-text values (the old Text column) become JSON strings
+    rows = bind.execute(sa.text("SELECT id, value FROM site_settings")).all()
+    for row_id, value in rows:
+        if value is None or not _is_json(value):
+            bind.execute(
+                sa.text("UPDATE site_settings SET value = :value WHERE id = :id"),
+                {"id": row_id, "value": json.dumps(value if value is not None else "")},
+            )
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE site_settings ALTER COLUMN value TYPE JSON USING value::json")
+    elif bind.dialect.name != "sqlite":  # SQLite stores JSON as text: nothing to alter
+        op.alter_column("site_settings", "value", type_=sa.JSON(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER TABLE site_settings ALTER COLUMN value TYPE TEXT USING value::text")
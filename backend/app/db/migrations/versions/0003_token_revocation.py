@@ -0,0 +1,56 @@
+"""Token revocation epochs and deleted-user tombstones
+
+Revision ID: 0003_token_revocation
+Revises: 0002_settings_json
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_token_revocation"
+down_revision: Union[str, Sequence[str], None] = "0002_settings_json"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _sqlite_autoincrement(bind) -> bool:
+    sql = bind.execute(sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'users'")).scalar()
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("users")}
+    # SQLite reuses the highest rowid after a delete; revocation is keyed by user id
+    rebuild = bind.dialect.name == "sqlite" and not _sqlite_autoincrement(bind)
+    with op.batch_alter_table(
+        "users",
+        recreate="always" if rebuild else "auto",
+        table_kwargs={"sqlite_autoincrement": True},
+    ) as batch:
+        if "token_epoch" not in columns:
+            batch.add_column(sa.Column("token_epoch", sa.Integer(), nullable=False, server_default="0"))
+
+    if not inspector.has_table("user_tombstones"):
+        op.create_table(
+            "user_tombstones",
+            sa.Column("user_id", sa.Integer(), primary_key=True),
+            sa.Column("token_epoch", sa.Integer(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_user_tombstones_deleted_at", "user_tombstones", ["deleted_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_tombstones_deleted_at", table_name="user_tombstones")
+    op.drop_table("user_tombstones")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("token_epoch")
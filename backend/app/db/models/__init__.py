@@ -5,6 +5,9 @@ from .page_revision import PageRevision
 from .media import Media
 from .site_setting import SiteSetting
 from .audit_log import AuditLog
+from .cache_version import CacheVersion
+from .auth_throttle import AuthThrottleEvent, AuthThrottleBlock
+from .user_tombstone import UserTombstone
 
 __all__ = [
     "User",
@@ -14,4 +17,8 @@ __all__ = [
     "Media",
     "SiteSetting",
     "AuditLog",
+    "CacheVersion",
+    "AuthThrottleEvent",
+    "AuthThrottleBlock",
+    "UserTombstone",
 ]
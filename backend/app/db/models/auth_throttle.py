@@ -0,0 +1,26 @@
+#app/db/models/auth_throttle.py
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Index
+from app.db.base import Base
+
+
+class AuthThrottleEvent(Base):
+    """One failed (or counted) authentication attempt for a throttle key."""
+    __tablename__ = "auth_throttle_events"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    key = Column(String(300), nullable=False)
+    ts = Column(Float, nullable=False)  # unix timestamp
+
+    # Sliding-window counts and pruning are range scans on (key, ts)
+    __table_args__ = (
+        Index("ix_auth_throttle_events_key_ts", "key", "ts"),
+    )
+
+
+class AuthThrottleBlock(Base):
+    """Current lockout for a throttle key, with the strike count driving the backoff."""
+    __tablename__ = "auth_throttle_blocks"
+
+    key = Column(String(300), primary_key=True)
+    blocked_until = Column(Float, nullable=False, default=0.0)
+    strikes = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,18 @@
+#app/db/models/cache_version.py
+from sqlalchemy import Column, String, BigInteger
+from app.db.base import Base
+
+
+class CacheVersion(Base):
+    """
+    Monotonic version counters for in-memory snapshots (e.g. "site_settings").
+    Bumped in the same transaction as the data they describe, so every worker
+    can tell cheaply whether its snapshot is stale.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
@@ -1,5 +1,5 @@
 #app/db/models/media.py
-from sqlalchemy import Column, Integer, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -15,5 +15,21 @@ class Media(Base):
     uploaded_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     uploaded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
+    # Extracted metadata (filled in the background after upload; NULL = unknown / not applicable)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    page_count = Column(Integer, nullable=True)
+    dominant_color = Column(String(7), nullable=True)  # "#rrggbb"
+    metadata_extracted_at = Column(DateTime, nullable=True)
+
     # Relationships
     uploaded_by = relationship("User", back_populates="uploads")
+
+    # Indexes for the media picker filters / sorts
+    __table_args__ = (
+        Index("ix_media_dimensions", "width", "height"),
+        Index("ix_media_duration_seconds", "duration_seconds"),
+        Index("ix_media_page_count", "page_count"),
+        Index("ix_media_metadata_extracted_at", "metadata_extracted_at"),
+    )
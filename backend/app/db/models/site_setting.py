@@ -1,5 +1,5 @@
 #app/db/models/site-settngs.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -9,7 +9,7 @@ class SiteSetting(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String(100), unique=True, nullable=False)
-    value = Column(Text, nullable=False)
+    value = Column(JSON, nullable=False)  # typed JSON, validated per key (see schemas.site_setting)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Index for fast key lookups
@@ -17,4 +17,4 @@ class SiteSetting(Base):
         Index("ix_site_settings_key", "key"),
     )
     def __repr__(self):
-        return f"<SiteSetting(id={self.id}, key='{self.key}', value='{self.value}')>"
\ No newline at end of file
+        return f"<SiteSetting(id={self.id}, key='{self.key}', value={self.value!r})>"
\ No newline at end of file
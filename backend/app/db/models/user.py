@@ -6,6 +6,8 @@ from app.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    # Never reuse the ids of deleted users: revocation epochs and tombstones are keyed by id
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -19,6 +21,9 @@ class User(Base):
     # Token revocation field
     # -------------------------
     last_token_issue = Column(DateTime, nullable=True, default=datetime.utcnow)
+    # Bumped on logout / password reset / deactivation / role change; tokens
+    # carrying an older "ep" claim are rejected (see app.core.revocation)
+    token_epoch = Column(Integer, nullable=False, default=0, server_default="0")
 
     # -------------------------
     # Relationships
@@ -0,0 +1,20 @@
+#app/db/models/user_tombstone.py
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+
+class UserTombstone(Base):
+    """
+    Last token epoch of a deleted user. The user row (and its `token_epoch`)
+    is gone, so this keeps the user's unexpired access tokens revoked across
+    worker restarts (see app.core.revocation). Kept for an access token lifetime.
+    """
+    __tablename__ = "user_tombstones"
+
+    user_id = Column(Integer, primary_key=True)
+    token_epoch = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<UserTombstone(user_id={self.user_id}, token_epoch={self.token_epoch})>"
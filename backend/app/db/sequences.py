@@ -0,0 +1,20 @@
+# app/db/sequences.py
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+async def sync_id_sequences(db: AsyncSession | AsyncConnection, tables: Iterable[str]) -> None:
+    """
+    Move each table's `id` sequence past its highest id (Postgres only).
+    Needed after inserting rows with explicit ids, which do not advance sequences.
+    """
+    dialect = db.bind.dialect if isinstance(db, AsyncSession) else db.dialect
+    if dialect.name != "postgresql":
+        return
+    for table in tables:
+        await db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+        ))
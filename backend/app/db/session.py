@@ -1,15 +1,70 @@
 # app/db/session.py
 
+import math
+import time
 from typing import AsyncGenerator
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import Histogram
+
+pool_wait_seconds = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records checkout wait times (read by the admission controller).
+
+    The moving average also decays with wall-clock time: once requests are
+    shed nothing checks out any more, and the average must still fall back.
+    """
+
+    # Smoothing factor of the moving average
+    EWMA_ALPHA = 0.2
+    # Time constant of the decay between checkouts, in seconds
+    DECAY_SECONDS = 2.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_ewma = 0.0
+        self._updated = time.monotonic()
+        self.waiting = 0
+
+    @property
+    def wait_ewma(self) -> float:
+        idle = time.monotonic() - self._updated
+        return self._wait_ewma * math.exp(-idle / self.DECAY_SECONDS)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+            waited = time.perf_counter() - start
+            pool_wait_seconds.observe(waited)
+            current = self.wait_ewma
+            self._wait_ewma = current + self.EWMA_ALPHA * (waited - current)
+            self._updated = time.monotonic()
+
 
 # Create async engine using PostgreSQL (asyncpg)
+engine_options = {}
+if make_url(settings.DATABASE_URL).get_backend_name() == "postgresql":
+    engine_options["poolclass"] = TimedQueuePool
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,  # True = show SQL logs in console
     future=True,
+    **engine_options,
 )
 
 # Async session factory
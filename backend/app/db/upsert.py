@@ -0,0 +1,14 @@
+# app/db/upsert.py
+from typing import Callable, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def upsert_insert(db: AsyncSession) -> Optional[Callable]:
+    """
+    The dialect's `insert` construct with `on_conflict_do_update`, or None when
+    the dialect has no INSERT ... ON CONFLICT (callers fall back to
+    select-then-insert/update).
+    """
+    return {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.bind.dialect.name)
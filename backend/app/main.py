@@ -1,5 +1,8 @@
+import asyncio
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles  # ✅ Added import
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
@@ -8,7 +11,20 @@ from passlib.context import CryptContext
 # Import database and core components
 from app.db.session import get_db, engine
 from app.db.base import Base
+from app.core.admission import AdmissionControlMiddleware
 from app.core.config import settings
+from app.core.dependency_graph import dedupe_dependencies
+from app.core.jwt_keys import get_keyset
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, exporter as span_exporter
+from app.core.loop_monitor import RouteContextMiddleware, blocking_detector, run_loop_lag_monitor
+from app.core.metrics import render_prometheus
+from app.core.responses import FastJSONResponse
+from app.core.media_gc import run_periodic_media_gc
+from app.core.media_metadata import metadata_worker
+from app.core.invalidation_bus import invalidation_bus
+from app.core.revocation import poll_revocation_table, revocation_table
+from app.core.settings_snapshot import poll_settings_snapshot, settings_snapshot
 from app.api import routes
 
 # Import models necessary for startup (e.g., demo data creation)
@@ -21,6 +37,7 @@ app = FastAPI(
     title="FastAPI CMS",
     version="1.0.0",
     description="A modular CMS built with FastAPI, SQLAlchemy, and Pydantic v2.",
+    default_response_class=FastJSONResponse,
 )
 
 # --- CORS Configuration ---
@@ -32,6 +49,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Admin request profiling (`X-Profile: 1` / `?__profile=1`) ---
+app.add_middleware(ProfilingMiddleware)
+
+# --- Blocking-call and slow-query reports name the route of the request ---
+app.add_middleware(RouteContextMiddleware)
+
+# --- Tracing (sampled requests get a server span; see app/core/tracing.py) ---
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# --- Load shedding (outermost, so rejected requests cost as little as possible) ---
+app.add_middleware(AdmissionControlMiddleware)
+
 # ----------------------------------------------------------------------
 ## Static Files Mount
 # ----------------------------------------------------------------------
@@ -47,6 +77,20 @@ async def root():
     """Confirms the API is running."""
     return {"message": "FastAPI CMS is running!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of this worker's in-process metrics."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """Public keys for verifying access tokens (empty while signing with HMAC)."""
+    return Response(
+        get_keyset().jwks(),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
 @app.get("/test-db")
 async def test_db(db: AsyncSession = Depends(get_db)):
     """Verifies the database connection by executing a simple query."""
@@ -61,6 +105,11 @@ app.include_router(routes.media.router, prefix="/api/media", tags=["Media"])
 app.include_router(routes.settings.router, prefix="/api/settings", tags=["Settings"])
 app.include_router(routes.audit_logs.router, prefix="/api/audit-logs", tags=["Audit Logs"])
 app.include_router(routes.auth.router, prefix="/api", tags=["Auth"])
+app.include_router(routes.content.router, prefix="/api/content", tags=["Content Transfer"])
+app.include_router(routes.diagnostics.router, prefix="/api/diagnostics", tags=["Diagnostics"])
+
+# Solve each shared dependency (the current principal above all) once per request
+dedupe_dependencies(app)
 
 
 # ----------------------------------------------------------------------
@@ -94,7 +143,7 @@ async def on_startup():
                 for u in demo_users:
                     user = User(
                         email=u["email"],
-                        hashed_password=pwd_context.hash(u["password"]),
+                        hashed_password=await asyncio.to_thread(pwd_context.hash, u["password"]),
                         role=u["role"],
                         is_active=True,
                     )
@@ -108,6 +157,63 @@ async def on_startup():
         print(f"❌ Error inserting demo users. Rolling back transaction: {e}")
         await session.rollback()
 
+    try:
+        await metadata_worker.start(resume=True)
+    except Exception as e:
+        print(f"❌ Could not queue unprocessed media for metadata extraction: {e}")
+        await metadata_worker.start()
+
+    try:
+        await revocation_table.reload()
+    except Exception as e:
+        print(f"❌ Could not load token revocation table: {e}")
+
+    try:
+        await settings_snapshot.ensure_loaded()
+    except Exception as e:
+        print(f"❌ Could not load site settings snapshot: {e}")
+
+    # Cross-worker invalidation (token revocation, settings, response cache)
+    if invalidation_bus.enabled:
+        app.state.invalidation_bus_task = asyncio.create_task(invalidation_bus.run())
+    else:
+        app.state.settings_poll_task = asyncio.create_task(
+            poll_settings_snapshot(settings.SETTINGS_SNAPSHOT_POLL_SECONDS)
+        )
+        app.state.revocation_poll_task = asyncio.create_task(
+            poll_revocation_table(settings.TOKEN_REVOCATION_POLL_SECONDS)
+        )
+
+    if settings.LOOP_LAG_INTERVAL_SECONDS > 0:
+        app.state.loop_lag_task = asyncio.create_task(
+            run_loop_lag_monitor(settings.LOOP_LAG_INTERVAL_SECONDS)
+        )
+    if settings.LOOP_BLOCKING_DEBUG:
+        blocking_detector.start(asyncio.get_running_loop())
+
+    if settings.TRACING_ENABLED:
+        app.state.span_export_task = asyncio.create_task(
+            span_exporter.run(settings.TRACING_EXPORT_INTERVAL_SECONDS)
+        )
+
+    if settings.MEDIA_GC_INTERVAL_SECONDS > 0:
+        app.state.media_gc_task = asyncio.create_task(
+            run_periodic_media_gc(settings.MEDIA_GC_INTERVAL_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stops background jobs started in `on_startup`."""
+    for name in ("media_gc_task", "settings_poll_task", "revocation_poll_task", "invalidation_bus_task",
+                 "loop_lag_task", "span_export_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    blocking_detector.stop()
+    await metadata_worker.stop()
+    await invalidation_bus.flush()
+
 
 # ----------------------------------------------------------------------
 ## Entry Point (For Development)
@@ -32,6 +32,7 @@ from app.schemas.site_setting import (
     SiteSettingCreate,
     SiteSettingUpdate,
     SiteSettingRead,
+    SiteSettingsPatch,
 )
 
 from app.schemas.audit_log import (
@@ -50,7 +51,7 @@ __all__ = [
     # Media
     "MediaBase", "MediaCreate", "MediaRead",
     # Site Settings
-    "SiteSettingBase", "SiteSettingCreate", "SiteSettingUpdate", "SiteSettingRead",
+    "SiteSettingBase", "SiteSettingCreate", "SiteSettingUpdate", "SiteSettingRead", "SiteSettingsPatch",
     # Audit Logs
     "AuditLogBase", "AuditLogCreate", "AuditLogRead",
 ]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, ConfigDict
 
 
@@ -18,4 +19,12 @@ class MediaRead(MediaBase):
     uploaded_by_user_id: int
     uploaded_at: datetime
 
+    # Extracted metadata (None until the background extractor has run)
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration_seconds: Optional[float] = None
+    page_count: Optional[int] = None
+    dominant_color: Optional[str] = None
+    metadata_extracted_at: Optional[datetime] = None
+
     model_config = ConfigDict(from_attributes=True)
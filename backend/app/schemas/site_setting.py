@@ -1,16 +1,45 @@
 #app/schemas/site_setting.py
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, ValidationError, conint
+
+# NOTE: 'value' is stored as JSON. Keys listed in SETTING_SCHEMAS are validated
+# against their type at write time; any other key accepts arbitrary JSON.
+
+# --- Per-key value schemas ---
+SETTING_SCHEMAS: Dict[str, TypeAdapter] = {
+    "site_name": TypeAdapter(str),
+    "tagline": TypeAdapter(str),
+    "contact_email": TypeAdapter(EmailStr),
+    "contact_phone": TypeAdapter(str),
+    "logo_url": TypeAdapter(str),
+    "favicon_url": TypeAdapter(str),
+    "hero_image_url": TypeAdapter(str),
+    "social_links": TypeAdapter(Dict[str, str]),
+    "maintenance_mode": TypeAdapter(bool),
+    "items_per_page": TypeAdapter(conint(ge=1, le=500)),
+}
+
+
+def validate_setting_value(key: str, value: Any) -> Any:
+    """
+    Validate (and coerce) `value` against the schema registered for `key`.
+    Raises ValueError with a readable message when it does not match.
+    """
+    adapter = SETTING_SCHEMAS.get(key)
+    if adapter is None:
+        return value
+    try:
+        return adapter.validate_python(value)
+    except ValidationError as e:
+        raise ValueError(f"Invalid value for setting '{key}': {e.errors()[0]['msg']}")
 
-# NOTE: 'value' is handled as a str in Pydantic because the database stores it as TEXT, 
-# even if the content is meant to be JSON or another format.
 
 # --- SiteSettingBase: Shared fields for Creation and Update ---
 class SiteSettingBase(BaseModel):
     """Base schema for SiteSetting data, containing only the value field."""
     
-    value: str = Field(..., description="The configuration value associated with the key (stored as text).")
+    value: Any = Field(..., description="The configuration value associated with the key (any JSON value).")
 
     class Config:
         # Essential for reading data directly from the SQLAlchemy ORM model
@@ -29,12 +58,19 @@ class SiteSettingUpdate(BaseModel):
     """Schema for updating an existing SiteSetting instance (only value is needed in the payload)."""
     
     # Only the value is provided for an update payload; the key/id is passed in the URL.
-    value: str = Field(..., description="The new configuration value.")
+    value: Any = Field(..., description="The new configuration value (any JSON value).")
     
     class Config:
         from_attributes = True
 
 
+# --- SiteSettingsPatch: Bulk upsert of many keys at once ---
+class SiteSettingsPatch(BaseModel):
+    """Schema for upserting several settings in one request: `{"values": {key: value}}`."""
+
+    values: Dict[str, Any] = Field(..., description="Mapping of setting keys to their new JSON values.")
+
+
 # --- SiteSettingRead: Full representation including IDs and timestamp ---
 class SiteSettingRead(SiteSettingBase):
     """Schema for reading/returning a SiteSetting instance, including database metadata."""
@@ -44,4 +80,4 @@ class SiteSettingRead(SiteSettingBase):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
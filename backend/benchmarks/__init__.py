@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+Standalone micro/macro benchmarks. Run from the backend directory, e.g.
+
+    python -m benchmarks.permissions
+"""
@@ -0,0 +1,435 @@
+# benchmarks/api_routes.py
+"""
+Benchmark every API route in-process (ASGI transport, no network) against a
+seeded database: throughput, p50/p95/p99 latency and SQL queries per request.
+
+    python -m benchmarks.api_routes [--requests 200] [--concurrency 1] [--only pages]
+    python -m benchmarks.api_routes --save-baseline      # record benchmarks/api_routes_baseline.json
+    python -m benchmarks.api_routes --compare            # exit 1 on regressions past the thresholds
+
+By default a throwaway SQLite database is seeded with `seed-bench`; set
+DATABASE_URL (e.g. a local Postgres) and pass --no-seed to reuse an already
+seeded one. Baselines are machine-specific: record one on the machine that
+runs the comparison.
+
+Every request gets its own query counter (a context variable read by a
+`before_cursor_execute` listener), so counts stay exact with concurrency.
+Request setup (creating the rows a DELETE removes, minting tokens, ...)
+happens before the timed phase.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+_tmp_dir = tempfile.mkdtemp(prefix="cms-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp_dir}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+os.environ.setdefault("MEDIA_ROOT", f"{_tmp_dir}/uploads")
+# Login / reset benchmarks would otherwise trip the brute-force throttle
+os.environ.setdefault("AUTH_THROTTLE_IP_LIMIT", "1000000000")
+os.environ.setdefault("AUTH_THROTTLE_ACCOUNT_LIMIT", "1000000000")
+
+import httpx  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+
+from app.cli import seed_bench  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.db.models import Media, Page, SiteSetting, User  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+ADMIN = {"username": "brianmalani17@gmail.com", "password": "1016-wjE"}
+EDITOR = {"username": "achapuma@gmail.com", "password": "12345678me"}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "api_routes_baseline.json")
+
+current_queries: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("current_queries", default=None)
+
+
+def _count_query(*_args) -> None:
+    counter = current_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+# ==========================
+# 🧪 SCENARIOS
+# ==========================
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str  # route template, used for the coverage report
+    build: Callable[[int], Awaitable[Dict[str, Any]]]  # untimed setup -> httpx request kwargs
+    share: float = 1.0  # fraction of --requests (bcrypt / bulk routes run fewer)
+    ok: Tuple[int, ...] = (200, 201, 204)
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_request: float
+    error_samples: List[str] = field(default_factory=list)
+
+
+class Context:
+    """Shared state for building requests: auth headers, seeded ids, a run-unique prefix."""
+
+    def __init__(self, client: httpx.AsyncClient, admin: Dict[str, str], editor: Dict[str, str], seed: int):
+        self.client = client
+        self.admin = admin
+        self.editor = editor
+        self.rng = random.Random(seed)
+        self.run = f"r{time.time_ns() % 10**10}"
+        self.page_ids: List[int] = []
+        self.user_ids: List[int] = []
+        self.hashed = get_password_hash("bench-password")
+
+    async def load_ids(self) -> None:
+        async with AsyncSessionLocal() as db:
+            self.page_ids = list((await db.execute(select(Page.id).order_by(Page.id).limit(1000))).scalars())
+            self.user_ids = list((await db.execute(
+                select(User.id).where(User.role == "public").order_by(User.id).limit(1000)
+            )).scalars())
+
+    async def insert(self, model, **values) -> Any:
+        """Create a row directly (request setup); returns the new instance."""
+        async with AsyncSessionLocal() as db:
+            obj = model(**values)
+            db.add(obj)
+            await db.commit()
+            return obj
+
+    async def new_user(self, i: int, tag: str) -> User:
+        return await self.insert(
+            User, email=f"{self.run}-{tag}-{i}@example.com", hashed_password=self.hashed, role="public"
+        )
+
+    def token_for(self, user: User) -> Dict[str, str]:
+        claims = {"sub": user.email, "id": user.id, "role": user.role, "ep": user.token_epoch or 0}
+        return {"Authorization": f"Bearer {create_access_token(claims, timedelta(minutes=30))}"}
+
+
+def build_scenarios(ctx: Context) -> List[Scenario]:
+    A, E, rng = ctx.admin, ctx.editor, ctx.rng
+
+    def get(path: str, url: Callable[[int], str], headers=None, **kwargs) -> Scenario:
+        async def build(i: int) -> Dict[str, Any]:
+            return {"method": "GET", "url": url(i), "headers": headers if headers is not None else A}
+        return Scenario(f"GET {path}", "GET", path, build, **kwargs)
+
+    def scenario(method: str, path: str, build, **kwargs) -> Scenario:
+        return Scenario(f"{method} {path}", method, path, build, **kwargs)
+
+    # --- Users ---
+    async def create_user(i):
+        return {"method": "POST", "url": "/api/users/users/", "headers": A,
+                "json": {"email": f"{ctx.run}-new-{i}@example.com", "password": "bench-password", "role": "public"}}
+
+    async def update_user(i):
+        return {"method": "PUT", "url": f"/api/users/users/{rng.choice(ctx.user_ids)}", "headers": A, "json": {"is_active": True}}
+
+    async def delete_user(i):
+        user = await ctx.new_user(i, "del")
+        return {"method": "DELETE", "url": f"/api/users/users/{user.id}", "headers": A}
+
+    # --- Pages ---
+    async def create_page(i):
+        return {"method": "POST", "url": "/api/pages/pages/", "headers": A,
+                "json": {"slug": f"{ctx.run}-page-{i}", "title": f"Bench page {i}", "is_published": True}}
+
+    async def update_page(i):
+        return {"method": "PUT", "url": f"/api/pages/pages/{rng.choice(ctx.page_ids)}", "headers": A, "json": {"title": f"Retitled {i}"}}
+
+    async def delete_page(i):
+        page = await ctx.insert(Page, slug=f"{ctx.run}-del-{i}", title="To delete")
+        return {"method": "DELETE", "url": f"/api/pages/pages/{page.id}", "headers": A}
+
+    # --- Media ---
+    async def upload(i):
+        return {"method": "POST", "url": "/api/media/media/", "headers": A,
+                "files": {"file": (f"bench-{i}.txt", b"benchmark upload " * 64, "text/plain")}}
+
+    async def bulk_upload(i):
+        files = [("files", (f"bulk-{i}-{n}.txt", b"bulk " * 256, "text/plain")) for n in range(5)]
+        return {"method": "POST", "url": "/api/media/media/bulk", "headers": A, "files": files}
+
+    async def delete_media(i):
+        media = await ctx.insert(
+            Media, filename=f"{ctx.run}-gone-{i}.txt", url="/static/uploads/gone.txt",
+            mimetype="text/plain", filesize_bytes=1, uploaded_by_user_id=1,
+        )
+        return {"method": "DELETE", "url": f"/api/media/media/{media.id}", "headers": A}
+
+    # --- Settings ---
+    async def create_setting(i):
+        return {"method": "POST", "url": "/api/settings/site-settings/", "headers": A,
+                "json": {"key": f"{ctx.run}-new-{i}", "value": {"n": i}}}
+
+    async def update_setting(i):
+        return {"method": "PUT", "url": "/api/settings/site-settings/tagline", "headers": A, "json": {"value": f"Tagline {i}"}}
+
+    async def delete_setting(i):
+        key = f"{ctx.run}-del-{i}"
+        await ctx.insert(SiteSetting, key=key, value=i)
+        return {"method": "DELETE", "url": f"/api/settings/site-settings/{key}", "headers": A}
+
+    async def upsert_setting(i):
+        return {"method": "POST", "url": "/api/settings/site-settings/upsert/items_per_page", "headers": A, "json": {"value": 10 + i % 20}}
+
+    async def patch_settings(i):
+        return {"method": "PATCH", "url": "/api/settings/site-settings/", "headers": A,
+                "json": {"values": {"tagline": f"Patched {i}", "maintenance_mode": False}}}
+
+    # --- Auth ---
+    async def register(i):
+        return {"method": "POST", "url": "/api/auth/register",
+                "json": {"email": f"{ctx.run}-reg-{i}@example.com", "password": "bench-password"}}
+
+    async def login(i):
+        return {"method": "POST", "url": "/api/auth/login", "data": EDITOR}
+
+    refresh_cookie: Dict[str, str] = {}
+
+    async def refresh(i):
+        if not refresh_cookie:
+            r = await ctx.client.post("/api/auth/login", data=EDITOR)
+            refresh_cookie["Cookie"] = f"refresh_token={r.cookies['refresh_token']}"
+        return {"method": "POST", "url": "/api/auth/refresh", "headers": refresh_cookie}
+
+    async def logout(i):
+        # Logging out revokes the user's tokens, so every request gets its own user
+        return {"method": "POST", "url": "/api/auth/logout", "headers": ctx.token_for(await ctx.new_user(i, "out"))}
+
+    async def reset_request(i):
+        return {"method": "POST", "url": "/api/auth/reset-password/request", "json": {"email": EDITOR["username"]}}
+
+    async def reset_confirm(i):
+        user = await ctx.new_user(i, "reset")
+        token = create_access_token({"sub": user.email}, timedelta(minutes=30))
+        return {"method": "POST", "url": "/api/auth/reset-password/confirm",
+                "json": {"token": token, "new_password": "bench-password-2"}}
+
+    # --- Content transfer ---
+    archive: Dict[str, bytes] = {}
+
+    async def import_content(i):
+        if not archive:
+            archive["body"] = (await ctx.client.get("/api/content/content/export?format=ndjson", headers=A)).content
+        return {"method": "POST", "url": "/api/content/content/import?replace=true", "headers": A,
+                "files": {"archive": ("content.ndjson", archive["body"], "application/x-ndjson")}}
+
+    page = lambda i: rng.choice(ctx.page_ids)  # noqa: E731
+    return [
+        # Reads
+        get("/api/users/users/", lambda i: "/api/users/users/"),
+        get("/api/users/users/{user_id}", lambda i: f"/api/users/users/{rng.choice(ctx.user_ids)}"),
+        get("/api/pages/pages/", lambda i: "/api/pages/pages/"),
+        get("/api/pages/pages/{page_id}", lambda i: f"/api/pages/pages/{page(i)}"),
+        get("/api/media/media/", lambda i: "/api/media/media/?limit=100"),
+        get("/api/settings/site-settings/", lambda i: "/api/settings/site-settings/"),
+        get("/api/settings/site-settings/public", lambda i: "/api/settings/site-settings/public", headers={}),
+        get("/api/settings/site-settings/{key}", lambda i: "/api/settings/site-settings/site_name"),
+        get("/api/audit-logs/audit-logs/", lambda i: "/api/audit-logs/audit-logs/", share=0.1),
+        get("/api/auth/me", lambda i: "/api/auth/me", headers=E),
+        get("/api/content/content/export", lambda i: "/api/content/content/export?format=ndjson", share=0.05),
+        # Writes
+        scenario("POST", "/api/users/users/", create_user, share=0.1),
+        scenario("PUT", "/api/users/users/{user_id}", update_user),
+        scenario("DELETE", "/api/users/users/{user_id}", delete_user),
+        scenario("POST", "/api/pages/pages/", create_page),
+        scenario("PUT", "/api/pages/pages/{page_id}", update_page),
+        scenario("DELETE", "/api/pages/pages/{page_id}", delete_page),
+        scenario("POST", "/api/media/media/", upload),
+        scenario("POST", "/api/media/media/bulk", bulk_upload, share=0.25),
+        scenario("DELETE", "/api/media/media/{media_id}", delete_media),
+        scenario("POST", "/api/settings/site-settings/", create_setting),
+        scenario("PUT", "/api/settings/site-settings/{key}", update_setting),
+        scenario("DELETE", "/api/settings/site-settings/{key}", delete_setting),
+        scenario("POST", "/api/settings/site-settings/upsert/{key}", upsert_setting),
+        scenario("PATCH", "/api/settings/site-settings/", patch_settings),
+        # Auth (bcrypt-bound routes run fewer requests)
+        scenario("POST", "/api/auth/register", register, share=0.1),
+        scenario("POST", "/api/auth/login", login, share=0.1),
+        scenario("POST", "/api/auth/refresh", refresh),
+        scenario("POST", "/api/auth/logout", logout),
+        scenario("POST", "/api/auth/reset-password/request", reset_request),
+        scenario("POST", "/api/auth/reset-password/confirm", reset_confirm, share=0.1),
+        # Last: replaces the seeded content
+        scenario("POST", "/api/content/content/import", import_content, share=0.05),
+    ]
+
+
+def uncovered_routes(scenarios: List[Scenario]) -> List[str]:
+    covered = {(s.method, s.path) for s in scenarios}
+    missing = []
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("app.api.routes"):
+            missing += [f"{m} {route.path}" for m in sorted(route.methods) if (m, route.path) not in covered]
+    return missing
+
+
+# ==========================
+# ⏱️ RUNNING
+# ==========================
+def _percentile(samples: List[float], q: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, warmup: int) -> Result:
+    count = max(5, int(requests * scenario.share))
+    prepared = [await scenario.build(i) for i in range(count + warmup)]
+    for kwargs in prepared[:warmup]:
+        await client.request(**kwargs)
+    prepared = prepared[warmup:]
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors: List[str] = []
+    pending = iter(prepared)
+
+    async def worker() -> None:
+        for kwargs in pending:
+            counter = [0]
+            token = current_queries.set(counter)
+            start = time.perf_counter()
+            response = await client.request(**kwargs)
+            latencies.append(time.perf_counter() - start)
+            current_queries.reset(token)
+            queries.append(counter[0])
+            if response.status_code not in scenario.ok:
+                errors.append(f"{response.status_code} {response.text[:120]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return Result(
+        requests=count,
+        errors=len(errors),
+        rps=count / elapsed if elapsed else 0.0,
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p95_ms=_percentile(latencies, 95) * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+        queries_per_request=statistics.mean(queries),
+        error_samples=errors[:3],
+    )
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Any], args) -> List[str]:
+    """Regressions past the thresholds, as human-readable lines."""
+    problems = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            now, before = getattr(result, metric), base[metric]
+            if now > before * (1 + args.max_latency_regression) and now - before > args.noise_floor_ms:
+                problems.append(f"{name}: {metric} {before:.2f} -> {now:.2f} ms")
+        if result.rps < base["rps"] * (1 - args.max_throughput_regression):
+            problems.append(f"{name}: throughput {base['rps']:.0f} -> {result.rps:.0f} req/s")
+        if result.queries_per_request > base["queries_per_request"] + args.max_extra_queries:
+            problems.append(f"{name}: queries/request {base['queries_per_request']:.1f} -> {result.queries_per_request:.1f}")
+    return problems
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route (some routes run a fraction).")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per route first.")
+    parser.add_argument("--only", help="Only routes whose name contains this text.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-seed", action="store_true", help="Use the database as is (already seeded).")
+    parser.add_argument("--seed-pages", type=int, default=500)
+    parser.add_argument("--seed-audit-logs", type=int, default=20_000)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline; exit 1 on regressions.")
+    parser.add_argument("--max-latency-regression", type=float, default=0.25, help="Allowed p50/p95 increase (fraction).")
+    parser.add_argument("--max-throughput-regression", type=float, default=0.20, help="Allowed throughput drop (fraction).")
+    parser.add_argument("--max-extra-queries", type=float, default=0.0, help="Allowed extra queries per request.")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.5, help="Ignore latency changes smaller than this.")
+    args = parser.parse_args()
+
+    for handler in app.router.on_startup:
+        await handler()
+    if not args.no_seed:
+        await seed_bench.run(argparse.Namespace(
+            seed=args.seed, users=100, pages=args.seed_pages, blocks_per_page=8, revisions_per_page=2,
+            media=args.seed_pages, audit_logs=args.seed_audit_logs, no_media_files=True, batch_size=5000,
+        ))
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        admin = {"Authorization": f"Bearer {(await client.post('/api/auth/login', data=ADMIN)).json()['access_token']}"}
+        editor = {"Authorization": f"Bearer {(await client.post('/api/auth/login', data=EDITOR)).json()['access_token']}"}
+        ctx = Context(client, admin, editor, args.seed)
+        await ctx.load_ids()
+        scenarios = build_scenarios(ctx)
+        for route in uncovered_routes(scenarios):
+            print(f"⚠️ No benchmark for {route}")
+        if args.only:
+            scenarios = [s for s in scenarios if args.only in s.name]
+
+        results: Dict[str, Result] = {}
+        print(f"{'route':<48} {'req':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for scenario in scenarios:
+            result = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+            results[scenario.name] = result
+            client.cookies.clear()  # login / refresh responses set cookies on the client
+            flag = f"  ❌ {result.errors} errors, e.g. {result.error_samples[0]}" if result.errors else ""
+            print(
+                f"{scenario.name:<48} {result.requests:>5} {result.rps:>8.0f} {result.p50_ms:>8.2f} "
+                f"{result.p95_ms:>8.2f} {result.p99_ms:>8.2f} {result.queries_per_request:>8.1f}{flag}"
+            )
+
+    for handler in app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+    failed = any(result.errors for result in results.values())
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}; record one with --save-baseline")
+            return 1
+        with open(args.baseline) as fh:
+            problems = compare(results, json.load(fh), args)
+        for line in problems:
+            print(f"❌ Regression: {line}")
+        if not problems:
+            print(f"✅ No regressions against {args.baseline}")
+        failed = failed or bool(problems)
+    if args.save_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump({
+                "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "database": engine.dialect.name,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "results": {name: {k: v for k, v in asdict(r).items() if k != "error_samples"} for name, r in results.items()},
+            }, fh, indent=2)
+        print(f"ℹ️ Baseline written to {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
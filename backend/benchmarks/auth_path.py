@@ -0,0 +1,163 @@
+# benchmarks/auth_path.py
+"""
+Microbenchmarks for the per-request auth hot path: access-token decode, the
+`get_current_principal` dependency, permission evaluation and FastAPI
+dependency resolution for the route shapes the API uses.
+
+Finishes with a check of the real app's dependency graph: every protected
+route must resolve the current principal exactly once (exit status 1 if not).
+
+    python -m benchmarks.auth_path [--iterations N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import AsyncExitStack
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+from fastapi.dependencies.utils import solve_dependencies  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from app.core.auth_deps import Principal, get_current_principal  # noqa: E402
+from app.core.dependency_graph import (  # noqa: E402
+    count_resolutions,
+    dedupe_route_dependencies,
+    route_resolutions,
+)
+from app.core.jwt_keys import get_keyset  # noqa: E402
+from app.core.permissions import ROLE_MASKS, permission_mask, require_permission  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+
+PERMISSION = "content.edit"
+
+
+def _legacy_sync_permission(permission: str):
+    """The previous dependency shape: a plain `def`, which FastAPI runs in the threadpool."""
+    mask = permission_mask([permission])
+
+    def dep(current_user: Principal = Depends(get_current_principal)) -> Principal:
+        if not ROLE_MASKS.get(current_user.role, 0) & mask:
+            raise RuntimeError
+        return current_user
+
+    return dep
+
+
+def _shapes() -> dict:
+    """One route per dependency shape, on a throwaway app."""
+    bench = FastAPI()
+    legacy = _legacy_sync_permission(PERMISSION)
+
+    @bench.put("/legacy", dependencies=[Depends(legacy)])
+    async def legacy_route(current_user=Depends(get_current_principal)):
+        return None
+
+    @bench.put("/declared-twice", dependencies=[Depends(require_permission(PERMISSION))])
+    async def declared_twice(current_user=Depends(get_current_principal)):
+        return None
+
+    @bench.put("/declared-twice-deduped", dependencies=[Depends(require_permission(PERMISSION))])
+    async def declared_twice_deduped(current_user=Depends(get_current_principal)):
+        return None
+
+    @bench.put("/single")
+    async def single(current_user: Principal = Depends(require_permission(PERMISSION))):
+        return None
+
+    routes = {route.path: route for route in bench.routes if isinstance(route, APIRoute)}
+    dedupe_route_dependencies(routes["/declared-twice-deduped"])
+    return {
+        "sync permission dep + principal": routes["/legacy"],
+        "permission dep + principal": routes["/declared-twice"],
+        "  ... after dedupe pass": routes["/declared-twice-deduped"],
+        "principal from permission dep": routes["/single"],
+    }
+
+
+def _request(token: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "PUT",
+        "path": "/",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+async def _per_op_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def _solve(route: APIRoute, request: Request) -> None:
+    async with AsyncExitStack() as stack:
+        solved = await solve_dependencies(
+            request=request,
+            dependant=route.dependant,
+            async_exit_stack=stack,
+            embed_body_fields=False,
+        )
+    if solved.errors:
+        raise RuntimeError(solved.errors)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    token = create_access_token({"sub": "bench@example.com", "id": 1, "role": "editor"})
+    keyset = get_keyset()
+    principal = Principal(id=1, email="bench@example.com", role="editor")
+    compiled = require_permission(PERMISSION)
+    legacy = _legacy_sync_permission(PERMISSION)
+
+    async def decode():
+        keyset.decode(token)
+
+    async def principal_dep():
+        await get_current_principal(token)
+
+    async def permission_async():
+        await compiled(current_user=principal)
+
+    async def permission_threadpool():
+        await run_in_threadpool(legacy, current_user=principal)
+
+    print(f"{'step':<34} {'µs/op':>9}")
+    for label, fn in (
+        ("jwt decode (keyset)", decode),
+        ("get_current_principal", principal_dep),
+        ("permission dep (async)", permission_async),
+        ("permission dep (sync, threadpool)", permission_threadpool),
+    ):
+        print(f"{label:<34} {await _per_op_us(fn, n):>9.2f}")
+
+    print(f"\n{'dependency resolution':<34} {'µs/op':>9} {'principal solves':>17}")
+    request = _request(token)
+    for label, route in _shapes().items():
+        us = await _per_op_us(lambda: _solve(route, request), n)
+        solves = count_resolutions(route.dependant, get_current_principal)
+        print(f"{label:<34} {us:>9.2f} {solves:>17}")
+
+    counts = route_resolutions(app, get_current_principal)
+    repeated = {route: count for route, count in counts.items() if count != 1}
+    print(f"\napp routes resolving the principal: {len(counts)}, more than once: {len(repeated)}")
+    for route, count in sorted(repeated.items()):
+        print(f"  {route}: {count}")
+    return 1 if repeated else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
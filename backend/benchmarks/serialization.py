@@ -0,0 +1,100 @@
+# benchmarks/serialization.py
+"""
+CPU cost of serializing one list response of page blocks with large JSON
+content, per encoding path:
+
+    fastapi     response_model validation + jsonable dump + stdlib JSONResponse
+    fastapi+orjson  same, rendered by FastJSONResponse
+    direct      encode_json(): from_attributes validation + pydantic-core dump_json
+
+Uses transient ORM objects (no database) so only serialization is measured:
+
+    python -m benchmarks.serialization [--rows 500] [--content-keys 40] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+import app.db.models  # noqa: E402,F401  (registers every mapper)
+from app.core.responses import FastJSONResponse, encode_json, orjson  # noqa: E402
+from app.db.models.page_block import PageBlock  # noqa: E402
+from app.schemas import PageBlockRead  # noqa: E402
+
+MODEL = list[PageBlockRead]
+
+
+def build_rows(rows: int, content_keys: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        PageBlock(
+            id=i,
+            page_id=1 + i % 20,
+            type="text",
+            content={
+                f"field_{k}": {"text": "lorem ipsum dolor sit amet " * 4, "n": k, "items": list(range(8))}
+                for k in range(content_keys)
+            },
+            order=i,
+            is_visible=True,
+            created_by_id=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(rows)
+    ]
+
+
+async def fastapi_path(field, rows, response_class) -> bytes:
+    content = await serialize_response(field=field, response_content=rows, is_coroutine=True)
+    return response_class(content).body
+
+
+async def direct_path(field, rows, response_class) -> bytes:
+    return encode_json(MODEL, rows)
+
+
+async def measure(path, field, rows, response_class, repeat: int) -> tuple[float, int]:
+    body = await path(field, rows, response_class)  # warm-up (adapter build, caches)
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        await path(field, rows, response_class)
+        samples.append(time.process_time() - start)
+    return statistics.median(samples), len(body)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--content-keys", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.content_keys)
+    field = create_model_field(name="Response_bench", type_=MODEL, mode="serialization")
+    print(f"ℹ️ {args.rows} blocks x {args.content_keys} content keys, orjson {'on' if orjson else 'not installed'}")
+
+    paths = [
+        ("fastapi", fastapi_path, JSONResponse),
+        ("fastapi+orjson", fastapi_path, FastJSONResponse),
+        ("direct", direct_path, None),
+    ]
+    baseline = None
+    for name, path, response_class in paths:
+        cpu, size = await measure(path, field, rows, response_class, args.repeat)
+        baseline = baseline or cpu
+        print(f"{name:>15}: {cpu * 1000:8.2f} ms CPU/response  {size / 1024:8.0f} KiB  x{baseline / cpu:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+# benchmarks/single_flight.py
+"""
+Load test for request coalescing: after a page is invalidated, fire N
+concurrent GETs for it and count the SQL statements they cause, with the
+single-flight group enabled and with it bypassed.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.single_flight [--concurrency 50] [--rounds 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="cms-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "memory")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core import response_cache  # noqa: E402
+from app.core.response_cache import invalidate_tags  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+ADMIN = {"username": "brianmalani17@gmail.com", "password": "1016-wjE"}
+
+
+class _NoFlight:
+    """Every caller runs its own load (the behaviour without coalescing)."""
+
+    def in_flight(self, key):
+        return False
+
+    async def do(self, key, loader, timeout=None):
+        return await loader()
+
+
+async def _round(client, url: str, page_id: int, concurrency: int, counter: list) -> tuple[int, float]:
+    await invalidate_tags(f"page:{page_id}")
+    counter[0] = 0
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(client.get(url) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses), responses[0].text
+    return counter[0], elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    for handler in app.router.on_startup:
+        await handler()
+    counter = [0]
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: counter.__setitem__(0, counter[0] + 1))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/auth/login", data=ADMIN)).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        page = (await client.post(
+            "/api/pages/pages/", json={"title": "Hot page", "slug": f"hot-{time.time_ns()}", "content": "x" * 2000}
+        )).json()
+        url = f"/api/pages/pages/{page['id']}"
+
+        flight = response_cache.response_flight
+        print(f"{args.concurrency} concurrent GETs after each of {args.rounds} invalidations")
+        print(f"{'mode':<16} {'queries/round':>14} {'ms/round (p50)':>15}")
+        for label, group in (("no coalescing", _NoFlight()), ("single-flight", flight)):
+            response_cache.response_flight = group
+            results = [
+                await _round(client, url, page["id"], args.concurrency, counter) for _ in range(args.rounds)
+            ]
+            queries = statistics.mean(q for q, _ in results)
+            p50 = statistics.median(t for _, t in results) * 1000
+            print(f"{label:<16} {queries:>14.1f} {p50:>15.1f}")
+        response_cache.response_flight = flight
+
+    for handler in app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
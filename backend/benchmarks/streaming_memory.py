@@ -0,0 +1,120 @@
+# benchmarks/streaming_memory.py
+"""
+Peak RSS while streaming a large audit log listing.
+
+Seeds N synthetic audit log rows into a throwaway SQLite database, then
+requests the listing as NDJSON and as a chunked JSON array, reading the body
+chunk by chunk (straight through the ASGI interface, so the client side does
+not buffer it) and sampling the process RSS after every chunk. With
+streaming, the peak should stay flat however many rows there are;
+`--buffered` also runs the regular list response for comparison (memory
+grows with N).
+
+    python -m benchmarks.streaming_memory [--rows 1000000] [--buffered]
+
+Linux only (reads /proc/self/statm).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="cms-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+ADMIN = {"username": "brianmalani17@gmail.com", "password": "1016-wjE"}
+URL = "/api/audit-logs/audit-logs/"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+async def seed(rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO audit_logs (user_id, action, resource_type, resource_id, timestamp) "
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows) "
+            "SELECT 1, 'update', 'page', n, datetime('now', '-' || n || ' seconds') FROM seq"
+        ), {"rows": rows})
+
+
+async def fetch(path: str, query: bytes, headers: list) -> tuple[int, int, int, float]:
+    """Run one GET through the ASGI app; returns (status, body bytes, peak RSS growth, seconds)."""
+    baseline = rss_bytes()
+    peak = baseline
+    size = 0
+    status = 0
+    done = asyncio.Event()
+
+    async def receive():
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal peak, size, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            peak = max(peak, rss_bytes())
+            if not message.get("more_body"):
+                done.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query, "headers": headers, "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, size, peak - baseline, time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--buffered", action="store_true", help="also measure the regular (non-streamed) response")
+    args = parser.parse_args()
+
+    for handler in app.router.on_startup:
+        await handler()
+
+    start = time.perf_counter()
+    await seed(args.rows)
+    print(f"ℹ️ Seeded {args.rows:,} audit log rows in {time.perf_counter() - start:.1f}s")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/auth/login", data=ADMIN)).json()["access_token"]
+    auth = (b"authorization", f"Bearer {token}".encode())
+
+    modes = [
+        ("ndjson", b"", [auth, (b"accept", b"application/x-ndjson")]),
+        ("json array", b"stream=true", [auth]),
+    ]
+    if args.buffered:
+        modes.append(("buffered", b"", [auth]))
+
+    print(f"{'mode':<12} {'status':>6} {'body MiB':>9} {'peak RSS +MiB':>14} {'seconds':>8}")
+    for label, query, headers in modes:
+        status, size, growth, seconds = await fetch(URL, query, headers)
+        print(f"{label:<12} {status:>6} {size / 2**20:>9.1f} {growth / 2**20:>14.1f} {seconds:>8.1f}")
+
+    for handler in app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+# benchmarks/tracing_overhead.py
+"""
+Per-span overhead of the in-process tracer (app/core/tracing.py).
+
+Measures what instrumentation costs outside a sampled trace (the common case:
+one contextvar lookup), what a span costs inside one, OTLP/JSON serialization
+per span, and a traced CRUD call against in-memory SQLite with and without a
+sampled trace around it.
+
+    python -m benchmarks.tracing_overhead [--iterations N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+
+from app.core.tracing import exporter, otlp_request, span, start_trace, traced  # noqa: E402
+from app.crud.settings import crud_site_setting  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+
+
+async def _plain() -> None:
+    return None
+
+
+@traced("bench")
+async def _traced() -> None:
+    return None
+
+
+async def _per_op_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def _in_trace(fn):
+    root = start_trace("bench", sample_rate=1.0)
+    with root:
+        await fn()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+    n = args.iterations
+    exporter.max_pending = n * 4  # keep every span: a dropped span is cheaper than a kept one
+
+    async def plain():
+        await _plain()
+
+    async def traced_unsampled():
+        await _traced()
+
+    async def span_unsampled():
+        with span("bench"):
+            pass
+
+    async def unsampled_root():
+        with start_trace("bench", sample_rate=0.0):
+            pass
+
+    async def span_sampled():
+        with span("bench", key="value"):
+            pass
+
+    async def traced_sampled():
+        await _traced()
+
+    print(f"{'step':<36} {'µs/op':>9}")
+    for label, fn in (
+        ("plain coroutine call", plain),
+        ("@traced call, no trace", traced_unsampled),
+        ("span(), no trace", span_unsampled),
+        ("start_trace, not sampled", unsampled_root),
+    ):
+        print(f"{label:<36} {await _per_op_us(fn, n):>9.2f}")
+    with start_trace("bench", sample_rate=1.0):
+        for label, fn in (("span(), sampled", span_sampled), ("@traced call, sampled", traced_sampled)):
+            print(f"{label:<36} {await _per_op_us(fn, n):>9.2f}")
+
+    batch = exporter.pending[:1000]
+    start = time.perf_counter()
+    for _ in range(max(1, n // 1000)):
+        json.dumps(otlp_request(batch), separators=(",", ":"))
+    per_span = (time.perf_counter() - start) / (max(1, n // 1000) * len(batch)) * 1e6
+    print(f"{'OTLP/JSON encode, per span':<36} {per_span:>9.2f}")
+    exporter.pending.clear()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        async def crud_get():
+            await crud_site_setting.get_all(db)
+
+        crud_n = max(1, n // 20)
+        untraced = await _per_op_us(crud_get, crud_n)
+        sampled = await _per_op_us(lambda: _in_trace(crud_get), crud_n)
+        spans_per_call = len(exporter.pending) / crud_n
+        print(f"\n{'CRUD call (settings get_all)':<36} {'µs/op':>9} {'spans':>6}")
+        print(f"{'  no trace':<36} {untraced:>9.2f} {0:>6}")
+        print(f"{'  sampled':<36} {sampled:>9.2f} {spans_per_call:>6.1f}")
+    exporter.pending.clear()
+    await engine.dispose()
+    print(f"\nspans dropped (pending buffer full): {exporter.dropped}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))